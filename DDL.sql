@@ -49,6 +49,19 @@ CREATE TABLE Employee (
     FOREIGN KEY (SupervisorID) REFERENCES Employee(PersonID) ON DELETE SET NULL
 );
 
+-- Table: EmployeeHierarchy
+-- Closure of Employee.SupervisorID: one row per (supervisor, employee) pair at
+-- any distance, including every employee with itself at depth 0. Maintained by
+-- triggers on Employee and Person (backend/hierarchy.py)
+CREATE TABLE EmployeeHierarchy (
+    AncestorID INT,
+    DescendantID INT,
+    Depth INT NOT NULL,
+    PRIMARY KEY (AncestorID, DescendantID),
+    FOREIGN KEY (AncestorID) REFERENCES Employee(PersonID) ON DELETE CASCADE,
+    FOREIGN KEY (DescendantID) REFERENCES Employee(PersonID) ON DELETE CASCADE
+);
+
 -- Table: Customer
 CREATE TABLE Customer (
     PersonID INT PRIMARY KEY,
@@ -274,3 +287,31 @@ FROM Product p
 JOIN ProductPart pp ON p.ProductID = pp.ProductID
 JOIN VendorPart vp ON pp.PartID = vp.PartID
 GROUP BY p.ProductID, p.ProductType;
+
+-- Secondary indexes for the predefined queries (backend/queries.py).
+-- Existing databases get them with: python backend/indexes.py apply
+-- Part.PartName is not indexed: Part has no PartName (or Weight) column yet,
+-- so the "Cup" vendor query cannot run until the column is added.
+
+-- Candidate lookup by name
+CREATE INDEX idx_person_name ON Person (FirstName, LastName);
+
+-- Posting date ranges, overall and per department
+CREATE INDEX idx_jobposition_posted ON JobPosition (PostedDate);
+CREATE INDEX idx_jobposition_department_posted ON JobPosition (DepartmentID, PostedDate);
+
+-- Sites with sales in a time window, answered from the index alone
+CREATE INDEX idx_sale_time_site ON Sale (SalesTime, SiteID);
+
+-- Selected applications per job within a date bound
+CREATE INDEX idx_application_job_status_date ON Application (JobID, Status, ApplicationDate);
+
+-- Passing rounds per interview, answered from the index alone
+CREATE INDEX idx_interviewgrade_grade ON InterviewGrade (InterviewID, Grade, RoundNumber);
+
+-- Supervisee lookups; replaces the implicit foreign key index so it keeps a stable name
+CREATE INDEX idx_employee_supervisor ON Employee (SupervisorID);
+
+-- Reports of a manager by level, and the chain of command above an employee
+CREATE INDEX idx_hierarchy_ancestor_depth ON EmployeeHierarchy (AncestorID, Depth);
+CREATE INDEX idx_hierarchy_descendant_depth ON EmployeeHierarchy (DescendantID, Depth);
@@ -1,197 +1,57 @@
-from flask import Flask, render_template, request, session, redirect, url_for
+from flask import Flask, render_template, request, session, redirect, url_for, jsonify, Response, stream_with_context
 import mysql.connector
+import hmac
+import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from batch import (BATCH_GRACE_SECONDS, BatchTimeout, batch_page_size, batch_params, batch_workers, is_query_timeout,
+                   query_timeout_ms, run_batch)
+from columnar import encode_json, to_columnar
+from columnar_engine import COLUMNAR_MAX_ENGINES, ColumnarEngine, EngineError
+from db_pool import get_pool, pool_metrics, target_key
+from ddl import dependent_tables, table_names
+from metrics import QueryMetrics, Stopwatch, log_query, render_exposition
+from pagination import (MAX_PAGE_SIZE, InvalidPageToken, clamp_page_size, decode_page_token,
+                        encode_page_token, keyset_after, paged_query)
+from queries import (bind_query, predefined_queries, query_cache_ttls, query_keysets, query_params, query_tables,
+                     query_views)
+from query_templates import InvalidParameter, bind
+from query_cache import QueryCache
+from schema_catalog import SchemaCatalog, sample_tables
+import summaries
 
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = "xyz_company_secret_key"  # Replace with a strong secret key
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
-
-def log_query(query, results):
-    """Helper function to log queries and results for debugging."""
-    logging.debug(f"Executed Query: {query}")
-    logging.debug(f"Results: {results}")
-
-# Predefined queries based on requirements
-predefined_queries = {
-    "Interviewers for Hellen Cole (Job 11111)": """
-        SELECT DISTINCT i.InterviewerID, p.LastName, p.FirstName 
-        FROM InterviewerAssignment i 
-        JOIN Interview iv ON i.InterviewID = iv.InterviewID 
-        JOIN JobPosition jp ON iv.JobID = jp.JobID 
-        JOIN Person p ON i.InterviewerID = p.PersonID 
-        WHERE iv.CandidateID = (SELECT PersonID FROM Person WHERE FirstName = 'Hellen' AND LastName = 'Cole') 
-        AND jp.JobID = 11111;
-    """,
-    "Jobs posted by Marketing (January 2011)": """
-        SELECT j.JobID 
-        FROM JobPosition j 
-        JOIN Department d ON j.DepartmentID = d.Department_ID 
-        WHERE d.DepartmentName = 'Marketing' 
-        AND j.PostedDate >= '2011-01-01' 
-        AND j.PostedDate < '2011-02-01';
-    """,
-    "Employees with no supervisees": """
-        SELECT e.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
-        FROM Employee e 
-        JOIN Person p ON e.PersonID = p.PersonID 
-        WHERE e.PersonID NOT IN (
-            SELECT SupervisorID 
-            FROM Employee 
-            WHERE SupervisorID IS NOT NULL
-        );
-    """,
-    "Marketing sites with no sales (March 2011)": """
-        SELECT s.SiteID, s.Location 
-        FROM Site s 
-        JOIN Department d ON d.DepartmentName = 'Marketing' 
-        WHERE s.SiteID NOT IN (
-            SELECT SiteID 
-            FROM Sale 
-            WHERE SalesTime BETWEEN '2011-03-01' AND '2011-03-31'
-        );
-    """,
-    "Jobs with no hires after 1 month of posting": """
-        SELECT jp.JobID, jp.JobDescription 
-        FROM JobPosition jp 
-        WHERE NOT EXISTS (
-            SELECT 1 
-            FROM Application a 
-            WHERE a.JobID = jp.JobID 
-            AND a.ApplicationDate <= DATE_ADD(jp.PostedDate, INTERVAL 1 MONTH)
-            AND a.Status = 'Selected'
-        );
-    """,
-    "Salespeople who sold all products > $200": """
-        SELECT sp.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
-        FROM Employee sp 
-        JOIN Person p ON sp.PersonID = p.PersonID 
-        WHERE NOT EXISTS (
-            SELECT pt.ProductType 
-            FROM Product pt 
-            WHERE pt.ListPrice > 200 
-            AND pt.ProductType NOT IN (
-                SELECT DISTINCT pr.ProductType 
-                FROM Sale s 
-                JOIN Product pr ON s.ProductID = pr.ProductID 
-                WHERE s.SalesPersonID = sp.PersonID
-            )
-        );
-    """,
-    "Departments with no job posts (Jan-Feb 2011)": """
-        SELECT d.Department_ID, d.DepartmentName 
-        FROM Department d 
-        WHERE d.Department_ID NOT IN (
-            SELECT jp.DepartmentID 
-            FROM JobPosition jp 
-            WHERE jp.PostedDate BETWEEN '2011-01-01' AND '2011-02-28'
-        );
-    """,
-    "Employees applying for job 12345": """
-        SELECT e.PersonID AS EmployeeID, CONCAT(p.FirstName, ' ', p.LastName) AS Name, ed.DepartmentID 
-        FROM Employee e 
-        JOIN Person p ON e.PersonID = p.PersonID 
-        JOIN Application a ON e.PersonID = a.ApplicantID 
-        JOIN JobPosition jp ON a.JobID = jp.JobID 
-        LEFT JOIN EmployeeDepartmentAssignment ed ON e.PersonID = ed.EmployeeID 
-        WHERE jp.JobID = 12345;
-    """,
-    "Best seller's type": """
-        SELECT pt.Type AS EmployeeType, COUNT(*) AS TotalSales 
-        FROM Sale s 
-        JOIN Employee e ON s.SalesPersonID = e.PersonID 
-        JOIN PersonType pt ON e.PersonID = pt.PersonID 
-        WHERE pt.Type = 'Employee' 
-        GROUP BY pt.Type 
-        ORDER BY TotalSales DESC 
-        LIMIT 1;
-    """,
-    "Product type with highest net profit": """
-        SELECT pr.ProductType 
-        FROM Product pr 
-        JOIN ProductPart pp ON pr.ProductID = pp.ProductID 
-        JOIN VendorPart vp ON pp.PartID = vp.PartID 
-        GROUP BY pr.ProductType 
-        ORDER BY (SUM(pr.ListPrice) - SUM(vp.Price)) DESC 
-        LIMIT 1;
-    """,
-    "Employees working in all departments": """
-        SELECT e.EmployeeID AS PersonID, p.LastName, p.FirstName 
-        FROM EmployeeDepartmentAssignment e 
-        JOIN Person p ON e.EmployeeID = p.PersonID 
-        GROUP BY e.EmployeeID, p.LastName, p.FirstName 
-        HAVING COUNT(DISTINCT e.DepartmentID) = (SELECT COUNT(*) FROM Department);
-    """,
-    "Interviewees selected (name and email)": """
-        SELECT CONCAT(p.FirstName, ' ', p.LastName) AS IntervieweeName, p.Email AS EmailAddress 
-        FROM Interview i 
-        JOIN Person p ON i.CandidateID = p.PersonID 
-        WHERE EXISTS (
-            SELECT 1 
-            FROM InterviewGrade ig 
-            WHERE ig.InterviewID = i.InterviewID 
-            AND ig.Grade >= 70
-            GROUP BY ig.InterviewID
-            HAVING COUNT(DISTINCT ig.RoundNumber) >= 5
-        );
-    """,
-    "Interviewees (name, phone, email)": """
-        SELECT p.FirstName, p.LastName, ph.PhoneNumber, p.Email
-        FROM Person p 
-        JOIN PhoneNumber ph ON p.PersonID = ph.PersonID 
-        JOIN Interview i ON p.PersonID = i.CandidateID
-        WHERE EXISTS (
-            SELECT 1 
-            FROM InterviewGrade ig 
-            WHERE ig.InterviewID = i.InterviewID 
-            AND ig.Grade >= 70
-            GROUP BY ig.InterviewID
-            HAVING COUNT(DISTINCT ig.RoundNumber) >= 5
-        );
-    """,
-    "Employee with highest average salary": """
-        SELECT p.PersonID, p.FirstName, p.LastName 
-        FROM Person p 
-        JOIN Salary s ON p.PersonID = s.EmployeeID 
-        GROUP BY s.EmployeeID 
-        ORDER BY AVG(s.Amount) DESC 
-        LIMIT 1;
-    """,
-    "Vendor supplying 'Cup' (lowest price)": """
-        SELECT v.VendorID, v.Name AS VendorName 
-        FROM Vendor v 
-        JOIN VendorPart vp ON v.VendorID = vp.VendorID 
-        JOIN Part p ON vp.PartID = p.PartID 
-        WHERE p.PartName = 'Cup' 
-        AND p.Weight < 4 
-        AND vp.Price = (
-            SELECT MIN(vp2.Price) 
-            FROM VendorPart vp2 
-            JOIN Part p2 ON vp2.PartID = p2.PartID 
-            WHERE p2.PartName = 'Cup' 
-            AND p2.Weight < 4
-        );
-    """,
-    "View: Employee Average Monthly Salaries": """
-        SELECT * FROM EmployeeAverageSalary
-        ORDER BY AverageMonthlySalary DESC;
-    """,
-    "View: Interview Rounds Passed": """
-        SELECT * FROM InterviewRoundsPassed
-        WHERE PassedRounds >= 5
-        ORDER BY PassedRounds DESC;
-    """,
-    "View: Product Type Sales": """
-        SELECT * FROM ProductTypeSales
-        ORDER BY TotalItemsSold DESC;
-    """,
-    "View: Product Part Costs": """
-        SELECT * FROM ProductPartCost
-        ORDER BY TotalPartCost DESC;
-    """
-}
+# Configure logging; LOG_LEVEL=DEBUG also logs every query with a sample of its rows
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+query_metrics = QueryMetrics()
+
+query_cache = QueryCache()
+
+schema_catalog = SchemaCatalog()
+
+# In-memory columnar engines answering ?engine=columnar queries, one per database
+# target, least recently used first; at most COLUMNAR_MAX_ENGINES are kept
+columnar_engines = OrderedDict()
+columnar_engines_lock = threading.Lock()
+
+# Shared secret the Next.js CRUD route sends to /cache/invalidate
+CACHE_INVALIDATE_TOKEN = os.getenv("CACHE_INVALIDATE_TOKEN", "")
+
+# Rows fetched per round trip when streaming results
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+
+def json_response(payload, status=200):
+    """JSON response serialized with orjson when available, gzipped when the client accepts it."""
+    body, headers = encode_json(payload, request.headers.get("Accept-Encoding", ""))
+    return Response(body, status=status, mimetype="application/json", headers=headers)
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -199,6 +59,8 @@ def index():
     error_message = None
     success_message = None
     selected_query = None
+    summary_status = None
+    next_page_token = None
 
     if request.method == "POST":
         action = request.form["action"]
@@ -218,59 +80,508 @@ def index():
 
         elif action == "show_tables":
             try:
-                connection = get_connection()
-                cursor = connection.cursor()
-                cursor.execute("SHOW TABLES")
-                tables = cursor.fetchall()
-                for table in tables:
-                    table_name = table[0]
-                    cursor.execute(f"SELECT * FROM `{table_name}` LIMIT 5")
-                    rows = cursor.fetchall()
-                    columns = [desc[0] for desc in cursor.description]
+                pool = get_session_pool()
+                tables = schema_catalog.get(connection_target(), pool)
+                samples = sample_tables(pool, tables)
+                for table_name, (columns, rows) in samples.items():
                     data.append({"table_name": table_name, "columns": columns, "rows": rows})
-                cursor.close()
                 success_message = "Tables and data fetched successfully."
             except mysql.connector.Error as err:
                 error_message = f"Error: {err}"
-            finally:
-                if "connection" in locals() and connection.is_connected():
-                    connection.close()
 
         elif action == "execute_query":
             selected_query = request.form.get("query")
             try:
-                connection = get_connection()
-                cursor = connection.cursor()
-                query = predefined_queries[selected_query]
-                cursor.execute(query)
-                query_results = cursor.fetchall()
-                columns = [desc[0] for desc in cursor.description]
-                log_query(query, query_results)
+                offset, page_size, values, after = page_request(
+                    selected_query, request.form.get("page_size", type=int), request.form.get("page_token"),
+                    query_values(selected_query, request.form))
+                columns, query_results, next_page_token, summary_status, cached = fetch_page(
+                    selected_query, offset, page_size, values, after)
                 data = [{"columns": columns, "rows": query_results}]
-                cursor.close()
-                success_message = "Query executed successfully."
+                if cached:
+                    success_message = "Query executed successfully (cached result)."
+                else:
+                    success_message = "Query executed successfully."
+                    if summary_status:
+                        success_message += f" Source: {summary_status}."
+            except (InvalidPageToken, InvalidParameter) as err:
+                error_message = str(err)
             except mysql.connector.Error as err:
                 error_message = f"Error executing query: {err}"
-            finally:
-                if "connection" in locals() and connection.is_connected():
-                    connection.close()
 
     return render_template(
         "index.html",
         data=data,
         predefined_queries=predefined_queries,
+        query_params=query_params,
         selected_query=selected_query,
         error_message=error_message,
         success_message=success_message,
+        summary_status=summary_status,
+        next_page_token=next_page_token,
         connected=("host" in session),
     )
 
-def get_connection():
-    """Helper function to establish a connection using session data."""
+@app.route("/api/queries")
+def api_queries():
+    """List the predefined queries, their SQL templates, parameters and the tables each one reads."""
+    return json_response({
+        "queries": [{
+            "name": name,
+            "sql": " ".join(predefined_queries[name].split()),
+            "params": [param.describe() for param in query_params.get(name, ())],
+            "tables": sorted(query_tables[name]),
+        } for name in predefined_queries]
+    })
+
+@app.route("/api/queries/<path:name>")
+def api_query(name):
+    """One page of a predefined query's results in columnar form.
+
+    Parameters are passed by name in the query string, e.g. ?job_id=11111;
+    the ones left out take their defaults. ?engine=columnar answers from the
+    in-memory columnar snapshot instead of MySQL.
+    """
+    if name not in predefined_queries:
+        return json_response({"message": f"Unknown query: {name}"}, 404)
+    try:
+        offset, page_size, values, after = page_request(name, request.args.get("page_size", type=int),
+                                                        request.args.get("page_token"),
+                                                        query_values(name, request.args))
+        if request.args.get("engine") == "columnar":
+            columns, rows, next_page_token = fetch_columnar_page(name, offset, page_size, values)
+            summary_status, cached = "columnar snapshot", True
+        else:
+            columns, rows, next_page_token, summary_status, cached = fetch_page(
+                name, offset, page_size, values, after)
+    except (InvalidPageToken, InvalidParameter) as err:
+        return json_response({"message": str(err)}, 400)
+    except (mysql.connector.Error, EngineError) as err:
+        return json_response({"message": f"Error executing query: {err}"}, 500)
+    payload = to_columnar(columns, rows)
+    payload.update(name=name, nextPageToken=next_page_token, cached=cached, source=summary_status)
+    return json_response(payload)
+
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Run several predefined queries at once and return every result set.
+
+    The JSON body may name the queries (all of them by default), give
+    parameter values per query ({"params": {name: {param: value}}}) and set
+    page_size, timeout_ms and workers. Queries run concurrently on pooled
+    connections, at most workers (BATCH_MAX_WORKERS) at a time, so the batch
+    takes about as long as its slowest query. Each one is stopped after
+    timeout_ms by the server; failures are reported per query.
+    """
+    body = request.get_json(silent=True) or {}
+    names = body.get("queries") or list(predefined_queries)
+    unknown = [name for name in names if name not in predefined_queries]
+    if unknown:
+        return json_response({"message": f"Unknown queries: {', '.join(unknown)}"}, 404)
+    try:
+        page_size = batch_page_size(body.get("page_size"))
+        timeout_ms = query_timeout_ms(body.get("timeout_ms"))
+        workers = batch_workers(body.get("workers"))
+        params = batch_params(body.get("params"))
+    except ValueError as err:
+        return json_response({"message": str(err)}, 400)
+    try:
+        pool = get_session_pool()
+    except mysql.connector.Error as err:
+        return json_response({"message": f"Error: {err}"}, 500)
+    target = connection_target()
+    workers = min(workers, pool.size)
+
+    def run(name):
+        return execute_page(pool, target, name, 0, page_size, params.get(name),
+                            max_execution_time=timeout_ms)
+
+    started = time.perf_counter()
+    outcomes = run_batch(run, names, workers, timeout=timeout_ms / 1000 + BATCH_GRACE_SECONDS)
+    results = []
+    for name, (page, error, seconds) in outcomes.items():
+        if error is not None:
+            entry = {"name": name, "error": str(error), "timedOut": isinstance(error, BatchTimeout) or is_query_timeout(error)}
+        else:
+            columns, rows, next_page_token, summary_status, cached = page
+            entry = to_columnar(columns, rows)
+            entry.update(name=name, nextPageToken=next_page_token, cached=cached, source=summary_status)
+        entry["elapsedMs"] = round(seconds * 1000, 1)
+        results.append(entry)
+    return json_response({
+        "results": results,
+        "workers": workers,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+@app.route("/api/tables")
+def api_tables():
+    """Schema catalog of the session's database.
+
+    Each table lists its columns (type, nullability, key), estimated row count
+    and foreign keys. With ?samples=N each table also carries its first N rows
+    in columnar form, fetched concurrently.
+    """
+    samples = min(request.args.get("samples", 0, type=int), MAX_PAGE_SIZE)
+    try:
+        pool = get_session_pool()
+        tables = schema_catalog.get(connection_target(), pool)
+        sampled = sample_tables(pool, tables, samples) if samples > 0 else {}
+    except mysql.connector.Error as err:
+        return json_response({"message": f"Error: {err}"}, 500)
+    result = []
+    for name, table in tables.items():
+        entry = dict(table)
+        if name in sampled:
+            entry["sample"] = to_columnar(*sampled[name])
+        result.append(entry)
+    return json_response({"tables": result})
+
+@app.route("/api/tables/<name>")
+def api_table_rows(name):
+    """First rows of a table in columnar form (limit defaults to 5)."""
+    if name not in table_names():
+        return json_response({"message": f"Unknown table: {name}"}, 404)
+    limit = min(request.args.get("limit", 5, type=int), MAX_PAGE_SIZE)
+    try:
+        connection = get_connection()
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT * FROM `{name}` LIMIT %s", (limit,))
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        cursor.close()
+    except mysql.connector.Error as err:
+        return json_response({"message": f"Error: {err}"}, 500)
+    finally:
+        if "connection" in locals():
+            connection.close()
+    payload = to_columnar(columns, rows)
+    payload.update(name=name)
+    return json_response(payload)
+
+@app.route("/queries/stream")
+def stream_query():
+    """Stream a predefined query's rows as newline-delimited JSON.
+
+    Rows are read through an unbuffered cursor in batches of STREAM_BATCH_SIZE
+    and written out as they arrive, so memory stays flat however large the
+    result is. The first line holds the column names, every later line one row.
+    Query parameters are passed by name alongside ?query=.
+    """
+    name = request.args.get("query")
+    if name not in predefined_queries:
+        return jsonify({"message": f"Unknown query: {name}"}), 404
+    try:
+        _sql, _args, values = bind_query(name, query_values(name, request.args))
+    except InvalidParameter as err:
+        return jsonify({"message": str(err)}), 400
+    stopwatch = Stopwatch()
+    try:
+        connection = get_connection()
+        connect_time = stopwatch.lap()
+        status_cursor = connection.cursor()
+        template, _summary_status = resolve_query(status_cursor, name, connection_target())
+        status_cursor.close()
+        query, args, _values = bind(template, query_params.get(name, ()), values)
+        stopwatch.lap()
+        # Prepared statements stream their rows; they are read as the client consumes them
+        cursor = connection.prepare(query).execute(args)
+        execute_time = stopwatch.lap()
+    except mysql.connector.Error as err:
+        query_metrics.error(name)
+        if "connection" in locals():
+            connection.close()
+        return jsonify({"message": f"Error executing query: {err}"}), 500
+
+    def generate():
+        finished = False
+        fetch_time = 0.0
+        row_count = 0
+        try:
+            yield json.dumps({"columns": [desc[0] for desc in cursor.description]}) + "\n"
+            while True:
+                stopwatch.lap()
+                rows = cursor.fetchmany(STREAM_BATCH_SIZE)
+                # Only time spent reading counts, not time spent waiting on the client
+                fetch_time += stopwatch.lap()
+                if not rows:
+                    break
+                row_count += len(rows)
+                yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+            finished = True
+            query_metrics.observe(name, connect_time, execute_time, fetch_time, row_count, query)
+        finally:
+            if finished:
+                connection.close()
+            else:
+                # The client went away mid-result; unread rows make the
+                # connection unusable for the next checkout
+                connection.discard()
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/crud", methods=["POST"])
+def crud():
+    """Create, update or delete rows in a table, invalidating cached results."""
+    body = request.get_json(silent=True) or {}
+    operation = (body.get("operation") or "").lower()
+    table = body.get("table")
+    data = body.get("data") or {}
+    where = body.get("where") or {}
+
+    if table not in table_names():
+        return jsonify({"message": f"Unknown table: {table}"}), 400
+    for column in list(data) + list(where):
+        if not column.isidentifier():
+            return jsonify({"message": f"Invalid column name: {column}"}), 400
+
+    where_clause = " AND ".join(f"`{column}` = %s" for column in where)
+    if operation == "create" and data:
+        columns = ", ".join(f"`{column}`" for column in data)
+        placeholders = ", ".join(["%s"] * len(data))
+        query = f"INSERT INTO `{table}` ({columns}) VALUES ({placeholders})"
+        params = list(data.values())
+    elif operation == "update" and data and where:
+        set_clause = ", ".join(f"`{column}` = %s" for column in data)
+        query = f"UPDATE `{table}` SET {set_clause} WHERE {where_clause}"
+        params = list(data.values()) + list(where.values())
+    elif operation == "delete" and where:
+        query = f"DELETE FROM `{table}` WHERE {where_clause}"
+        params = list(where.values())
+    else:
+        return jsonify({"message": "Unsupported operation or missing data/where clause"}), 400
+
+    try:
+        connection = get_connection()
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        affected_rows = cursor.rowcount
+        connection.commit()
+        cursor.close()
+    except mysql.connector.Error as err:
+        return jsonify({"message": f"Error: {err}"}), 500
+    finally:
+        if "connection" in locals():
+            connection.close()
+
+    query_cache.invalidate_tables(connection_target(), written_tables(operation, table))
+    return jsonify({"operation": operation, "table": table, "affectedRows": affected_rows})
+
+@app.route("/cache/invalidate", methods=["POST"])
+def cache_invalidate():
+    """Drop cached results made stale by a write that bypassed /crud, e.g. the Next.js CRUD route.
+
+    Callers must send CACHE_INVALIDATE_TOKEN in the X-Cache-Invalidate-Token
+    header; without the token configured only local callers are accepted.
+    """
+    if CACHE_INVALIDATE_TOKEN:
+        allowed = hmac.compare_digest(request.headers.get("X-Cache-Invalidate-Token", ""), CACHE_INVALIDATE_TOKEN)
+    else:
+        allowed = request.remote_addr in ("127.0.0.1", "::1")
+    if not allowed:
+        return jsonify({"message": "Not allowed to invalidate the cache"}), 403
+    body = request.get_json(silent=True) or {}
+    operation = (body.get("operation") or "").lower()
+    table = body.get("table")
+    if table not in table_names():
+        return jsonify({"message": f"Unknown table: {table}"}), 400
+    if operation not in ("create", "update", "delete"):
+        return jsonify({"message": f"Unsupported operation: {operation}"}), 400
+    try:
+        database = (body["host"], int(body["port"]), body["database"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"message": "host, port and database are required"}), 400
+    invalidated = query_cache.invalidate_database(database, written_tables(operation, table))
+    return jsonify({"invalidated": invalidated})
+
+def written_tables(operation, table):
+    """Tables whose cached results a create, update or delete on table can change."""
+    # Deletes and key updates can cascade into referencing tables
+    return {table} if operation == "create" else dependent_tables(table)
+
+@app.route("/pool/metrics")
+def pool_metrics_view():
+    """Expose connection pool counters for tuning."""
+    return jsonify(pool_metrics())
+
+@app.route("/metrics")
+def metrics_view():
+    """Query latency and row-count histograms, pool state and cache counters
+    in the Prometheus text format."""
+    body = render_exposition(query_metrics, pool_metrics(), {
+        "query_cache": query_cache.metrics(),
+        "schema_catalog": schema_catalog.metrics(),
+    })
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@app.route("/cache/metrics")
+def cache_metrics_view():
+    """Expose query result, schema catalog and columnar engine cache counters."""
+    return jsonify(dict(query_cache.metrics(), schema_catalog=schema_catalog.metrics(),
+                        columnar_engine=columnar_engine_metrics()))
+
+def query_values(name, source):
+    """Parameter values given for a query in a form or query string, by parameter name."""
+    return {param.name: source.get(param.name) for param in query_params.get(name, ())
+            if source.get(param.name) not in (None, "")}
+
+def page_request(name, page_size=None, page_token=None, values=None):
+    """(offset, page_size, values, after) requested for a query; raises InvalidPageToken.
+
+    A page token carries the values the first page was read with, and for
+    queries paged by keyset the keyset values of the last row read.
+    """
+    if page_token:
+        return decode_page_token(page_token, name)
+    return 0, clamp_page_size(page_size), values, None
+
+def fetch_page(name, offset, page_size, values=None, after=None):
+    """One page of a predefined query, served from the result cache when possible.
+
+    Returns (columns, rows, next_page_token, summary_status, cached); raises
+    InvalidParameter for bad parameter values and mysql.connector.Error if
+    the query fails.
+    """
+    return execute_page(get_session_pool(), connection_target(), name, offset, page_size, values, after=after)
+
+def execute_page(pool, target, name, offset, page_size, values=None, max_execution_time=None, after=None):
+    """fetch_page for an explicit pool and target, so it can run outside the request thread.
+
+    The query runs as a server-side prepared statement cached on the pooled
+    connection, so repeated executions skip parsing and planning.
+    max_execution_time (milliseconds) makes the server abort the query once
+    it runs longer than that. Queries with a keyset continue after the
+    keyset values in after rather than at offset.
+    """
+    # Validates the values before anything touches the database
+    _sql, _args, values = bind_query(name, values)
+    keyset = query_keysets.get(name)
+    cache_key = (target, name, tuple(sorted(values.items())), offset, page_size,
+                 tuple(after) if after is not None else None)
+    cached = query_cache.get(cache_key)
+    summary_status = None
+    if cached is not None:
+        columns, rows = cached
+    else:
+        # Taken before the query reads anything, so a write during it keeps its rows out
+        generation = query_cache.generation(target, query_tables[name])
+        stopwatch = Stopwatch()
+        connection = pool.acquire()
+        connect_time = stopwatch.lap()
+        try:
+            cursor = connection.cursor()
+            template, summary_status = resolve_query(cursor, name, target)
+            query, args, _values = bind(template, query_params.get(name, ()), values)
+            # One row past the page tells whether another page follows
+            query, params = paged_query(query, offset, page_size + 1, keyset, after)
+            if max_execution_time:
+                timeout_variable = set_query_timeout(cursor, max_execution_time)
+            try:
+                stopwatch.lap()
+                result = connection.prepare(query).execute(args + (params or ()))
+                execute_time = stopwatch.lap()
+                rows = result.fetchall()
+                fetch_time = stopwatch.lap()
+                columns = [desc[0] for desc in result.description]
+            finally:
+                if max_execution_time:
+                    # Pooled connections keep session settings; put the default back
+                    cursor.execute(f"SET SESSION {timeout_variable} = DEFAULT")
+            cursor.close()
+        except mysql.connector.Error:
+            query_metrics.error(name)
+            raise
+        finally:
+            connection.close()
+        query_metrics.observe(name, connect_time, execute_time, fetch_time, len(rows), query)
+        log_query(query, rows)
+        query_cache.put(cache_key, columns, rows, query_tables[name], ttl=query_cache_ttls.get(name),
+                        generation=generation)
+
+    next_page_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_page_token = encode_page_token(name, offset + page_size, page_size, values,
+                                            keyset_after(columns, rows[-1], keyset) if keyset else None)
+    return columns, rows, next_page_token, summary_status, cached is not None
+
+def set_query_timeout(cursor, milliseconds):
+    """Make the server abort the session's queries after milliseconds; returns the variable set.
+
+    MySQL calls the limit max_execution_time, in milliseconds; MariaDB calls
+    it max_statement_time, in seconds.
+    """
+    try:
+        cursor.execute("SET SESSION max_execution_time = %s", (milliseconds,))
+        return "max_execution_time"
+    except mysql.connector.Error:
+        cursor.execute("SET SESSION max_statement_time = %s", (milliseconds / 1000,))
+        return "max_statement_time"
+
+def fetch_columnar_page(name, offset, page_size, values=None):
+    """One page of a predefined query answered by the session's columnar engine.
+
+    Returns (columns, rows, next_page_token); raises InvalidParameter for
+    bad parameter values, EngineError if the query fails in the engine and
+    mysql.connector.Error if the snapshot can't be loaded.
+    """
+    columns, rows = columnar_engine(connection_target()).execute(name, values)
+    _sql, _args, values = bind_query(name, values)
+    next_page_token = None
+    if len(rows) > offset + page_size:
+        next_page_token = encode_page_token(name, offset + page_size, page_size, values)
+    return columns, rows[offset:offset + page_size], next_page_token
+
+def columnar_engine(target):
+    """The target's columnar engine, created on first use; the least recently used is dropped past the limit."""
+    with columnar_engines_lock:
+        engine = columnar_engines.get(target)
+        if engine is not None:
+            columnar_engines.move_to_end(target)
+            return engine
+    pool = get_session_pool()
+    with columnar_engines_lock:
+        engine = columnar_engines.setdefault(target, ColumnarEngine(pool.acquire))
+        columnar_engines.move_to_end(target)
+        while len(columnar_engines) > COLUMNAR_MAX_ENGINES:
+            columnar_engines.popitem(last=False)
+    return engine
+
+def columnar_engine_metrics():
+    """Snapshot counters of the session's columnar engine, or None before it has one."""
+    with columnar_engines_lock:
+        engine = columnar_engines.get(connection_target())
+    return engine.metrics() if engine is not None else None
+
+def resolve_query(cursor, name, target):
+    """SQL template to run for a predefined query, and where its rows come from.
+
+    Queries over a view read its summary table while that is fresh; the
+    second value describes the source for those queries and is None otherwise.
+    The summary status of target's database is cached for SUMMARY_STATUS_TTL.
+    """
+    query = predefined_queries[name]
+    view = query_views.get(name)
+    if view is None:
+        return query, None
+    state = summaries.status_cache.status(cursor, target).get(view)
+    if summaries.is_fresh(state):
+        query = summaries.materialized_query(view, query)
+    return query, summaries.describe(state)
+
+def connection_target():
+    """Key identifying the session's database: (host, port, user, database, password digest)."""
+    if "host" not in session:
+        return None
+    return target_key(session["host"], session["port"], session["user"],
+                      session["password"], session["database"])
+
+def get_session_pool():
+    """Connection pool for the session's database."""
     if "host" in session:
-        return mysql.connector.connect(
+        return get_pool(
             host=session["host"],
-            port=int(session["port"]),
+            port=session["port"],
             user=session["user"],
             password=session["password"],
             database=session["database"]
@@ -278,5 +589,9 @@ def get_connection():
     else:
         raise mysql.connector.Error("Database connection not initialized.")
 
+def get_connection():
+    """Helper function to check out a pooled connection using session data."""
+    return get_session_pool().acquire()
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5002, debug=True) 
\ No newline at end of file
@@ -0,0 +1,438 @@
+"""Async serving mode: the JSON query API as an ASGI app on aiomysql.
+
+Serves one database, configured like the command line tools through
+DB_HOST/DB_PORT/DB_USER/DB_PASSWORD/DB_NAME. Run with
+
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5003
+
+A slow query only holds its own pooled connection; the event loop keeps
+serving everyone else. Each client may run ASYNC_CLIENT_CONCURRENCY queries
+at once and queue ASYNC_CLIENT_QUEUE more before getting 429s, and the
+process queues at most ASYNC_MAX_WAITING requests before answering 503.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+
+import aiomysql
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import summaries
+from batch import batch_page_size, batch_params, batch_workers, is_query_timeout, query_timeout_ms
+from columnar import encode_json, to_columnar
+from metrics import QueryMetrics, Stopwatch, log_query, render_exposition
+from pagination import (InvalidPageToken, clamp_page_size, decode_page_token, encode_page_token, keyset_after,
+                        paged_query)
+from queries import (bind_query, predefined_queries, query_cache_ttls, query_keysets, query_params, query_tables,
+                     query_views)
+from query_cache import QueryCache
+from query_templates import InvalidParameter, bind
+
+load_dotenv()
+
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_POOL_SIZE", 20))
+ASYNC_POOL_RECYCLE = int(os.getenv("ASYNC_POOL_RECYCLE", 300))
+# Queries one client may run at once, and how many more it may have waiting
+ASYNC_CLIENT_CONCURRENCY = int(os.getenv("ASYNC_CLIENT_CONCURRENCY", 4))
+ASYNC_CLIENT_QUEUE = int(os.getenv("ASYNC_CLIENT_QUEUE", 16))
+# Requests waiting for a connection across all clients before new ones are turned away
+ASYNC_MAX_WAITING = int(os.getenv("ASYNC_MAX_WAITING", 500))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", 500))
+
+query_cache = QueryCache()
+query_metrics = QueryMetrics()
+
+
+class Overloaded(Exception):
+    """Raised when a request is turned away instead of queued."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class ClientLimiter:
+    """Per-client concurrency limits with bounded queues.
+
+    A client is identified by the X-Client-ID header, falling back to its
+    address. Idle clients are forgotten, so the table stays small.
+    """
+
+    def __init__(self, concurrency=ASYNC_CLIENT_CONCURRENCY, queue=ASYNC_CLIENT_QUEUE,
+                 max_waiting=ASYNC_MAX_WAITING):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_waiting = max_waiting
+        self._clients = {}  # client -> [semaphore, requests admitted]
+        self.waiting = 0
+        self.stats = {"admitted": 0, "rejected_client": 0, "rejected_overload": 0}
+
+    def check(self, client):
+        """Raise Overloaded if a request from client would be turned away now."""
+        entry = self._clients.get(client)
+        if entry is not None and entry[1] >= self.concurrency + self.queue:
+            self.stats["rejected_client"] += 1
+            raise Overloaded(f"Too many concurrent requests from {client}.", 429)
+        if self.waiting >= self.max_waiting:
+            self.stats["rejected_overload"] += 1
+            raise Overloaded("Server is busy, try again shortly.", 503)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, client):
+        self.check(client)
+        entry = self._clients.get(client)
+        if entry is None:
+            entry = self._clients[client] = [asyncio.Semaphore(self.concurrency), 0]
+        entry[1] += 1
+        self.waiting += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._leave(client, entry)
+            raise
+        finally:
+            self.waiting -= 1
+        self.stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            entry[0].release()
+            self._leave(client, entry)
+
+    def _leave(self, client, entry):
+        entry[1] -= 1
+        if entry[1] == 0:
+            self._clients.pop(client, None)
+
+    def metrics(self):
+        return dict(self.stats, clients=len(self._clients), waiting=self.waiting)
+
+
+limiter = ClientLimiter()
+
+
+def client_id(request):
+    return request.headers.get("X-Client-ID") or (request.client.host if request.client else "unknown")
+
+
+def json_response(request, payload, status=200):
+    body, headers = encode_json(payload, request.headers.get("Accept-Encoding", ""))
+    return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+
+DB_CONFIG = {
+    "host": os.getenv('DB_HOST', 'localhost'),
+    "port": int(os.getenv('DB_PORT', 3306)),
+    "user": os.getenv('DB_USER', 'root'),
+    "password": os.getenv('DB_PASSWORD', ''),
+    "db": os.getenv('DB_NAME', 'xyzcompany'),
+}
+# Result cache key prefix and metrics label for the served database
+TARGET = f"{DB_CONFIG['user']}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['db']}"
+
+
+async def summary_status(cursor):
+    """summaries.status() over an aiomysql cursor."""
+    await cursor.execute(summaries.INSTALLED_SQL, (summaries.STATE_TABLE,))
+    if (await cursor.fetchone())[0] == 0:
+        return {}
+    await cursor.execute(summaries.STATE_SQL)
+    state_rows = await cursor.fetchall()
+    await cursor.execute(summaries.TRIGGERS_SQL)
+    return summaries.status_from_rows(state_rows, [name for (name,) in await cursor.fetchall()])
+
+
+async def resolve_query(cursor, name):
+    """SQL template for a predefined query and where its rows come from (see app.resolve_query)."""
+    query = predefined_queries[name]
+    view = query_views.get(name)
+    if view is None:
+        return query, None
+    state = summaries.status_cache.get(TARGET)
+    if state is None:
+        state = await summary_status(cursor)
+        summaries.status_cache.put(TARGET, state)
+    state = state.get(view)
+    if summaries.is_fresh(state):
+        query = summaries.materialized_query(view, query)
+    return query, summaries.describe(state)
+
+
+async def execute_page(pool, name, offset, page_size, values=None, max_execution_time=None, after=None):
+    """One page of a predefined query: (columns, rows, next_page_token, summary_status, cached).
+
+    aiomysql speaks the text protocol, so parameters are escaped by the
+    driver rather than bound to a server-side prepared statement.
+    """
+    _sql, _args, values = bind_query(name, values)
+    keyset = query_keysets.get(name)
+    cache_key = (TARGET, name, tuple(sorted(values.items())), offset, page_size,
+                 tuple(after) if after is not None else None)
+    cached = query_cache.get(cache_key)
+    status = None
+    if cached is not None:
+        columns, rows = cached
+    else:
+        generation = query_cache.generation(TARGET, query_tables[name])
+        stopwatch = Stopwatch()
+        async with pool.acquire() as connection:
+            connect_time = stopwatch.lap()
+            async with connection.cursor() as cursor:
+                try:
+                    template, status = await resolve_query(cursor, name)
+                    query, args, _values = bind(template, query_params.get(name, ()), values)
+                    query, params = paged_query(query, offset, page_size + 1, keyset, after)
+                    if max_execution_time:
+                        timeout_variable = await set_query_timeout(cursor, max_execution_time)
+                    try:
+                        stopwatch.lap()
+                        await cursor.execute(query, args + (params or ()))
+                        execute_time = stopwatch.lap()
+                        rows = await cursor.fetchall()
+                        fetch_time = stopwatch.lap()
+                        columns = [desc[0] for desc in cursor.description]
+                    finally:
+                        if max_execution_time:
+                            await cursor.execute(f"SET SESSION {timeout_variable} = DEFAULT")
+                except aiomysql.Error:
+                    query_metrics.error(name)
+                    raise
+        query_metrics.observe(name, connect_time, execute_time, fetch_time, len(rows), query)
+        log_query(query, rows)
+        query_cache.put(cache_key, columns, rows, query_tables[name], ttl=query_cache_ttls.get(name),
+                        generation=generation)
+
+    next_page_token = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_page_token = encode_page_token(name, offset + page_size, page_size, values,
+                                            keyset_after(columns, rows[-1], keyset) if keyset else None)
+    return columns, rows, next_page_token, status, cached is not None
+
+
+async def set_query_timeout(cursor, milliseconds):
+    """See app.set_query_timeout."""
+    try:
+        await cursor.execute("SET SESSION max_execution_time = %s", (milliseconds,))
+        return "max_execution_time"
+    except aiomysql.Error:
+        await cursor.execute("SET SESSION max_statement_time = %s", (milliseconds / 1000,))
+        return "max_statement_time"
+
+
+def query_values(name, source):
+    return {param.name: source.get(param.name) for param in query_params.get(name, ())
+            if source.get(param.name) not in (None, "")}
+
+
+async def api_queries(request):
+    return json_response(request, {
+        "queries": [{
+            "name": name,
+            "sql": " ".join(predefined_queries[name].split()),
+            "params": [param.describe() for param in query_params.get(name, ())],
+            "tables": sorted(query_tables[name]),
+        } for name in predefined_queries]
+    })
+
+
+async def api_query(request):
+    name = request.path_params["name"]
+    if name not in predefined_queries:
+        return json_response(request, {"message": f"Unknown query: {name}"}, 404)
+    args = request.query_params
+    try:
+        if args.get("page_token"):
+            offset, page_size, values, after = decode_page_token(args["page_token"], name)
+        else:
+            page_size = int(args["page_size"]) if args.get("page_size", "").isdigit() else None
+            offset, page_size, values, after = 0, clamp_page_size(page_size), query_values(name, args), None
+        async with limiter.slot(client_id(request)):
+            columns, rows, next_page_token, status, cached = await execute_page(
+                request.app.state.pool, name, offset, page_size, values, after=after)
+    except (InvalidPageToken, InvalidParameter) as err:
+        return json_response(request, {"message": str(err)}, 400)
+    except Overloaded as err:
+        return json_response(request, {"message": str(err)}, err.status)
+    except aiomysql.Error as err:
+        return json_response(request, {"message": f"Error executing query: {err}"}, 500)
+    payload = to_columnar(columns, rows)
+    payload.update(name=name, nextPageToken=next_page_token, cached=cached, source=status)
+    return json_response(request, payload)
+
+
+async def api_batch(request):
+    """Run several predefined queries concurrently (see app.api_batch)."""
+    try:
+        body = await request.json()
+    except ValueError:
+        body = {}
+    body = body if isinstance(body, dict) else {}
+    names = list(dict.fromkeys(body.get("queries") or predefined_queries))
+    unknown = [name for name in names if name not in predefined_queries]
+    if unknown:
+        return json_response(request, {"message": f"Unknown queries: {', '.join(unknown)}"}, 404)
+    try:
+        page_size = batch_page_size(body.get("page_size"))
+        timeout_ms = query_timeout_ms(body.get("timeout_ms"))
+        workers = batch_workers(body.get("workers"))
+        params = batch_params(body.get("params"))
+    except ValueError as err:
+        return json_response(request, {"message": str(err)}, 400)
+    gate = asyncio.Semaphore(workers)
+    pool = request.app.state.pool
+
+    async def run(name):
+        # The server stops a query at timeout_ms. Cancelling it here instead would
+        # hand its connection back to the pool with the result still unread.
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            async with gate:
+                page = await execute_page(pool, name, 0, page_size, params.get(name), timeout_ms)
+            error = None
+        except InvalidParameter as err:
+            page, error = None, str(err)
+        except aiomysql.Error as err:
+            page, error, timed_out = None, str(err), is_query_timeout(err)
+        return name, page, error, timed_out, time.perf_counter() - started
+
+    started = time.perf_counter()
+    try:
+        async with limiter.slot(client_id(request)):
+            outcomes = await asyncio.gather(*(run(name) for name in names))
+    except Overloaded as err:
+        return json_response(request, {"message": str(err)}, err.status)
+    results = []
+    for name, page, error, timed_out, seconds in outcomes:
+        if error is not None:
+            entry = {"name": name, "error": error, "timedOut": timed_out}
+        else:
+            columns, rows, next_page_token, status, cached = page
+            entry = to_columnar(columns, rows)
+            entry.update(name=name, nextPageToken=next_page_token, cached=cached, source=status)
+        entry["elapsedMs"] = round(seconds * 1000, 1)
+        results.append(entry)
+    return json_response(request, {
+        "results": results,
+        "workers": workers,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1),
+    })
+
+
+async def stream_query(request):
+    """Stream a predefined query as newline-delimited JSON from an unbuffered cursor."""
+    name = request.query_params.get("query")
+    if name not in predefined_queries:
+        return JSONResponse({"message": f"Unknown query: {name}"}, 404)
+    try:
+        _sql, _args, values = bind_query(name, query_values(name, request.query_params))
+    except InvalidParameter as err:
+        return JSONResponse({"message": str(err)}, 400)
+    client = client_id(request)
+    pool = request.app.state.pool
+
+    async def generate():
+        # The slot is held for the whole stream; a slow reader only stalls itself
+        try:
+            async with limiter.slot(client):
+                stopwatch = Stopwatch()
+                async with pool.acquire() as connection:
+                    connect_time = stopwatch.lap()
+                    finished = False
+                    try:
+                        async with connection.cursor() as status_cursor:
+                            template, _status = await resolve_query(status_cursor, name)
+                        query, args, _values = bind(template, query_params.get(name, ()), values)
+                        cursor = await connection.cursor(aiomysql.SSCursor)
+                        stopwatch.lap()
+                        await cursor.execute(query, args)
+                        execute_time = stopwatch.lap()
+                        yield json.dumps({"columns": [desc[0] for desc in cursor.description]}) + "\n"
+                        fetch_time, row_count = 0.0, 0
+                        while True:
+                            stopwatch.lap()
+                            rows = await cursor.fetchmany(STREAM_BATCH_SIZE)
+                            fetch_time += stopwatch.lap()
+                            if not rows:
+                                break
+                            row_count += len(rows)
+                            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+                        await cursor.close()
+                        finished = True
+                        query_metrics.observe(name, connect_time, execute_time, fetch_time, row_count, query)
+                    except aiomysql.Error as err:
+                        query_metrics.error(name)
+                        yield json.dumps({"error": str(err)}) + "\n"
+                    finally:
+                        if not finished:
+                            # Unread rows would poison the connection; the pool drops closed ones
+                            connection.close()
+        except Overloaded as err:
+            # Admitted by the check below, then overtaken by other requests
+            yield json.dumps({"error": str(err)}) + "\n"
+
+    # Refuse up front; once the response has started only an error line can be sent
+    try:
+        limiter.check(client)
+    except Overloaded as err:
+        return JSONResponse({"message": str(err)}, err.status)
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def metrics_view(request):
+    pool = request.app.state.pool
+    pools = [{
+        "target": TARGET,
+        "size": pool.maxsize,
+        "open": pool.size,
+        "idle": pool.freesize,
+        "in_use": pool.size - pool.freesize,
+    }]
+    body = render_exposition(query_metrics, pools, {
+        "query_cache": query_cache.metrics(),
+        "client_limiter": limiter.metrics(),
+    })
+    return Response(body, media_type="text/plain; version=0.0.4")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    app.state.pool = await aiomysql.create_pool(
+        **DB_CONFIG,
+        minsize=1,
+        maxsize=ASYNC_POOL_SIZE,
+        pool_recycle=ASYNC_POOL_RECYCLE,
+        autocommit=True,
+    )
+    try:
+        yield
+    finally:
+        app.state.pool.close()
+        await app.state.pool.wait_closed()
+
+
+app = Starlette(
+    routes=[
+        Route("/api/queries", api_queries),
+        Route("/api/queries/{name:path}", api_query),
+        Route("/api/batch", api_batch, methods=["POST"]),
+        Route("/queries/stream", stream_query),
+        Route("/metrics", metrics_view),
+    ],
+    lifespan=lifespan,
+)
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("ASGI_PORT", 5003)))
@@ -0,0 +1,119 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pagination import clamp_page_size
+
+# Queries of one batch run at once; each holds its own pooled connection
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 4))
+# Per-query limit, enforced by the server through max_execution_time (max_statement_time on MariaDB)
+BATCH_QUERY_TIMEOUT_MS = int(os.getenv("BATCH_QUERY_TIMEOUT_MS", 10000))
+# Extra time the batch waits past the query timeout before giving up on a query
+BATCH_GRACE_SECONDS = float(os.getenv("BATCH_GRACE_SECONDS", 2))
+# Error codes for a query stopped at its time limit: MySQL's max_execution_time, MariaDB's max_statement_time
+QUERY_TIMEOUT_ERRORS = {3024, 1969}
+
+
+class BatchTimeout(Exception):
+    """Raised for a query still running (or queued) when the batch deadline passes."""
+
+
+def query_timeout_ms(requested=None):
+    """Per-query limit for a batch in milliseconds, at most BATCH_QUERY_TIMEOUT_MS.
+
+    Raises ValueError unless requested is None or a positive whole number;
+    the server would take zero or less to mean no limit at all.
+    """
+    if requested is None:
+        return BATCH_QUERY_TIMEOUT_MS
+    try:
+        timeout_ms = int(requested)
+    except (TypeError, ValueError):
+        raise ValueError("timeout_ms must be a whole number of milliseconds.") from None
+    if timeout_ms <= 0:
+        raise ValueError("timeout_ms must be positive.")
+    return min(timeout_ms, BATCH_QUERY_TIMEOUT_MS)
+
+
+def batch_workers(requested=None):
+    """Queries of a batch run at once, at most BATCH_MAX_WORKERS.
+
+    Raises ValueError unless requested is None or a positive whole number.
+    """
+    if requested is None:
+        return BATCH_MAX_WORKERS
+    try:
+        workers = int(requested)
+    except (TypeError, ValueError):
+        raise ValueError("workers must be a whole number.") from None
+    if workers <= 0:
+        raise ValueError("workers must be positive.")
+    return min(workers, BATCH_MAX_WORKERS)
+
+
+def batch_page_size(requested=None):
+    """Rows returned per query of a batch, clamped like any requested page size.
+
+    Raises ValueError unless requested is None or a whole number.
+    """
+    if requested is None:
+        return clamp_page_size(None)
+    try:
+        return clamp_page_size(int(requested))
+    except (TypeError, ValueError):
+        raise ValueError("page_size must be a whole number.") from None
+
+
+def batch_params(requested=None):
+    """Parameter values of a batch as {query name: {param: value}}.
+
+    Raises ValueError unless requested is None or such a mapping.
+    """
+    params = requested or {}
+    if not isinstance(params, dict) or not all(isinstance(values, dict) or values is None
+                                               for values in params.values()):
+        raise ValueError("params must map query names to objects of parameter values.")
+    return params
+
+
+def is_query_timeout(err):
+    """Whether a driver error is the server stopping a query at its time limit."""
+    code = getattr(err, "errno", None) or (err.args[0] if err.args else None)
+    return code in QUERY_TIMEOUT_ERRORS
+
+
+def _timed(run, name):
+    started = time.perf_counter()
+    try:
+        return run(name), None, time.perf_counter() - started
+    except Exception as err:
+        return None, err, time.perf_counter() - started
+
+
+def run_batch(run, names, workers=BATCH_MAX_WORKERS, timeout=None):
+    """Call run(name) for every name on a thread pool: {name: (result, error, seconds)}.
+
+    Wall time approaches the slowest call rather than the sum. Errors are
+    returned per name instead of raised. With a timeout (seconds), calls not
+    finished by then report BatchTimeout; queued calls are cancelled, while
+    running ones are left to be stopped by the server side limit.
+    """
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    started = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(names))))
+    try:
+        futures = {executor.submit(_timed, run, name): name for name in names}
+        wait(futures, timeout=timeout)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for future, name in futures.items():
+        if future.done() and not future.cancelled():
+            results[name] = future.result()
+        else:
+            results[name] = (None, BatchTimeout(f"{name} did not finish in time"),
+                             time.perf_counter() - started)
+    return {name: results[name] for name in names}
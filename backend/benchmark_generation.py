@@ -0,0 +1,83 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+import generate_random_data as gen
+
+# Generators whose per-row cost used to grow with the Employee table
+WATCHED = ['generate_supervisors', 'generate_interviews']
+
+
+def time_generators(scale, seed, directory, chunk_size):
+    """Run every stage sequentially into files under directory.
+
+    Returns generator name -> (rows written, seconds).
+    """
+    counts = gen.row_counts(scale)
+    ranges = gen.plan_ranges(counts)
+    timings = {}
+    for stage in gen.STAGES:
+        gen._init_worker()
+        for generator, table in stage:
+            rows = 0
+            started = time.perf_counter()
+            for lo, hi in gen.split_range(*ranges[table], chunk_size):
+                stats = gen.run_slice((generator, lo, hi, seed, directory, 'tsv'))
+                rows += sum(count for count, _ in stats.values())
+            timings[generator.__name__] = (rows, time.perf_counter() - started)
+    return timings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Time each generator at increasing scales (writing to temporary files, "
+                    "no database needed) and check that the cost per row stays flat.")
+    parser.add_argument('--scales', default='1,10,100',
+                        help="comma-separated scale factors to compare")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--chunk-size', type=int, default=gen.CHUNK_SIZE)
+    parser.add_argument('--tolerance', type=float, default=3.0,
+                        help="largest allowed growth of microseconds per row between the "
+                             "smallest and largest scale for the watched generators")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scales = [float(s) for s in args.scales.split(',')]
+    results = {}
+    for scale in scales:
+        directory = tempfile.mkdtemp(prefix='xyz-bench-')
+        try:
+            results[scale] = time_generators(scale, args.seed, directory, args.chunk_size)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        employees = results[scale]['generate_employee_data'][0]
+        print(f"scale {scale:g}: {employees} employees")
+
+    header = f"{'Generator':<32}" + "".join(f"{f'us/row @{s:g}':>16}" for s in scales)
+    print(header)
+    for name in results[scales[0]]:
+        cells = []
+        for scale in scales:
+            rows, seconds = results[scale][name]
+            cells.append(f"{seconds / rows * 1e6:>16.1f}" if rows else f"{'-':>16}")
+        print(f"{name:<32}" + "".join(cells))
+
+    # Linear time means a flat cost per row across scales
+    failed = False
+    for name in WATCHED:
+        first_rows, first_seconds = results[scales[0]][name]
+        last_rows, last_seconds = results[scales[-1]][name]
+        if not first_rows or not last_rows:
+            continue
+        growth = (last_seconds / last_rows) / (first_seconds / first_rows)
+        status = 'ok' if growth <= args.tolerance else 'SUPERLINEAR'
+        failed |= growth > args.tolerance
+        print(f"{name}: cost per row x{growth:.2f} from scale {scales[0]:g} to {scales[-1]:g} ({status})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,278 @@
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import pymysql
+
+import generate_random_data as gen
+from queries import bind_query, predefined_queries
+
+# Longest a single execution may run before the server stops it
+QUERY_TIMEOUT_MS = int(os.getenv("BENCH_QUERY_TIMEOUT_MS", 60000))
+
+HANDLER_SQL = "SHOW SESSION STATUS LIKE 'Handler_read%'"
+
+# Counted tables, recorded with each scale so reports say how much data they ran on
+COUNTED_TABLES = ['Person', 'Employee', 'JobPosition', 'Application', 'Interview', 'Product',
+                  'Sale', 'Salary', 'Part', 'Vendor']
+
+
+def seed_database(scale, seed, workers, reset):
+    """Empty the database and fill it with generated data at a scale factor."""
+    gen.clear_existing_data(reset)
+    gen.suspend_summaries()
+    gen.run_stages(gen.row_counts(scale), seed, workers=workers)
+    gen.resume_summaries()
+
+
+def table_counts(cursor):
+    counts = {}
+    for table in COUNTED_TABLES:
+        cursor.execute(f"SELECT COUNT(*) FROM `{table}`")
+        counts[table] = cursor.fetchone()[0]
+    return counts
+
+
+def handler_reads(cursor):
+    cursor.execute(HANDLER_SQL)
+    return {name: int(value) for name, value in cursor.fetchall()}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def prepare_cold(cursor):
+    """Best effort at a cold run: close and reopen every table.
+
+    FLUSH TABLES needs the RELOAD privilege, and InnoDB's buffer pool keeps
+    its pages anyway, so "cold" means cold table cache, not cold disk.
+    Returns whether the flush happened.
+    """
+    try:
+        cursor.execute("FLUSH TABLES")
+        return True
+    except pymysql.MySQLError:
+        return False
+
+
+def time_query(cursor, query, overhead, args=None):
+    """Run a query once: (seconds, rows returned, handler read deltas)."""
+    before = handler_reads(cursor)
+    started = time.perf_counter()
+    cursor.execute(query, args or None)
+    rows = cursor.fetchall()
+    seconds = time.perf_counter() - started
+    after = handler_reads(cursor)
+    # SHOW STATUS touches handlers itself; subtract what one call costs
+    reads = {name: after[name] - before.get(name, 0) - overhead.get(name, 0) for name in after}
+    return seconds, len(rows), {name: max(0, value) for name, value in reads.items()}
+
+
+def benchmark_queries(conn, names, runs, timeout_ms=QUERY_TIMEOUT_MS):
+    """One cold and `runs` warm executions of every named query, with its
+    default parameters.
+
+    Returns name -> summary dict with latencies in milliseconds.
+    """
+    cursor = conn.cursor()
+    if timeout_ms:
+        try:
+            cursor.execute("SET SESSION max_execution_time = %s", (timeout_ms,))
+        except pymysql.MySQLError:
+            # MariaDB spells it max_statement_time, in seconds
+            cursor.execute("SET SESSION max_statement_time = %s", (timeout_ms / 1000,))
+    try:
+        # Servers that still have a query cache would answer warm runs from it
+        cursor.execute("SET SESSION query_cache_type = OFF")
+    except pymysql.MySQLError:
+        pass
+    first, second = handler_reads(cursor), handler_reads(cursor)
+    overhead = {name: second[name] - first.get(name, 0) for name in second}
+
+    results = {}
+    for name in names:
+        query, args, _values = bind_query(name)
+        try:
+            flushed = prepare_cold(cursor)
+            cold_seconds, rows, reads = time_query(cursor, query, overhead, args)
+            warm = [time_query(cursor, query, overhead, args) for _ in range(runs)]
+        except pymysql.MySQLError as err:
+            results[name] = {"error": str(err)}
+            print(f"  {name}: ERROR {err}")
+            continue
+        latencies = [seconds * 1000 for seconds, _, _ in warm]
+        examined = [sum(run_reads.values()) for _, _, run_reads in warm]
+        results[name] = {
+            "rows": rows,
+            "cold_ms": round(cold_seconds * 1000, 3),
+            "cold_flushed": flushed,
+            "cold_rows_examined": sum(reads.values()),
+            "p50_ms": round(percentile(latencies, 0.50), 3),
+            "p95_ms": round(percentile(latencies, 0.95), 3),
+            "p99_ms": round(percentile(latencies, 0.99), 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "rows_examined": int(statistics.median(examined)),
+            "handler_reads": {key: value for key, value in warm[-1][2].items() if value},
+        }
+        print(f"  {name}: p50 {results[name]['p50_ms']:.2f} ms, "
+              f"p99 {results[name]['p99_ms']:.2f} ms, {results[name]['rows_examined']} rows examined")
+    cursor.close()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    names = args.queries.split('|') if args.queries else list(predefined_queries)
+    unknown = [name for name in names if name not in predefined_queries]
+    if unknown:
+        print(f"Unknown queries: {', '.join(unknown)}")
+        return 2
+    scales = [float(s) for s in args.scales.split(',')] if args.seed_data else [None]
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "runs": args.runs,
+        "seed": args.seed,
+        "scales": {},
+    }
+    for scale in scales:
+        if scale is not None:
+            print(f"Seeding scale {scale:g}...")
+            seed_database(scale, args.seed, args.workers or os.cpu_count(), args.reset)
+        conn = gen.connect_to_db()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT VERSION()")
+            report["server"] = cursor.fetchone()[0]
+            counts = table_counts(cursor)
+            cursor.execute("ANALYZE TABLE " + ", ".join(f"`{table}`" for table in COUNTED_TABLES))
+            cursor.fetchall()
+            cursor.close()
+            label = "current" if scale is None else f"{scale:g}"
+            print(f"Scale {label}: {counts['Person']} persons, {counts['Sale']} sales")
+            report["scales"][label] = {
+                "tables": counts,
+                "queries": benchmark_queries(conn, names, args.runs, args.timeout_ms),
+            }
+        finally:
+            conn.close()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Report written to {args.output}")
+    print_growth(report)
+    return 0
+
+
+def print_growth(report):
+    """Latency growth per query against data growth, smallest to largest scale."""
+    labels = list(report["scales"])
+    if len(labels) < 2:
+        return
+    first, last = report["scales"][labels[0]], report["scales"][labels[-1]]
+    data_growth = last["tables"]["Person"] / max(1, first["tables"]["Person"])
+    print(f"\nGrowth from scale {labels[0]} to {labels[-1]} (data x{data_growth:.0f}):")
+    for name, before in first["queries"].items():
+        after = last["queries"].get(name, {})
+        if "p50_ms" not in before or "p50_ms" not in after:
+            continue
+        latency = after["p50_ms"] / max(before["p50_ms"], 0.001)
+        examined = after["rows_examined"] / max(1, before["rows_examined"])
+        flag = "  SUPERLINEAR" if examined > data_growth * 2 else ""
+        print(f"  {name:<55} p50 x{latency:<8.1f} examined x{examined:<8.1f}{flag}")
+
+
+def compare(args):
+    """Exit 1 if any query got slower or examines more rows than allowed."""
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.report) as f:
+        current = json.load(f)
+
+    regressions = 0
+    for scale, old in baseline["scales"].items():
+        new = current["scales"].get(scale)
+        if new is None:
+            print(f"Scale {scale}: missing from {args.report}")
+            continue
+        print(f"Scale {scale}:")
+        for name, before in old["queries"].items():
+            after = new["queries"].get(name)
+            if after is None or "p50_ms" not in before or "p50_ms" not in after:
+                print(f"  {name}: not comparable")
+                continue
+            ratio = after["p50_ms"] / max(before["p50_ms"], 0.001)
+            examined = after["rows_examined"] / max(1, before["rows_examined"])
+            # Tiny queries jitter by large ratios; require an absolute change too
+            slower = ratio > args.threshold and after["p50_ms"] - before["p50_ms"] > args.min_ms
+            status = "REGRESSION" if slower or examined > args.threshold else "ok"
+            regressions += status != "ok"
+            print(f"  {name:<55} p50 {before['p50_ms']:>9.2f} -> {after['p50_ms']:>9.2f} ms "
+                  f"(x{ratio:.2f}), examined x{examined:.2f}  {status}")
+    print(f"{regressions} regression(s)")
+    return 1 if regressions else 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the predefined queries at several data scales against the "
+                    "database configured by DB_HOST/DB_USER/DB_PASSWORD/DB_NAME.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="seed each scale, time every query, write a report "
+                                                 "(this empties the database)")
+    run_parser.add_argument('--scales', default='1,10',
+                            help="comma-separated scale factors passed to the random data generator")
+    run_parser.add_argument('--no-seed', dest='seed_data', action='store_false',
+                            help="benchmark the data already in the database instead of seeding")
+    run_parser.add_argument('--runs', type=int, default=20, help="warm executions per query")
+    run_parser.add_argument('--queries', help="'|'-separated query names (all by default)")
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--workers', type=int, default=1,
+                            help="generator processes (0 means one per core)")
+    run_parser.add_argument('--reset', choices=gen.RESET_MODES, default='truncate')
+    run_parser.add_argument('--timeout-ms', type=int, default=QUERY_TIMEOUT_MS,
+                            help="server side limit per execution (0 for none)")
+    run_parser.add_argument('--output', default='query-benchmark.json')
+
+    compare_parser = commands.add_parser('compare', help="diff two reports and flag regressions")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('report')
+    compare_parser.add_argument('--threshold', type=float, default=1.5,
+                                help="largest allowed ratio of p50 latency or rows examined")
+    compare_parser.add_argument('--min-ms', type=float, default=1.0,
+                                help="latency changes smaller than this never count as regressions")
+    args = parser.parse_args(argv)
+    if args.command == 'run' and args.runs < 1:
+        # The percentiles need at least one warm execution
+        parser.error("--runs must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == 'run':
+        return run(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
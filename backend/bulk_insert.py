@@ -0,0 +1,260 @@
+import glob
+import os
+import re
+import time
+
+# Rows sent per multi-row INSERT, overridable through the environment
+BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', 1000))
+
+# table -> [rows written, seconds spent], accumulated across writers
+load_stats = {}
+
+
+class BatchWriter:
+    """Accumulates rows for one table and writes them with executemany.
+
+    Both pymysql and mysql-connector rewrite executemany on an INSERT ... VALUES
+    statement into multi-row INSERTs, so each flush is a single round trip.
+    Given a DelimitedFileSink instead of a connection, batches are appended to
+    the sink's files. Use as a context manager so the final partial batch is
+    flushed.
+    """
+
+    def __init__(self, conn, table, columns, batch_size=BATCH_SIZE, update_columns=None,
+                 label=None, parents=()):
+        self.conn = conn
+        self.table = table
+        self.label = label or table
+        self.columns = list(columns)
+        self.upsert = bool(update_columns)
+        # Writers for referenced tables, flushed first so foreign keys resolve
+        self.parents = list(parents)
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+        self.sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join(['%s'] * len(columns))})"
+        )
+        if update_columns:
+            # Batched upsert, used to fill in columns after the fact
+            self.sql += " ON DUPLICATE KEY UPDATE " + ", ".join(
+                f"{column} = VALUES({column})" for column in update_columns
+            )
+        self.cursor = None if isinstance(conn, DelimitedFileSink) else conn.cursor()
+        self.started = None
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        if self.rows:
+            for parent in self.parents:
+                parent.flush()
+            if self.cursor is None:
+                self.conn.write_rows(self.table, self.columns, self.rows, upsert=self.upsert)
+            else:
+                self.cursor.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        if self.cursor is not None:
+            self.cursor.close()
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+            stats = load_stats.setdefault(self.label, [0, 0.0])
+            stats[0] += self.count
+            stats[1] += time.perf_counter() - self.started
+        elif self.cursor is not None:
+            self.cursor.close()
+
+
+def report_load_stats():
+    """Print rows written and rows/sec for every table loaded so far."""
+    print(f"{'Table':<30}{'Rows':>12}{'Seconds':>10}{'Rows/sec':>12}")
+    for table, (rows, seconds) in load_stats.items():
+        rate = rows / seconds if seconds else 0
+        print(f"{table:<30}{rows:>12}{seconds:>10.2f}{rate:>12.0f}")
+
+
+# Delimited files use the default LOAD DATA conventions: backslash escapes,
+# \N for NULL and one row per line. The delimiter itself is escaped too, so
+# no quoting is needed for CSV.
+_ESCAPES = {'\\': '\\\\', '\n': '\\n', '\r': '\\r', '\t': '\\t', '\0': '\\0'}
+_UNESCAPES = {'n': '\n', 'r': '\r', 't': '\t', '0': '\0', 'N': None}
+DELIMITERS = {'tsv': '\t', 'csv': ','}
+
+
+def encode_value(value, delimiter):
+    if value is None:
+        return '\\N'
+    text = str(value)
+    for char, escaped in _ESCAPES.items():
+        text = text.replace(char, escaped)
+    if delimiter != '\t':
+        text = text.replace(delimiter, '\\' + delimiter)
+    return text
+
+
+def decode_line(line, delimiter):
+    """Split one delimited line back into values (None for \\N)."""
+    values, field, escaped_null = [], [], False
+    chars = iter(line.rstrip('\n'))
+    for char in chars:
+        if char == '\\':
+            char = next(chars, '')
+            if char == 'N' and not field:
+                escaped_null = True
+                continue
+            field.append(_UNESCAPES.get(char, char))
+        elif char == delimiter:
+            values.append(None if escaped_null else ''.join(field))
+            field, escaped_null = [], False
+        else:
+            field.append(char)
+    values.append(None if escaped_null else ''.join(field))
+    return values
+
+
+class DelimitedFileSink:
+    """Writes generated rows to per-table delimited files instead of a database.
+
+    Every slice of a table goes to its own file, <directory>/<Table>/<first>-<last>-<name>.<ext>,
+    so concurrent workers never share a file. Each file starts with a header line
+    naming its columns. Rows written by upsert writers go to .upsert files that
+    load_delimited_files() applies after the plain loads.
+    """
+
+    def __init__(self, directory, first_id=0, last_id=0, name='rows', file_format='tsv'):
+        self.directory = directory
+        self.first_id = first_id
+        self.last_id = last_id
+        self.name = name
+        self.file_format = file_format
+        self.delimiter = DELIMITERS[file_format]
+        self._files = {}
+
+    def path(self, table, upsert=False):
+        suffix = '.upsert' if upsert else ''
+        return os.path.join(self.directory, table,
+                            f"{self.first_id:012d}-{self.last_id:012d}-{self.name}{suffix}.{self.file_format}")
+
+    def write_rows(self, table, columns, rows, upsert=False):
+        path = self.path(table, upsert)
+        f = self._files.get(path)
+        if f is None:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = self._files[path] = open(path, 'w', encoding='utf-8', newline='')
+            f.write(self.delimiter.join(columns) + '\n')
+        d = self.delimiter
+        f.writelines(d.join(encode_value(value, d) for value in row) + '\n' for row in rows)
+
+    def select(self, table, columns, first_id=None, last_id=None, **equals):
+        """Integer key columns of rows already written for a table, ordered by the first.
+
+        Only files whose slice overlaps first_id..last_id are read.
+        """
+        self.commit()
+        rows = []
+        for path in sorted(glob.glob(os.path.join(self.directory, table, f"*.{self.file_format}"))):
+            match = re.match(r'(\d+)-(\d+)-', os.path.basename(path))
+            if first_id is not None and (int(match.group(2)) < first_id or int(match.group(1)) > last_id):
+                continue
+            if path.endswith(f".upsert.{self.file_format}"):
+                continue
+            with open(path, encoding='utf-8', newline='') as f:
+                header = decode_line(f.readline(), self.delimiter)
+                picks = [header.index(column) for column in columns]
+                filters = [(header.index(column), str(value)) for column, value in equals.items()]
+                for line in f:
+                    values = decode_line(line, self.delimiter)
+                    if any(values[i] != value for i, value in filters):
+                        continue
+                    row = tuple(int(values[i]) for i in picks)
+                    if first_id is None or first_id <= row[0] <= last_id:
+                        rows.append(row)
+        rows.sort()
+        return rows
+
+    def commit(self):
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+def load_delimited_files(conn, directory, tables):
+    """Bulk load every file under directory with LOAD DATA LOCAL INFILE.
+
+    Tables are loaded in the given (foreign key) order, then upsert files are
+    applied through a temporary table. The connection must allow local_infile.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SET foreign_key_checks = 0")
+    upserts = []
+    for table in tables:
+        paths = sorted(glob.glob(os.path.join(directory, table, '*.*sv')))
+        if not paths:
+            continue
+        started = time.perf_counter()
+        rows = 0
+        for path in paths:
+            if '.upsert.' in os.path.basename(path):
+                upserts.append((table, path))
+                continue
+            rows += _load_file(cursor, table, path)
+        stats = load_stats.setdefault(table, [0, 0.0])
+        stats[0] += rows
+        stats[1] += time.perf_counter() - started
+        print(f"Loaded {table} from {len(paths)} file(s)")
+
+    for table, path in upserts:
+        columns = _read_header(path)
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS _upsert")
+        cursor.execute(f"CREATE TEMPORARY TABLE _upsert SELECT {', '.join(columns)} FROM {table} LIMIT 0")
+        _load_file(cursor, '_upsert', path)
+        key, updates = columns[0], columns[1:]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM _upsert "
+            f"ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in updates)
+        )
+        cursor.execute("DROP TEMPORARY TABLE _upsert")
+
+    cursor.execute("SET foreign_key_checks = 1")
+    conn.commit()
+    cursor.close()
+
+
+def _read_header(path):
+    delimiter = DELIMITERS[path.rsplit('.', 1)[1]]
+    with open(path, encoding='utf-8', newline='') as f:
+        return decode_line(f.readline(), delimiter)
+
+
+def _load_file(cursor, table, path):
+    delimiter = DELIMITERS[path.rsplit('.', 1)[1]]
+    columns = _read_header(path)
+    terminator = '\\t' if delimiter == '\t' else delimiter
+    return cursor.execute(
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+        f"FIELDS TERMINATED BY '{terminator}' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+        f"IGNORE 1 LINES ({', '.join(columns)})",
+        (os.path.abspath(path),)
+    )
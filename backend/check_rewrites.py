@@ -0,0 +1,151 @@
+import argparse
+import os
+import statistics
+import time
+from collections import Counter
+
+import pymysql
+
+import benchmark_queries
+import generate_random_data as gen
+from queries import bind_query, original_queries
+
+# Data changes that reach the NULL and duplicate cases generated data never
+# contains. Each runs in a transaction that is rolled back afterwards.
+SCENARIOS = [
+    ("as generated", []),
+    ("March sale without a site", [
+        "INSERT INTO Sale (SalesID, SiteID, SalesTime) "
+        "SELECT COALESCE(MAX(SalesID), 0) + 1, NULL, '2011-03-15' FROM Sale",
+    ]),
+    ("second Marketing department", [
+        "INSERT INTO Department (Department_ID, DepartmentName) "
+        "SELECT COALESCE(MAX(Department_ID), 0) + 1, 'Marketing' FROM Department",
+    ]),
+    ("untyped product over $200", [
+        "INSERT INTO Product (ProductID, ProductType, ListPrice) "
+        "SELECT COALESCE(MAX(ProductID), 0) + 1, NULL, 999 FROM Product",
+    ]),
+    ("untyped product sold", [
+        "INSERT INTO Product (ProductID, ProductType, ListPrice) "
+        "SELECT COALESCE(MAX(ProductID), 0) + 1, NULL, 10 FROM Product",
+        "INSERT INTO Sale (SalesID, SalesPersonID, ProductID, SalesTime, Amount) "
+        "SELECT (SELECT COALESCE(MAX(SalesID), 0) + 1 FROM Sale), "
+        "(SELECT MIN(PersonID) FROM Employee), MAX(ProductID), '2012-01-01', 10 FROM Product",
+    ]),
+    ("no products over $200", [
+        "UPDATE Product SET ListPrice = 200 WHERE ListPrice > 200",
+    ]),
+]
+
+
+def fetch_bag(cursor, query, args):
+    """Result rows as a multiset, so order is ignored but duplicates are not."""
+    cursor.execute(query, args or None)
+    return Counter(tuple(row) for row in cursor.fetchall())
+
+
+def compare_results(cursor, names):
+    """Names whose rewrite disagrees with the original: {name: (missing, extra)}."""
+    differences = {}
+    for name in names:
+        expected = fetch_bag(cursor, *bind_query(name, queries=original_queries)[:2])
+        actual = fetch_bag(cursor, *bind_query(name)[:2])
+        if expected != actual:
+            differences[name] = (expected - actual, actual - expected)
+    return differences
+
+
+def check_scenarios(conn, names):
+    """Compare every query in every scenario: (mismatches, scenarios that failed to run)."""
+    failed = errors = 0
+    cursor = conn.cursor()
+    for label, statements in SCENARIOS:
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+            differences = compare_results(cursor, names)
+        except pymysql.MySQLError as err:
+            # Nothing was compared, which must not pass for agreement
+            errors += 1
+            print(f"  {label}: ERROR ({err})")
+            continue
+        finally:
+            conn.rollback()
+        for name in names:
+            if name in differences:
+                missing, extra = differences[name]
+                failed += 1
+                print(f"  {label}: {name}: DIFFERENT "
+                      f"(missing {sorted(missing.elements())[:5]}, extra {sorted(extra.elements())[:5]})")
+            else:
+                print(f"  {label}: {name}: same")
+    cursor.close()
+    return failed, errors
+
+
+def median_ms(cursor, query, args, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        cursor.execute(query, args or None)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def benchmark(conn, names, runs):
+    cursor = conn.cursor()
+    for name in names:
+        try:
+            before = median_ms(cursor, *bind_query(name, queries=original_queries)[:2], runs)
+            after = median_ms(cursor, *bind_query(name)[:2], runs)
+        except pymysql.MySQLError as err:
+            print(f"  {name}: ERROR {err}")
+            continue
+        print(f"  {name:<45} {before:>10.2f} ms -> {after:>9.2f} ms  (x{before / max(after, 0.001):.1f})")
+    cursor.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check that the rewritten predefined queries return exactly what their "
+                    "original formulations return, and time both.")
+    parser.add_argument('--scales', default=None,
+                        help="comma-separated scale factors to seed and check in turn "
+                             "(empties the database); by default the current data is used")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=5, help="timed executions of each version")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = list(original_queries)
+    scales = [float(s) for s in args.scales.split(',')] if args.scales else [None]
+    failed = errors = 0
+    for scale in scales:
+        if scale is not None:
+            print(f"Seeding scale {scale:g}...")
+            benchmark_queries.seed_database(scale, args.seed, args.workers or os.cpu_count(), 'truncate')
+        conn = gen.connect_to_db()
+        try:
+            print("Result equivalence:")
+            scale_failed, scale_errors = check_scenarios(conn, names)
+            failed += scale_failed
+            errors += scale_errors
+            if args.runs:
+                print("Median latency, original -> rewritten:")
+                benchmark(conn, names, args.runs)
+        finally:
+            conn.close()
+    if failed or errors:
+        print(f"❌ {failed} mismatch(es), {errors} scenario(s) failed to run")
+        return 1
+    print("✅ Rewrites match the original queries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
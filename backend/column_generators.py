@@ -0,0 +1,132 @@
+"""Whole columns of random values for the data generators, drawn with NumPy."""
+import os
+import zlib
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+from faker import Faker
+
+# Values sampled from Faker for each vocabulary, once per process since Faker is slow per call
+VOCABULARY_SIZE = int(os.getenv("GEN_VOCABULARY_SIZE", 2000))
+
+
+@lru_cache(maxsize=None)
+def vocabulary(provider, max_length):
+    """Distinct values among VOCABULARY_SIZE draws from a Faker provider, cut to a
+    column's length; fewer than VOCABULARY_SIZE where draws repeat.
+
+    Seeded by the provider name alone, so every process and every --seed
+    draws from the same pool.
+    """
+    fake = Faker()
+    fake.seed_instance(zlib.crc32(provider.encode()))
+    method = getattr(fake, provider)
+    values = {method()[:max_length] for _ in range(VOCABULARY_SIZE)}
+    return np.array(sorted(values), dtype=object)
+
+
+def choice(rng, values, n):
+    """n values drawn uniformly, with replacement, from a sequence."""
+    values = values if isinstance(values, np.ndarray) else np.asarray(values)
+    return values[rng.integers(0, len(values), n)]
+
+
+def words(rng, provider, max_length, n):
+    return choice(rng, vocabulary(provider, max_length), n)
+
+
+def integers(rng, low, high, n):
+    """Integers in [low, high], both ends included."""
+    return rng.integers(low, high + 1, n)
+
+
+def amounts(rng, low, high, n):
+    """Money amounts in [low, high] rounded to cents."""
+    return np.round(rng.uniform(low, high, n), 2)
+
+
+def datetimes_between(rng, start, end, n):
+    """Times to the second between two datetimes."""
+    span = int((end - start).total_seconds())
+    return np.datetime64(start, 's') + rng.integers(0, span + 1, n).astype('timedelta64[s]')
+
+
+def dates_between(rng, start, end, n):
+    """Days between two dates or datetimes, both ends included."""
+    start, end = np.datetime64(start, 'D'), np.datetime64(end, 'D')
+    return start + rng.integers(0, (end - start).astype(np.int64) + 1, n).astype('timedelta64[D]')
+
+
+def add_days(times, days):
+    return times + np.asarray(days).astype('timedelta64[D]')
+
+
+def sample_distinct(rng, count, picks, n):
+    """n rows of `picks` distinct indices into range(count), as an (n, picks) array.
+
+    Each pick is drawn from the indices left and shifted past the ones
+    already taken, so there are no redraws.
+    """
+    taken = np.empty((n, 0), dtype=np.int64)
+    for j in range(picks):
+        pick = rng.integers(0, count - j, n)
+        for column in np.sort(taken, axis=1).T:
+            pick += pick >= column
+        taken = np.column_stack([taken, pick])
+    return taken
+
+
+def earlier(rng, values, own):
+    """For each own value (an element of sorted values other than the first), a
+    random element of values smaller than it.
+
+    Links drawn this way always point to a smaller value, so they never form
+    a cycle.
+    """
+    values = np.asarray(values)
+    positions = np.searchsorted(values, own)
+    return values[(rng.random(len(own)) * positions).astype(np.int64)]
+
+
+def emails(rng, first_names, last_names):
+    """first.last<number>@domain addresses, lower case, at most 100 characters."""
+    numbers = integers(rng, 1, 999, len(first_names)).tolist()
+    domains = words(rng, 'free_email_domain', 50, len(first_names)).tolist()
+    return np.array([f"{first}.{last}{number}@{domain}".lower()[:100] for first, last, number, domain
+                     in zip(first_names.tolist(), last_names.tolist(), numbers, domains)], dtype=object)
+
+
+def phone_numbers(rng, n):
+    """NNN-NNN-NNNN numbers whose area code and prefix don't start with 0 or 1."""
+    parts = zip(integers(rng, 200, 999, n).tolist(), integers(rng, 200, 999, n).tolist(),
+                integers(rng, 1000, 9999, n).tolist())
+    return np.array([f"{area}-{prefix}-{line}" for area, prefix, line in parts], dtype=object)
+
+
+def interleave(first, second, has_second):
+    """first[0], second[0] if has_second[0], first[1], ...: one or two rows per parent."""
+    keep = np.column_stack([np.ones(len(first), dtype=bool), has_second]).ravel()
+    return np.column_stack([first, second]).ravel()[keep]
+
+
+def group_positions(counts):
+    """1, 2, ..., counts[0], 1, 2, ..., counts[1], ...: position of each row within its parent."""
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(int(np.sum(counts))) - starts + 1
+
+
+def rows(*columns):
+    """Row tuples of plain Python values (ints, floats, str, datetime, None)."""
+    return zip(*(column.tolist() if isinstance(column, np.ndarray) else column for column in columns))
+
+
+def monthly(year, day):
+    """The given day of each month of a year."""
+    return np.array([datetime(year, month, day) for month in range(1, 13)], dtype=object)
+
+
+def as_objects(times):
+    """datetime64 values as datetime objects in an object array, so None can be mixed in."""
+    return np.array(times.astype('datetime64[s]').tolist(), dtype=object)
+
@@ -0,0 +1,88 @@
+import base64
+import datetime
+import decimal
+import gzip
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library
+    orjson = None
+
+# Responses smaller than this are not worth compressing
+GZIP_MIN_BYTES = int(os.getenv("API_GZIP_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("API_GZIP_LEVEL", 5))
+
+# Python value type -> column type reported to clients, most specific first
+_TYPES = [
+    (bool, "bool"),
+    (int, "int"),
+    (float, "float"),
+    (decimal.Decimal, "decimal"),
+    (datetime.datetime, "datetime"),
+    (datetime.date, "date"),
+    (datetime.timedelta, "time"),
+    ((bytes, bytearray), "binary"),
+    (str, "string"),
+]
+
+
+def column_type(values):
+    """Type name of a column, from its first non-NULL value."""
+    for value in values:
+        if value is not None:
+            for python_type, name in _TYPES:
+                if isinstance(value, python_type):
+                    return name
+            return "string"
+    return "null"
+
+
+def _encoder(kind):
+    # Decimals travel as strings so no precision is lost on the way
+    if kind == "decimal":
+        return str
+    if kind in ("datetime", "date"):
+        return lambda value: value.isoformat()
+    if kind == "time":
+        return lambda value: str(value)
+    if kind == "binary":
+        return lambda value: base64.b64encode(value).decode()
+    if kind == "string":
+        return str
+    return None
+
+
+def to_columnar(columns, rows):
+    """Encode a result set column by column.
+
+    Names and types appear once instead of on every row, and each column's
+    values form one array, which also compresses better than row objects.
+    """
+    data = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+    described = []
+    for name, values in zip(columns, data):
+        kind = column_type(values)
+        encode = _encoder(kind)
+        if encode is not None:
+            values[:] = [None if value is None else encode(value) for value in values]
+        described.append({"name": name, "type": kind})
+    return {"columns": described, "data": data, "rowCount": len(rows)}
+
+
+def dumps(payload):
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+def encode_json(payload, accept_encoding=""):
+    """(body, headers) for a JSON payload, gzipped when the client accepts it."""
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in accept_encoding:
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
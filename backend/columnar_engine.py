@@ -0,0 +1,1024 @@
+"""In-memory columnar execution of the predefined queries.
+
+A ColumnarSnapshot holds the tables the predefined queries read as NumPy
+arrays: integers as int64, DECIMAL values as integers scaled by 10**scale,
+dates and timestamps as datetime64 and strings dictionary-encoded. `plans`
+maps every predefined query to a function that evaluates it over a snapshot
+with vectorized joins, group-bys and anti-joins, following MySQL's NULL
+semantics and its case- and accent-insensitive string comparisons, so the
+rows are the ones MySQL returns.
+
+    python backend/columnar_engine.py check    # every query, engine vs MySQL
+    python backend/columnar_engine.py bench    # cold and warm latency per query
+"""
+import argparse
+import logging
+import math
+import os
+import re
+import statistics
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from queries import bind_query, predefined_queries, query_params, query_tables
+
+# Seconds a snapshot serves queries before it is refreshed in the background
+COLUMNAR_REFRESH_SECONDS = float(os.getenv("COLUMNAR_REFRESH_SECONDS", 300))
+# Results kept per snapshot, by query and parameter values
+COLUMNAR_RESULT_CACHE_SIZE = int(os.getenv("COLUMNAR_RESULT_CACHE_SIZE", 256))
+# Rows fetched per round trip while loading a table
+COLUMNAR_LOAD_BATCH_SIZE = int(os.getenv("COLUMNAR_LOAD_BATCH_SIZE", 10000))
+# Engines kept at once, one per database; each holds a full snapshot in memory
+COLUMNAR_MAX_ENGINES = int(os.getenv("COLUMNAR_MAX_ENGINES", 4))
+
+COLUMNS_SQL = """
+    SELECT TABLE_NAME, COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+# information_schema data type -> column kind
+KINDS = {
+    "tinyint": "int", "smallint": "int", "mediumint": "int", "int": "int", "bigint": "int",
+    "decimal": "decimal",
+    "date": "date",
+    "datetime": "datetime", "timestamp": "datetime",
+    "char": "string", "varchar": "string", "tinytext": "string", "text": "string",
+}
+
+# Every table some predefined query reads
+SNAPSHOT_TABLES = sorted(set().union(*query_tables.values()))
+
+logger = logging.getLogger(__name__)
+
+
+class EngineError(Exception):
+    """Raised where MySQL would reject the query, with MySQL's message."""
+
+
+def collation_key(value):
+    """Comparison key of a string under an accent- and case-insensitive collation."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class Column:
+    """One column of a snapshot table: values plus a NULL mask.
+
+    kind is 'int', 'decimal' (values scaled by 10**scale), 'date', 'datetime'
+    or 'string' (values are codes into dictionary, -1 for NULL). nulls is
+    None when the column has no NULLs.
+    """
+
+    def __init__(self, kind, values, nulls=None, dictionary=None, scale=0):
+        self.kind = kind
+        self.values = values
+        self.nulls = nulls if nulls is not None and nulls.any() else None
+        self.dictionary = dictionary
+        self.scale = scale
+        self.cache = {}
+
+    @classmethod
+    def from_values(cls, kind, values, scale=0):
+        """Build a column from Python values as a DB-API driver returns them (None for NULL)."""
+        values = list(values)
+        nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        if kind == "string":
+            codes = {}
+            encoded = np.fromiter((-1 if value is None else codes.setdefault(value, len(codes))
+                                   for value in values), dtype=np.int32, count=len(values))
+            dictionary = np.empty(len(codes), dtype=object)
+            dictionary[:] = list(codes)
+            return cls(kind, encoded, nulls, dictionary)
+        if kind == "int":
+            return cls(kind, np.fromiter((0 if value is None else int(value) for value in values),
+                                         dtype=np.int64, count=len(values)), nulls)
+        if kind == "decimal":
+            return cls(kind, np.fromiter((0 if value is None else int(Decimal(value).scaleb(scale))
+                                          for value in values), dtype=np.int64, count=len(values)),
+                       nulls, scale=scale)
+        unit = "D" if kind == "date" else "s"
+        return cls(kind, np.array(values, dtype=f"datetime64[{unit}]"), nulls)
+
+    def __len__(self):
+        return len(self.values)
+
+    def valid(self):
+        """Mask of the non-NULL rows."""
+        return np.ones(len(self.values), dtype=bool) if self.nulls is None else ~self.nulls
+
+    def python(self, rows):
+        """Values at row indexes as the Python objects a driver returns."""
+        if self.kind == "string":
+            codes = self.values[rows]
+            return [None if code < 0 else self.dictionary[code] for code in codes.tolist()]
+        if self.kind == "decimal":
+            values = [Decimal(value).scaleb(-self.scale) for value in self.values[rows].tolist()]
+        else:
+            values = self.values[rows].tolist()
+        if self.nulls is not None:
+            values = [None if null else value for null, value in zip(self.nulls[rows].tolist(), values)]
+        return values
+
+    def collation_ids(self):
+        """For a string column: (id of each dictionary code under the collation, key -> id)."""
+        if "collation" not in self.cache:
+            ids = {}
+            code_ids = np.fromiter((ids.setdefault(collation_key(value), len(ids))
+                                    for value in self.dictionary), dtype=np.int64, count=len(self.dictionary))
+            self.cache["collation"] = (code_ids, ids)
+        return self.cache["collation"]
+
+    def group_ids(self):
+        """Per row: collation id of a string (-1 for NULL), so equal strings share a group."""
+        code_ids, _ = self.collation_ids()
+        return np.where(self.values >= 0, code_ids[np.maximum(self.values, 0)], -1)
+
+
+class ColumnTable:
+    """The columns of one table, all of the same length."""
+
+    def __init__(self, name, columns):
+        self.name = name
+        self.columns = columns
+        self.rows = len(next(iter(columns.values()))) if columns else 0
+        self.cache = {}
+
+    def __getitem__(self, column):
+        try:
+            return self.columns[column]
+        except KeyError:
+            raise EngineError(f"Unknown column '{column}' in table '{self.name}'") from None
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def __len__(self):
+        return self.rows
+
+    @classmethod
+    def from_rows(cls, name, columns, rows):
+        """Build a table from (name, kind, scale) column specs and row tuples."""
+        values = list(zip(*rows)) or [()] * len(columns)
+        return cls(name, {column: Column.from_values(kind, column_values, scale or 0)
+                          for (column, kind, scale), column_values in zip(columns, values)})
+
+
+class ColumnarSnapshot:
+    """Tables as of one load, with the results computed from them so far."""
+
+    def __init__(self, tables, versions=None):
+        self.tables = tables
+        self.versions = versions or {}
+        self.loaded_at = time.time()
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.cache = {}
+
+    def table(self, name):
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise EngineError(f"Table '{name}' is not in the snapshot") from None
+
+    def execute(self, name, values=None):
+        """(columns, rows) of a predefined query; results are kept per parameter values."""
+        _sql, _args, bound = bind_query(name, values)
+        key = (name, tuple(sorted(bound.items())))
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                return self.results[key]
+        typed = {param.name: param.parse(bound[param.name]) for param in query_params.get(name, ())}
+        result = plans[name](self, typed)
+        with self.lock:
+            self.results[key] = result
+            while len(self.results) > COLUMNAR_RESULT_CACHE_SIZE:
+                self.results.popitem(last=False)
+        return result
+
+
+# Loading
+
+def snapshot_columns(cursor, tables=SNAPSHOT_TABLES):
+    """Column specs (name, kind, scale) of each table, from information_schema."""
+    cursor.execute(COLUMNS_SQL)
+    columns = {}
+    for table, column, data_type, scale in cursor.fetchall():
+        if table in tables and data_type.lower() in KINDS:
+            columns.setdefault(table, []).append((column, KINDS[data_type.lower()], scale or 0))
+    return columns
+
+
+def table_versions(cursor, tables):
+    """CHECKSUM TABLE of each table: unchanged checksums mean unchanged contents."""
+    cursor.execute("CHECKSUM TABLE " + ", ".join(f"`{table}`" for table in tables))
+    # Names come back qualified with the schema
+    return {name.rsplit(".", 1)[-1]: checksum for name, checksum in cursor.fetchall()}
+
+
+def load_table(cursor, table, columns, batch_size=COLUMNAR_LOAD_BATCH_SIZE):
+    cursor.execute(f"SELECT {', '.join(f'`{name}`' for name, _, _ in columns)} FROM `{table}`")
+    rows = []
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        rows.extend(batch)
+    return ColumnTable.from_rows(table, columns, rows)
+
+
+def load_snapshot(conn, previous=None, tables=SNAPSHOT_TABLES):
+    """Snapshot the tables over a DB-API connection.
+
+    Tables whose checksum matches the previous snapshot are reused rather
+    than read again. Returns (snapshot, names of the tables read).
+    """
+    cursor = conn.cursor()
+    try:
+        columns = snapshot_columns(cursor, tables)
+        versions = table_versions(cursor, list(columns))
+        loaded, reloaded = {}, []
+        for table, specs in columns.items():
+            version = versions.get(table)
+            if (previous is not None and version is not None and previous.versions.get(table) == version
+                    and table in previous.tables):
+                loaded[table] = previous.tables[table]
+            else:
+                loaded[table] = load_table(cursor, table, specs)
+                reloaded.append(table)
+    finally:
+        cursor.close()
+    return ColumnarSnapshot(loaded, versions), reloaded
+
+
+class ColumnarEngine:
+    """Answers predefined queries from a snapshot refreshed every `refresh` seconds.
+
+    connect() returns a DB-API connection to snapshot from. The first query
+    loads the snapshot; after that, stale snapshots are refreshed in a
+    background thread while queries keep reading the current one.
+    """
+
+    def __init__(self, connect, refresh=COLUMNAR_REFRESH_SECONDS):
+        self.connect = connect
+        self.refresh_seconds = refresh
+        self._snapshot = None
+        self._lock = threading.Lock()
+        # Held while a snapshot loads, so concurrent first queries share one load
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self.stats = {"loads": 0, "tables_reloaded": 0, "refresh_errors": 0}
+
+    def snapshot(self):
+        with self._lock:
+            snapshot = self._snapshot
+            stale = snapshot is not None and time.time() - snapshot.loaded_at > self.refresh_seconds
+            if stale and not self._refreshing:
+                self._refreshing = True
+                threading.Thread(target=self._refresh_in_background, daemon=True).start()
+        if snapshot is not None:
+            return snapshot
+        with self._load_lock:
+            return self._snapshot if self._snapshot is not None else self._load()
+
+    def refresh(self):
+        """Load a new snapshot now, reusing unchanged tables, and serve it."""
+        with self._load_lock:
+            return self._load()
+
+    def _load(self):
+        conn = self.connect()
+        try:
+            snapshot, reloaded = load_snapshot(conn, self._snapshot)
+        finally:
+            conn.close()
+        with self._lock:
+            self._snapshot = snapshot
+            self.stats["loads"] += 1
+            self.stats["tables_reloaded"] += len(reloaded)
+        logger.info(f"Columnar snapshot loaded ({len(reloaded)} of {len(snapshot.tables)} tables read)")
+        return snapshot
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception:
+            self.stats["refresh_errors"] += 1
+            logger.exception("Columnar snapshot refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def execute(self, name, values=None):
+        return self.snapshot().execute(name, values)
+
+    def metrics(self):
+        snapshot = self._snapshot
+        return dict(self.stats,
+                    age_seconds=round(time.time() - snapshot.loaded_at, 1) if snapshot else None,
+                    cached_results=len(snapshot.results) if snapshot else 0)
+
+
+# Vectorized building blocks
+
+def unique_index(table, column):
+    """(sorted keys, row of each key) over a column's non-NULL rows, built once per table."""
+    key = ("index", column)
+    if key not in table.cache:
+        col = table[column]
+        rows = np.flatnonzero(col.valid())
+        order = rows[np.argsort(col.values[rows], kind="stable")]
+        table.cache[key] = (col.values[order], order)
+    return table.cache[key]
+
+
+def lookup(table, column, probe):
+    """Join on a unique key: (matching row for each probe value, found mask)."""
+    keys, order = unique_index(table, column)
+    if not len(keys):
+        return np.zeros(len(probe), dtype=np.int64), np.zeros(len(probe), dtype=bool)
+    positions = np.minimum(np.searchsorted(keys, probe), len(keys) - 1)
+    return order[positions], keys[positions] == probe
+
+
+def join_many(table, column, probe, left=False):
+    """Join on a non-unique column: (probe position, matching row) for every match.
+
+    With left=True, probe values without a match get one pair with row -1.
+    """
+    keys, order = unique_index(table, column)
+    low = np.searchsorted(keys, probe, "left")
+    matched = np.searchsorted(keys, probe, "right") - low
+    counts = np.maximum(matched, 1) if left else matched
+    positions = np.repeat(np.arange(len(probe)), counts)
+    offsets = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    found = np.repeat(matched, counts) > 0
+    rows = np.full(len(positions), -1, dtype=np.int64)
+    rows[found] = order[(np.repeat(low, counts) + offsets)[found]]
+    return positions, rows
+
+
+def outer_values(column, rows):
+    """Column values at rows from a left join, None where row is -1."""
+    values = column.python(np.maximum(rows, 0)) if len(column) else [None] * len(rows)
+    return [None if row < 0 else value for row, value in zip(rows.tolist(), values)]
+
+
+def equals(column, value):
+    """Rows where an integer column equals a value."""
+    return column.valid() & (column.values == value)
+
+
+def string_equals(column, value):
+    """Rows where a string column equals a value under the collation."""
+    code_ids, ids = column.collation_ids()
+    wanted = ids.get(collation_key(value))
+    if wanted is None:
+        return np.zeros(len(column), dtype=bool)
+    return (column.values >= 0) & (code_ids[np.maximum(column.values, 0)] == wanted)
+
+
+def between(column, low, high):
+    """Rows where a date or timestamp column lies in [low, high]."""
+    unit = "D" if column.kind == "date" else "s"
+    low, high = np.datetime64(low, unit), np.datetime64(high, unit)
+    return column.valid() & (column.values >= low) & (column.values <= high)
+
+
+def above(column, value):
+    """Rows where a decimal column is greater than a Decimal value."""
+    return column.valid() & (column.values > math.floor(Decimal(value).scaleb(column.scale)))
+
+
+def below(column, value):
+    """Rows where a decimal column is less than a Decimal value."""
+    return column.valid() & (column.values < math.ceil(Decimal(value).scaleb(column.scale)))
+
+
+def add_months(days, months):
+    """DATE_ADD(day, INTERVAL months MONTH): the day of month is clamped to the month's length."""
+    month = days.astype("datetime64[M]")
+    day_of_month = (days - month.astype("datetime64[D]")).astype(np.int64)
+    target = month + months
+    month_length = ((target + 1).astype("datetime64[D]") - target.astype("datetime64[D]")).astype(np.int64)
+    return target.astype("datetime64[D]") + np.minimum(day_of_month, month_length - 1)
+
+
+def names(person, rows):
+    """CONCAT(p.FirstName, ' ', p.LastName) for Person rows."""
+    return [None if first is None or last is None else f"{first} {last}"
+            for first, last in zip(person["FirstName"].python(rows), person["LastName"].python(rows))]
+
+
+def group_sums(groups, values, size):
+    """Integer sum of values per group id in range(size).
+
+    Sums go through float64, exact while every partial sum stays below 2**53.
+    """
+    return np.rint(np.bincount(groups, weights=values, minlength=size)).astype(np.int64)
+
+
+def descending(values, nulls=None):
+    """Order of rows by value, largest first and NULLs last, like ORDER BY ... DESC."""
+    nulls = np.zeros(len(values), dtype=bool) if nulls is None else nulls
+    return np.lexsort((-values, nulls))
+
+
+def decimal_average(total, count):
+    """AVG over integers: a DECIMAL with four more digits of scale, rounded half up."""
+    return (Decimal(total) / Decimal(count)).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+
+
+def decimals(values, scale, nulls=None):
+    result = [Decimal(value).scaleb(-scale) for value in values.tolist()]
+    if nulls is not None:
+        result = [None if null else value for null, value in zip(nulls.tolist(), result)]
+    return result
+
+
+def first_values(column, rows, groups, size):
+    """Per group id, the column value at the first of its rows."""
+    _groups, first = np.unique(groups, return_index=True)
+    return column.python(rows[first])
+
+
+def passing_rounds(snapshot, min_grade):
+    """Per interview: number of distinct rounds graded at least min_grade, as (interviews, counts).
+
+    Interviews without a passing round are left out, like groups without rows.
+    """
+    key = "passing_rounds"
+    if key not in snapshot.cache:
+        grades = snapshot.table("InterviewGrade")
+        valid = (grades["InterviewID"].valid() & grades["RoundNumber"].valid() & grades["Grade"].valid())
+        interviews = grades["InterviewID"].values[valid]
+        rounds = grades["RoundNumber"].values[valid]
+        scores = grades["Grade"].values[valid]
+        # Best grade per (interview, round): a round passes if any grade in it passes.
+        # Sorted by pair then grade, the last row of each pair holds its best grade
+        pairs = pair_keys(interviews, rounds)
+        order = np.lexsort((scores, pairs))
+        last = np.flatnonzero(np.append(pairs[order][1:] != pairs[order][:-1], True))
+        snapshot.cache[key] = (interviews[order][last], scores[order][last])
+    interviews, best = snapshot.cache[key]
+    return np.unique(interviews[best >= min_grade], return_counts=True)
+
+
+def pair_keys(first, second):
+    """One int64 per (first, second) pair, ordered like the pairs, for 1-D unique and sort."""
+    if not len(first):
+        return np.zeros(0, dtype=np.int64)
+    low = second.min()
+    return (first - first.min()) * (second.max() - low + 1) + (second - low)
+
+
+def distinct_counts(groups, values):
+    """(group, number of distinct values) for every group with rows."""
+    pairs = np.unique(pair_keys(groups, values), return_index=True)[1]
+    return np.unique(groups[pairs], return_counts=True)
+
+
+def rows_of(*columns):
+    return list(zip(*columns))
+
+
+# Query plans, one per predefined query
+
+plans = {}
+
+
+def plan(name):
+    def register(function):
+        plans[name] = function
+        return function
+    return register
+
+
+@plan("Interviewers for Hellen Cole (Job 11111)")
+def interviewers_for_candidate(s, v):
+    columns = ["InterviewerID", "LastName", "FirstName"]
+    person = s.table("Person")
+    candidates = np.flatnonzero(string_equals(person["FirstName"], v["first_name"])
+                                & string_equals(person["LastName"], v["last_name"]))
+    if len(candidates) > 1:
+        raise EngineError("Subquery returns more than 1 row")
+    _rows, posted = lookup(s.table("JobPosition"), "JobID", np.array([v["job_id"]]))
+    if not len(candidates) or not posted[0]:
+        return columns, []
+    interview = s.table("Interview")
+    candidate = person["PersonID"].values[candidates[0]]
+    interviews = interview["InterviewID"].values[equals(interview["CandidateID"], candidate)
+                                                 & equals(interview["JobID"], v["job_id"])]
+    assignment = s.table("InterviewerAssignment")
+    _positions, rows = join_many(assignment, "InterviewID", interviews)
+    interviewers = assignment["InterviewerID"]
+    ids = np.unique(interviewers.values[rows[interviewers.valid()[rows]]])
+    person_rows, found = lookup(person, "PersonID", ids)
+    person_rows = person_rows[found]
+    return columns, rows_of(ids[found].tolist(), person["LastName"].python(person_rows),
+                            person["FirstName"].python(person_rows))
+
+
+@plan("Jobs posted by Marketing (January 2011)")
+def jobs_posted_by_department(s, v):
+    job, department = s.table("JobPosition"), s.table("Department")
+    departments = department["Department_ID"].values[string_equals(department["DepartmentName"],
+                                                                   v["department"])]
+    posted = job["PostedDate"]
+    match = (job["DepartmentID"].valid() & np.isin(job["DepartmentID"].values, departments) & posted.valid()
+             & (posted.values >= np.datetime64(v["posted_from"], "D"))
+             & (posted.values < np.datetime64(v["posted_before"], "D")))
+    return ["JobID"], rows_of(job["JobID"].values[match].tolist())
+
+
+@plan("Employees with no supervisees")
+def employees_without_supervisees(s, v):
+    employee, person = s.table("Employee"), s.table("Person")
+    supervisors = employee["SupervisorID"].values[employee["SupervisorID"].valid()]
+    ids = employee["PersonID"].values[~np.isin(employee["PersonID"].values, supervisors)]
+    person_rows, found = lookup(person, "PersonID", ids)
+    return ["PersonID", "Name"], rows_of(ids[found].tolist(), names(person, person_rows[found]))
+
+
+@plan("Marketing sites with no sales (March 2011)")
+def sites_without_sales(s, v):
+    columns = ["SiteID", "Location"]
+    site, sale, department = s.table("Site"), s.table("Sale"), s.table("Department")
+    departments = int(string_equals(department["DepartmentName"], v["department"]).sum())
+    in_window = between(sale["SalesTime"], v["sales_from"], v["sales_to"])
+    if (in_window & ~sale["SiteID"].valid()).any():
+        # NOT IN over a set containing NULL is never true
+        return columns, []
+    sold = sale["SiteID"].values[in_window]
+    rows = np.repeat(np.flatnonzero(~np.isin(site["SiteID"].values, sold)), departments)
+    return columns, rows_of(site["SiteID"].python(rows), site["Location"].python(rows))
+
+
+@plan("Jobs with no hires after 1 month of posting")
+def jobs_without_hires(s, v):
+    job, application = s.table("JobPosition"), s.table("Application")
+    selected = np.flatnonzero(string_equals(application["Status"], "Selected") & application["JobID"].valid()
+                              & application["ApplicationDate"].valid())
+    job_rows, found = lookup(job, "JobID", application["JobID"].values[selected])
+    selected, job_rows = selected[found], job_rows[found]
+    posted = job["PostedDate"]
+    dated = posted.valid()[job_rows]
+    in_time = (application["ApplicationDate"].values[selected[dated]]
+               <= add_months(posted.values[job_rows[dated]], 1))
+    hired = np.zeros(len(job), dtype=bool)
+    hired[job_rows[dated][in_time]] = True
+    rows = np.flatnonzero(~hired)
+    return ["JobID", "JobDescription"], rows_of(job["JobID"].python(rows), job["JobDescription"].python(rows))
+
+
+@plan("Salespeople who sold all products > $200")
+def salespeople_selling_every_type(s, v):
+    employee, person = s.table("Employee"), s.table("Person")
+    product, sale = s.table("Product"), s.table("Sale")
+    price, product_type = product["ListPrice"], product["ProductType"]
+    expensive = above(price, v["min_price"])
+    types = product_type.group_ids()
+    expensive_types = np.unique(types[expensive & (types >= 0)])
+
+    sold = np.flatnonzero(sale["SalesPersonID"].valid() & sale["ProductID"].valid())
+    product_rows, found = lookup(product, "ProductID", sale["ProductID"].values[sold])
+    sellers = sale["SalesPersonID"].values[sold[found]]
+    sold_types = types[product_rows[found]]
+    untyped = np.unique(sellers[sold_types < 0])
+    typed = np.isin(sold_types, expensive_types)
+    complete_sellers, type_counts = distinct_counts(sellers[typed], sold_types[typed])
+    complete = complete_sellers[type_counts == len(expensive_types)]
+
+    ids = employee["PersonID"].values
+    has_sales = np.isin(ids, sellers)
+    qualifies = np.where(has_sales, np.isin(ids, untyped) | np.isin(ids, complete)
+                         | (len(expensive_types) == 0), not expensive.any())
+    ids = ids[qualifies]
+    person_rows, found = lookup(person, "PersonID", ids)
+    return ["PersonID", "Name"], rows_of(ids[found].tolist(), names(person, person_rows[found]))
+
+
+@plan("Departments with no job posts (Jan-Feb 2011)")
+def departments_without_posts(s, v):
+    columns = ["Department_ID", "DepartmentName"]
+    department, job = s.table("Department"), s.table("JobPosition")
+    in_window = between(job["PostedDate"], v["posted_from"], v["posted_to"])
+    if (in_window & ~job["DepartmentID"].valid()).any():
+        return columns, []
+    rows = np.flatnonzero(~np.isin(department["Department_ID"].values, job["DepartmentID"].values[in_window]))
+    return columns, rows_of(department["Department_ID"].python(rows), department["DepartmentName"].python(rows))
+
+
+@plan("Employees applying for job 12345")
+def employees_applying(s, v):
+    columns = ["EmployeeID", "Name", "DepartmentID"]
+    employee, person, application = s.table("Employee"), s.table("Person"), s.table("Application")
+    _rows, posted = lookup(s.table("JobPosition"), "JobID", np.array([v["job_id"]]))
+    if not posted[0]:
+        return columns, []
+    applicants = application["ApplicantID"].values[equals(application["JobID"], v["job_id"])
+                                                   & application["ApplicantID"].valid()]
+    _employee_rows, is_employee = lookup(employee, "PersonID", applicants)
+    person_rows, found = lookup(person, "PersonID", applicants)
+    keep = is_employee & found
+    applicants, person_rows = applicants[keep], person_rows[keep]
+    assignments = s.table("EmployeeDepartmentAssignment")
+    positions, rows = join_many(assignments, "EmployeeID", applicants, left=True)
+    return columns, rows_of(applicants[positions].tolist(), names(person, person_rows[positions]),
+                            outer_values(assignments["DepartmentID"], rows))
+
+
+@plan("Best seller's type")
+def best_sellers_type(s, v):
+    sale, employee, person_type = s.table("Sale"), s.table("Employee"), s.table("PersonType")
+    typed = np.flatnonzero(string_equals(person_type["Type"], "Employee"))
+    sellers = sale["SalesPersonID"].values[sale["SalesPersonID"].valid()]
+    _rows, is_employee = lookup(employee, "PersonID", sellers)
+    matched = sellers[is_employee & np.isin(sellers, person_type["PersonID"].values[typed])]
+    if not len(matched):
+        return ["EmployeeType", "TotalSales"], []
+    first = typed[person_type["PersonID"].values[typed] == matched[0]][:1]
+    return ["EmployeeType", "TotalSales"], [(person_type["Type"].python(first)[0], len(matched))]
+
+
+@plan("Product type with highest net profit")
+def most_profitable_type(s, v):
+    product, product_part, vendor_part = s.table("Product"), s.table("ProductPart"), s.table("VendorPart")
+    parts = np.flatnonzero(product_part["ProductID"].valid() & product_part["PartID"].valid())
+    product_rows, found = lookup(product, "ProductID", product_part["ProductID"].values[parts])
+    parts, product_rows = parts[found], product_rows[found]
+    positions, offers = join_many(vendor_part, "PartID", product_part["PartID"].values[parts])
+    product_rows = product_rows[positions]
+    if not len(product_rows):
+        return ["ProductType"], []
+    groups, group_of = np.unique(product["ProductType"].group_ids()[product_rows], return_inverse=True)
+    size = len(groups)
+    list_price, price = product["ListPrice"], vendor_part["Price"]
+    priced = list_price.valid()[product_rows]
+    offered = price.valid()[offers]
+    revenue = group_sums(group_of[priced], list_price.values[product_rows[priced]], size)
+    cost = group_sums(group_of[offered], price.values[offers[offered]], size)
+    nulls = ((np.bincount(group_of[priced], minlength=size) == 0)
+             | (np.bincount(group_of[offered], minlength=size) == 0))
+    best = descending(revenue - cost, nulls)[0]
+    return ["ProductType"], [(first_values(product["ProductType"], product_rows, group_of, size)[best],)]
+
+
+@plan("Employees working in all departments")
+def employees_in_all_departments(s, v):
+    assignments, person = s.table("EmployeeDepartmentAssignment"), s.table("Person")
+    departments = len(s.table("Department"))
+    rows = np.flatnonzero(assignments["EmployeeID"].valid())
+    employees = assignments["EmployeeID"].values[rows]
+    _person_rows, found = lookup(person, "PersonID", employees)
+    rows, employees = rows[found], employees[found]
+    counted = assignments["DepartmentID"].valid()[rows]
+    groups = np.unique(employees)
+    counts = np.zeros(len(groups), dtype=np.int64)
+    distinct, department_counts = distinct_counts(employees[counted],
+                                                  assignments["DepartmentID"].values[rows[counted]])
+    counts[np.searchsorted(groups, distinct)] = department_counts
+    ids = groups[counts == departments]
+    person_rows, _found = lookup(person, "PersonID", ids)
+    return ["PersonID", "LastName", "FirstName"], rows_of(
+        ids.tolist(), person["LastName"].python(person_rows), person["FirstName"].python(person_rows))
+
+
+def passed_interviews(s, v):
+    """Interview rows (with a known candidate) that passed enough rounds, and the candidates' Person rows."""
+    interview, person = s.table("Interview"), s.table("Person")
+    passed, counts = passing_rounds(s, v["min_grade"])
+    passed = passed[counts >= v["min_rounds"]]
+    rows = np.flatnonzero(np.isin(interview["InterviewID"].values, passed) & interview["CandidateID"].valid())
+    person_rows, found = lookup(person, "PersonID", interview["CandidateID"].values[rows])
+    return rows[found], person_rows[found]
+
+
+@plan("Interviewees selected (name and email)")
+def selected_interviewees(s, v):
+    person = s.table("Person")
+    _rows, person_rows = passed_interviews(s, v)
+    return ["IntervieweeName", "EmailAddress"], rows_of(names(person, person_rows),
+                                                        person["Email"].python(person_rows))
+
+
+@plan("Interviewees (name, phone, email)")
+def interviewee_contacts(s, v):
+    person, phone = s.table("Person"), s.table("PhoneNumber")
+    _rows, person_rows = passed_interviews(s, v)
+    positions, phone_rows = join_many(phone, "PersonID", person["PersonID"].values[person_rows])
+    person_rows = person_rows[positions]
+    return ["FirstName", "LastName", "PhoneNumber", "Email"], rows_of(
+        person["FirstName"].python(person_rows), person["LastName"].python(person_rows),
+        phone["PhoneNumber"].python(phone_rows), person["Email"].python(person_rows))
+
+
+@plan("Employee with highest average salary")
+def highest_average_salary(s, v):
+    columns = ["PersonID", "FirstName", "LastName"]
+    person, salary = s.table("Person"), s.table("Salary")
+    rows = np.flatnonzero(salary["EmployeeID"].valid())
+    employees = salary["EmployeeID"].values[rows]
+    _person_rows, found = lookup(person, "PersonID", employees)
+    rows, employees = rows[found], employees[found]
+    if not len(rows):
+        return columns, []
+    groups, group_of = np.unique(employees, return_inverse=True)
+    paid = salary["Amount"].valid()[rows]
+    totals = group_sums(group_of[paid], salary["Amount"].values[rows[paid]], len(groups))
+    counts = np.bincount(group_of[paid], minlength=len(groups))
+    averages = totals / np.maximum(counts, 1)
+    best = descending(averages, counts == 0)[:1]
+    person_rows, _found = lookup(person, "PersonID", groups[best])
+    return columns, rows_of(groups[best].tolist(), person["FirstName"].python(person_rows),
+                            person["LastName"].python(person_rows))
+
+
+@plan("Vendor supplying 'Cup' (lowest price)")
+def cheapest_vendor(s, v):
+    columns = ["VendorID", "VendorName"]
+    vendor, vendor_part, part = s.table("Vendor"), s.table("VendorPart"), s.table("Part")
+    for column in ("PartName", "Weight"):
+        if column not in part:
+            raise EngineError(f"Unknown column 'p.{column}' in 'where clause'")
+    matching = string_equals(part["PartName"], v["part_name"]) & below(part["Weight"], v["max_weight"])
+    offers = np.flatnonzero(vendor_part["PartID"].valid() & vendor_part["Price"].valid())
+    part_rows, found = lookup(part, "PartID", vendor_part["PartID"].values[offers])
+    offers = offers[found][matching[part_rows[found]]]
+    if not len(offers):
+        return columns, []
+    prices = vendor_part["Price"].values[offers]
+    offers = offers[prices == prices.min()]
+    vendor_rows, found = lookup(vendor, "VendorID", vendor_part["VendorID"].values[offers])
+    vendor_rows = vendor_rows[found]
+    return columns, rows_of(vendor["VendorID"].python(vendor_rows), vendor["Name"].python(vendor_rows))
+
+
+def hierarchy_people(s, anchor, other, value):
+    """Closure rows with `anchor` = value below depth 0, joined to Employee and
+    Person on `other`, ordered by depth then `other`."""
+    hierarchy, employee, person = s.table("EmployeeHierarchy"), s.table("Employee"), s.table("Person")
+    rows = np.flatnonzero(equals(hierarchy[anchor], value) & hierarchy[other].valid()
+                          & (hierarchy["Depth"].values > 0))
+    ids = hierarchy[other].values[rows]
+    employee_rows, is_employee = lookup(employee, "PersonID", ids)
+    person_rows, is_person = lookup(person, "PersonID", ids)
+    keep = is_employee & is_person
+    rows, ids, employee_rows, person_rows = rows[keep], ids[keep], employee_rows[keep], person_rows[keep]
+    depths = hierarchy["Depth"].values[rows]
+    order = np.lexsort((ids, depths))
+    return rows_of(ids[order].tolist(), names(person, person_rows[order]),
+                   employee["Title"].python(employee_rows[order]), depths[order].tolist())
+
+
+@plan("Reports under a manager (all levels)")
+def reports_under_manager(s, v):
+    return (["PersonID", "Name", "Title", "Level"],
+            hierarchy_people(s, "AncestorID", "DescendantID", v["manager_id"]))
+
+
+@plan("Chain of command above an employee")
+def chain_of_command(s, v):
+    return (["PersonID", "Name", "Title", "LevelsUp"],
+            hierarchy_people(s, "DescendantID", "AncestorID", v["employee_id"]))
+
+
+@plan("Span of control by level")
+def span_of_control(s, v):
+    hierarchy = s.table("EmployeeHierarchy")
+    depths = hierarchy["Depth"].values[equals(hierarchy["AncestorID"], v["manager_id"])
+                                       & (hierarchy["Depth"].values > 0)]
+    levels, counts = np.unique(depths, return_counts=True)
+    return ["Level", "Employees"], rows_of(levels.tolist(), counts.tolist())
+
+
+# DDL.sql views
+
+def employee_average_salary(s):
+    """EmployeeAverageSalary: (PersonID, EmployeeName, AverageMonthlySalary), unordered."""
+    employee, person, salary = s.table("Employee"), s.table("Person"), s.table("Salary")
+    rows = np.flatnonzero(salary["EmployeeID"].valid())
+    employees = salary["EmployeeID"].values[rows]
+    _employee_rows, is_employee = lookup(employee, "PersonID", employees)
+    _person_rows, found = lookup(person, "PersonID", employees)
+    keep = is_employee & found
+    rows, employees = rows[keep], employees[keep]
+    groups, group_of = np.unique(employees, return_inverse=True)
+    paid = salary["Amount"].valid()[rows]
+    totals = group_sums(group_of[paid], salary["Amount"].values[rows[paid]], len(groups))
+    counts = np.bincount(group_of[paid], minlength=len(groups))
+    person_rows, _found = lookup(person, "PersonID", groups)
+    return groups, person_rows, totals, counts
+
+
+@plan("View: Employee Average Monthly Salaries")
+def view_employee_average_salary(s, v):
+    person = s.table("Person")
+    groups, person_rows, totals, counts = employee_average_salary(s)
+    order = descending(totals / np.maximum(counts, 1), counts == 0)
+    averages = [None if count == 0 else decimal_average(total, count)
+                for total, count in zip(totals[order].tolist(), counts[order].tolist())]
+    return ["PersonID", "EmployeeName", "AverageMonthlySalary"], rows_of(
+        groups[order].tolist(), names(person, person_rows[order]), averages)
+
+
+@plan("View: Interview Rounds Passed")
+def view_interview_rounds_passed(s, v):
+    columns = ["CandidateID", "CandidateName", "JobID", "JobDescription", "PassedRounds"]
+    grades, interview = s.table("InterviewGrade"), s.table("Interview")
+    person, job = s.table("Person"), s.table("JobPosition")
+    grade = grades["Grade"]
+    rows = np.flatnonzero(grade.valid() & (grade.values >= 60) & grades["InterviewID"].valid()
+                          & grades["RoundNumber"].valid())
+    interview_rows, found = lookup(interview, "InterviewID", grades["InterviewID"].values[rows])
+    rows, interview_rows = rows[found], interview_rows[found]
+    known = interview["CandidateID"].valid()[interview_rows] & interview["JobID"].valid()[interview_rows]
+    rows, interview_rows = rows[known], interview_rows[known]
+    candidates = interview["CandidateID"].values[interview_rows]
+    jobs = interview["JobID"].values[interview_rows]
+    _rows, has_person = lookup(person, "PersonID", candidates)
+    _rows, has_job = lookup(job, "JobID", jobs)
+    keep = has_person & has_job
+    candidates, jobs = candidates[keep], jobs[keep]
+    # Group by (candidate, job), counting distinct rounds
+    _keys, first, group_of = np.unique(pair_keys(candidates, jobs), return_index=True, return_inverse=True)
+    groups, passed = distinct_counts(group_of.ravel(), grades["RoundNumber"].values[rows[keep]])
+    groups, passed = groups[passed >= v["min_rounds"]], passed[passed >= v["min_rounds"]]
+    order = descending(passed)
+    groups, passed = first[groups[order]], passed[order]
+    person_rows, _found = lookup(person, "PersonID", candidates[groups])
+    job_rows, _found = lookup(job, "JobID", jobs[groups])
+    return columns, rows_of(candidates[groups].tolist(), names(person, person_rows), jobs[groups].tolist(),
+                            job["JobDescription"].python(job_rows), passed.tolist())
+
+
+@plan("View: Product Type Sales")
+def view_product_type_sales(s, v):
+    product, sale = s.table("Product"), s.table("Sale")
+    columns = ["ProductType", "TotalItemsSold", "TotalSalesAmount"]
+    if not len(product):
+        return columns, []
+    groups, group_of = np.unique(product["ProductType"].group_ids(), return_inverse=True)
+    size = len(groups)
+    sold = np.flatnonzero(sale["ProductID"].valid())
+    product_rows, found = lookup(product, "ProductID", sale["ProductID"].values[sold])
+    sold, sale_groups = sold[found], group_of[product_rows[found]]
+    amount = sale["Amount"]
+    paid = amount.valid()[sold]
+    items = np.bincount(sale_groups, minlength=size)
+    totals = group_sums(sale_groups[paid], amount.values[sold[paid]], size)
+    unpaid = np.bincount(sale_groups[paid], minlength=size) == 0
+    order = descending(items)
+    types = first_values(product["ProductType"], np.arange(len(product)), group_of, size)
+    return columns, rows_of([types[group] for group in order.tolist()], items[order].tolist(),
+                            decimals(totals[order], amount.scale, unpaid[order]))
+
+
+@plan("View: Product Part Costs")
+def view_product_part_costs(s, v):
+    product, product_part, vendor_part = s.table("Product"), s.table("ProductPart"), s.table("VendorPart")
+    columns = ["ProductID", "ProductType", "TotalPartCost"]
+    parts = np.flatnonzero(product_part["ProductID"].valid() & product_part["PartID"].valid())
+    product_rows, found = lookup(product, "ProductID", product_part["ProductID"].values[parts])
+    parts, product_rows = parts[found], product_rows[found]
+    positions, offers = join_many(vendor_part, "PartID", product_part["PartID"].values[parts])
+    parts, product_rows = parts[positions], product_rows[positions]
+    if not len(parts):
+        return columns, []
+    groups, group_of = np.unique(product_rows, return_inverse=True)
+    costed = product_part["Quantity"].valid()[parts] & vendor_part["Price"].valid()[offers]
+    costs = product_part["Quantity"].values[parts[costed]] * vendor_part["Price"].values[offers[costed]]
+    totals = group_sums(group_of[costed], costs, len(groups))
+    uncosted = np.bincount(group_of[costed], minlength=len(groups)) == 0
+    order = descending(totals, uncosted)
+    groups = groups[order]
+    return columns, rows_of(product["ProductID"].python(groups), product["ProductType"].python(groups),
+                            decimals(totals[order], vendor_part["Price"].scale, uncosted[order]))
+
+
+# Command line
+
+# The sort column of queries ordered by a plain output column
+ORDER_BY_RE = re.compile(r"ORDER BY (\w+) (?:ASC|DESC)\s*;", re.IGNORECASE)
+
+
+def result_bag(rows):
+    return Counter(tuple(row) for row in rows)
+
+
+def mysql_result(cursor, name):
+    query, args, _values = bind_query(name)
+    cursor.execute(query, args or None)
+    return cursor.fetchall()
+
+
+def check(conn, snapshot, names):
+    """Compare every query with MySQL; returns the number that differ."""
+    failed = 0
+    cursor = conn.cursor()
+    for name in names:
+        try:
+            expected = mysql_result(cursor, name)
+            expected_error = None
+        except Exception as err:
+            expected, expected_error = None, err
+        try:
+            columns, actual = snapshot.execute(name)
+            actual_error = None
+        except EngineError as err:
+            columns, actual, actual_error = [], None, err
+        if expected_error is not None or actual_error is not None:
+            same = expected_error is not None and actual_error is not None
+            detail = f"MySQL: {expected_error}; engine: {actual_error}"
+        else:
+            same = result_bag(expected) == result_bag(actual)
+            order_by = ORDER_BY_RE.search(predefined_queries[name])
+            if same and order_by and order_by.group(1) in columns:
+                # Ties may come back in any order, but the sort column must match row by row
+                sort_column = columns.index(order_by.group(1))
+                same = [row[sort_column] for row in expected] == [row[sort_column] for row in actual]
+            missing, extra = (result_bag(expected) - result_bag(actual),
+                              result_bag(actual) - result_bag(expected)) if not same else ({}, {})
+            detail = (f"{len(actual)} rows" if same else
+                      f"missing {sorted(missing, key=str)[:3]}, extra {sorted(extra, key=str)[:3]}")
+        failed += not same
+        print(f"  {name}: {'same' if same else 'DIFFERENT'} ({detail})")
+    cursor.close()
+    return failed
+
+
+def bench(snapshot, names, runs):
+    for name in names:
+        try:
+            started = time.perf_counter()
+            plans[name](snapshot, {param.name: param.default for param in query_params.get(name, ())})
+            cold = (time.perf_counter() - started) * 1000
+            snapshot.execute(name)
+            timings = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                snapshot.execute(name)
+                timings.append((time.perf_counter() - started) * 1000)
+        except EngineError as err:
+            print(f"  {name}: {err}")
+            continue
+        print(f"  {name:<45} evaluate {cold:>9.3f} ms, cached {statistics.median(timings):>7.4f} ms")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Snapshot the database configured by DB_HOST/DB_USER/DB_PASSWORD/DB_NAME into "
+                    "columnar arrays and answer the predefined queries from it.")
+    parser.add_argument('command', choices=['check', 'bench'])
+    parser.add_argument('--queries', help="'|'-separated query names (all by default)")
+    parser.add_argument('--scales', default=None,
+                        help="comma-separated scale factors to seed and check in turn "
+                             "(empties the database); by default the current data is used")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--runs', type=int, default=100, help="cached executions timed by bench")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    import benchmark_queries
+    import generate_random_data as gen
+
+    args = parse_args(argv)
+    names = args.queries.split('|') if args.queries else list(predefined_queries)
+    unknown = [name for name in names if name not in plans]
+    if unknown:
+        print(f"Unknown queries: {', '.join(unknown)}")
+        return 2
+    scales = [float(s) for s in args.scales.split(',')] if args.scales else [None]
+    failed = 0
+    for scale in scales:
+        if scale is not None:
+            print(f"Seeding scale {scale:g}...")
+            benchmark_queries.seed_database(scale, args.seed, args.workers or os.cpu_count(), 'truncate')
+        conn = gen.connect_to_db()
+        try:
+            started = time.perf_counter()
+            snapshot, _reloaded = load_snapshot(conn)
+            rows = sum(len(table) for table in snapshot.tables.values())
+            print(f"Snapshot of {rows} rows loaded in {time.perf_counter() - started:.1f} s")
+            if args.command == 'check':
+                failed += check(conn, snapshot, names)
+            else:
+                bench(snapshot, names, args.runs)
+        finally:
+            conn.close()
+    if args.command == 'check':
+        print("✅ The engine matches MySQL" if not failed else f"❌ {failed} mismatch(es)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
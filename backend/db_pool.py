@@ -0,0 +1,300 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import mysql.connector
+
+# Pool tuning, overridable through the environment
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))
+POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", 10))
+POOL_HEALTH_CHECK_AFTER = float(os.getenv("DB_POOL_HEALTH_CHECK_AFTER", 5))
+# Server-side prepared statements kept open per connection, least recently used dropped first
+PREPARED_CACHE_SIZE = int(os.getenv("DB_PREPARED_CACHE_SIZE", 32))
+
+
+class PoolTimeout(mysql.connector.Error):
+    """Raised when no connection could be checked out in time."""
+
+
+class PreparedStatement:
+    """A statement prepared once on a connection and executed many times."""
+
+    def __init__(self, raw, sql):
+        self.sql = sql
+        self.cursor = raw.cursor(prepared=True)
+
+    def execute(self, args=()):
+        """Execute with new parameter values; returns the cursor to read rows from."""
+        # The connector only skips the PREPARE when it gets the very same
+        # string object it prepared last time
+        self.cursor.execute(self.sql, args)
+        return self.cursor
+
+    def close(self):
+        try:
+            self.cursor.close()
+        except Exception:
+            pass
+
+
+class PooledConnection:
+    """Wrapper that hands the connection back to its pool on close()."""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw)
+
+    def discard(self):
+        """Close the connection instead of returning it, e.g. with unread rows pending."""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._discard(raw)
+
+    def is_connected(self):
+        return self._raw is not None and self._raw.is_connected()
+
+    def prepare(self, sql):
+        """Prepared statement for sql, reused across checkouts of this connection.
+
+        Its rows must be read in full before the connection runs anything else.
+        """
+        if self._raw is None:
+            raise mysql.connector.Error("Connection already returned to the pool.")
+        return self._pool.statement(self._raw, sql)
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.Error("Connection already returned to the pool.")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections for one connection target."""
+
+    def __init__(self, config, size=POOL_SIZE, idle_timeout=POOL_IDLE_TIMEOUT,
+                 checkout_timeout=POOL_CHECKOUT_TIMEOUT,
+                 health_check_after=POOL_HEALTH_CHECK_AFTER):
+        self.config = dict(config)
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+        self._idle = deque()  # (connection, returned_at), most recent on the right
+        self._statements = {}  # connection -> OrderedDict of sql -> PreparedStatement
+        self._total = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "evicted": 0,
+            "failed_health_checks": 0,
+            "prepared_hits": 0,
+            "prepared_misses": 0,
+        }
+
+    def acquire(self):
+        """Check out a healthy connection, waiting up to checkout_timeout."""
+        deadline = time.monotonic() + self.checkout_timeout
+        waited = False
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise mysql.connector.Error(f"Connection pool for {self.label()} is closed.")
+                self._evict_idle()
+                if self._idle:
+                    raw, returned_at = self._idle.pop()
+                    create = False
+                elif self._total < self.size:
+                    self._total += 1
+                    raw, create = None, True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"Timed out after {self.checkout_timeout}s waiting for a "
+                            f"connection to {self.label()}."
+                        )
+                    if not waited:
+                        self.stats["waits"] += 1
+                        waited = True
+                    self._cond.wait(remaining)
+                    continue
+
+            if create:
+                try:
+                    raw = mysql.connector.connect(**self.config)
+                except Exception:
+                    self._discard(None)
+                    raise
+                with self._cond:
+                    self.stats["created"] += 1
+            elif time.monotonic() - returned_at > self.health_check_after and not self._healthy(raw):
+                self._discard(raw)
+                with self._cond:
+                    self.stats["failed_health_checks"] += 1
+                continue
+
+            with self._cond:
+                self.stats["checkouts"] += 1
+            return PooledConnection(self, raw)
+
+    def release(self, raw):
+        """Return a connection to the idle set, discarding it if it is broken
+        or the pool has been closed."""
+        if self._closed:
+            self._discard(raw)
+            return
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        with self._cond:
+            if not self._closed:
+                self._idle.append((raw, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(raw)
+
+    def statement(self, raw, sql, cache_size=PREPARED_CACHE_SIZE):
+        """Cached prepared statement for sql on a checked-out connection."""
+        # Only the thread holding raw touches its cache; the lock guards the outer dict
+        with self._cond:
+            cache = self._statements.setdefault(raw, OrderedDict())
+            statement = cache.get(sql)
+            if statement is not None:
+                cache.move_to_end(sql)
+                self.stats["prepared_hits"] += 1
+                return statement
+            self.stats["prepared_misses"] += 1
+        statement = PreparedStatement(raw, sql)
+        cache[sql] = statement
+        while len(cache) > cache_size:
+            _, evicted = cache.popitem(last=False)
+            evicted.close()
+        return statement
+
+    def close_all(self):
+        """Close every idle connection and refuse new checkouts; checked-out
+        connections are closed when released instead of going back to the pool."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            # Wake waiters so they see the pool is closed
+            self._cond.notify_all()
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def metrics(self):
+        with self._cond:
+            return dict(
+                self.stats,
+                target=self.label(),
+                size=self.size,
+                open=self._total,
+                idle=len(self._idle),
+                in_use=self._total - len(self._idle),
+            )
+
+    def label(self):
+        return f"{self.config['user']}@{self.config['host']}:{self.config['port']}/{self.config['database']}"
+
+    def _healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _evict_idle(self):
+        # Oldest connections sit on the left; caller holds the lock
+        now = time.monotonic()
+        while self._idle and now - self._idle[0][1] > self.idle_timeout:
+            raw, _ = self._idle.popleft()
+            self._total -= 1
+            self._statements.pop(raw, None)
+            self.stats["evicted"] += 1
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+    def _discard(self, raw):
+        if raw is not None:
+            try:
+                raw.close()
+            except Exception:
+                pass
+        with self._cond:
+            self._total -= 1
+            # Statements die with their connection
+            self._statements.pop(raw, None)
+            self._cond.notify()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def target_key(host, port, user, password, database):
+    """Identify a connection target; the password digest keeps a session with
+    different credentials from borrowing anything authenticated by someone else."""
+    digest = hashlib.sha256(password.encode()).hexdigest()
+    return (host, int(port), user, database, digest)
+
+
+def get_pool(host, port, user, password, database):
+    """Return the pool for a connection target, creating it on first use."""
+    key = target_key(host, port, user, password, database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            logging.info(f"Creating connection pool for {user}@{host}:{port}/{database}")
+            pool = ConnectionPool({
+                "host": host,
+                "port": int(port),
+                "user": user,
+                "password": password,
+                "database": database,
+            })
+            _pools[key] = pool
+        return pool
+
+
+def reset_after_fork():
+    """Forget the pools inherited from a parent process.
+
+    Their sockets are shared with the parent, so a forked worker must not use
+    or even close them (closing sends QUIT on the parent's connection); it
+    opens its own on first use instead.
+    """
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    _pools.clear()
+
+
+def pool_metrics():
+    """Metrics for every pool, suitable for JSON output."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.metrics() for pool in pools]
@@ -0,0 +1,97 @@
+import os
+import re
+
+# Schema definition shipped at the repository root
+DDL_PATH = os.getenv("DDL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "DDL.sql"))
+
+_TABLE_RE = re.compile(r"CREATE\s+TABLE\s+`?(\w+)`?\s*\((.*?)\n\);", re.IGNORECASE | re.DOTALL)
+_VIEW_RE = re.compile(r"CREATE\s+VIEW\s+`?(\w+)`?\s+AS\s+(.*?);", re.IGNORECASE | re.DOTALL)
+_FK_RE = re.compile(r"FOREIGN\s+KEY\s*\((\w+)\)\s*REFERENCES\s+`?(\w+)`?\s*\((\w+)\)", re.IGNORECASE)
+_INDEX_RE = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?\s*\(.*?\);",
+                       re.IGNORECASE | re.DOTALL)
+_COLUMN_RE = re.compile(r"^\s+(\w+)\s+([A-Z]+)(?:\((\d+)(?:,\s*(\d+))?\))?", re.MULTILINE)
+_TABLE_REF_RE = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.IGNORECASE)
+
+
+def load_ddl(path=DDL_PATH):
+    """Read DDL.sql, returning an empty schema if it is not available."""
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def table_names(ddl=None):
+    """Tables in the order they are created in DDL.sql (parents first)."""
+    ddl = load_ddl() if ddl is None else ddl
+    return [m.group(1) for m in _TABLE_RE.finditer(ddl)]
+
+
+def create_table_statements(ddl=None):
+    """Map each table to its CREATE TABLE statement, in creation order."""
+    ddl = load_ddl() if ddl is None else ddl
+    return {m.group(1): m.group(0).rstrip(";") for m in _TABLE_RE.finditer(ddl)}
+
+
+def column_types(ddl=None):
+    """Map each table to its columns as (name, data type, scale), in DDL.sql order.
+
+    Data types are lower case like information_schema.COLUMNS.DATA_TYPE; the
+    scale is set for DECIMAL columns only.
+    """
+    columns = {}
+    for table, statement in create_table_statements(ddl).items():
+        columns[table] = [(name, data_type.lower(), int(scale) if scale else None)
+                          for name, data_type, _length, scale in _COLUMN_RE.findall(statement)
+                          if name.upper() not in ("PRIMARY", "FOREIGN", "CHECK", "UNIQUE", "CREATE")]
+    return columns
+
+
+def index_statements(ddl=None):
+    """Secondary indexes as a list of (index_name, table, CREATE INDEX statement)."""
+    ddl = load_ddl() if ddl is None else ddl
+    return [(m.group(1), m.group(2), m.group(0).rstrip(";")) for m in _INDEX_RE.finditer(ddl)]
+
+
+def foreign_keys(ddl=None):
+    """Map each table to a list of (column, referenced_table, referenced_column)."""
+    ddl = load_ddl() if ddl is None else ddl
+    return {m.group(1): _FK_RE.findall(m.group(2)) for m in _TABLE_RE.finditer(ddl)}
+
+
+def referenced_tables(sql):
+    """Names of the tables and views a statement reads from."""
+    return {name for name in _TABLE_REF_RE.findall(sql)}
+
+
+def view_dependencies(ddl=None):
+    """Map each view to the base tables its definition reads."""
+    ddl = load_ddl() if ddl is None else ddl
+    return {m.group(1): referenced_tables(m.group(2)) for m in _VIEW_RE.finditer(ddl)}
+
+
+def base_tables(sql, ddl=None):
+    """Base tables a statement depends on, with views expanded."""
+    views = view_dependencies(ddl)
+    tables = set()
+    for name in referenced_tables(sql):
+        tables |= views.get(name, {name})
+    return tables
+
+
+def dependent_tables(table, ddl=None):
+    """A table plus every table that references it, directly or transitively.
+
+    Writes to a parent can cascade (ON DELETE CASCADE / SET NULL) into these.
+    """
+    fks = foreign_keys(ddl)
+    found = {table}
+    frontier = [table]
+    while frontier:
+        parent = frontier.pop()
+        for child, refs in fks.items():
+            if child not in found and any(ref_table == parent for _, ref_table, _ in refs):
+                found.add(child)
+                frontier.append(child)
+    return found
@@ -1,173 +1,223 @@
-import random
+import argparse
+import multiprocessing
+import time
+import zlib
+import numpy as np
 import pymysql
-from faker import Faker
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
 
+from bulk_insert import (DELIMITERS, BatchWriter, DelimitedFileSink, load_delimited_files,
+                         load_stats, report_load_stats)
+import column_generators as cg
+from ddl import table_names
+import hierarchy
+import summaries
+from reset_db import RESET_MODES, reset_tables
+
 # Load environment variables
 load_dotenv()
-fake = Faker()
+# Columns are drawn from this generator; Faker is only used to build vocabularies
+rng = np.random.default_rng()
+
+# Rows generated at --scale 1; every other table is derived per parent row
+# (1-2 phone numbers per person, 12 salaries per employee, 3-7 grades per interview, ...)
+BASE_ROW_COUNTS = {
+    'Person': 100,
+    'JobPosition': 50,
+    'Application': 100,
+    'Product': 50,
+    'Site': 3,
+    'Sale': 200,
+    'Vendor': 20,
+    'Part': 100,
+}
+
+# First ID handed out for each table with a generated surrogate key. Interviews
+# reuse their ApplicationID and salary transaction numbers are a block of 12 per
+# employee, so every slice of a table can be generated independently.
+ID_START = {
+    'Person': 1,
+    'JobPosition': 10000,
+    'Application': 1,
+    'Product': 1,
+    'Site': 1,
+    'Sale': 1,
+    'Vendor': 1,
+    'Part': 1,
+}
+
+# Dates are drawn relative to a fixed day so that seeded runs are reproducible
+REFERENCE_DATE = datetime(2024, 12, 31)
+
+# IDs per unit of work; slices are seeded independently, so the generated data
+# only depends on --seed and --chunk-size, not on the number of workers
+CHUNK_SIZE = 10000
+
+class IdSequence:
+    """Monotonic ID allocator; blocks are reserved up front instead of
+    rejection-sampling random IDs until an unused one turns up."""
+
+    def __init__(self, start=1):
+        self.next_id = start
+
+    def reserve(self, count):
+        block = range(self.next_id, self.next_id + count)
+        self.next_id += count
+        return block
+
+    def next(self):
+        return self.reserve(1)[0]
+
+sequences = {}
+
+def reset_sequences():
+    sequences.clear()
+    sequences.update({table: IdSequence(start) for table, start in ID_START.items()})
+
+reset_sequences()
+
+def row_counts(scale=1.0):
+    """Row counts for the independently sized tables at a scale factor."""
+    return {table: max(1, int(round(count * scale))) for table, count in BASE_ROW_COUNTS.items()}
+
+def seed_generators(seed):
+    global rng
+    rng = np.random.default_rng(seed)
+
+def days_before(days):
+    return REFERENCE_DATE - timedelta(days=days)
 
-def connect_to_db():
+def connect_to_db(local_infile=False):
     return pymysql.connect(
         host=os.getenv('DB_HOST', 'localhost'),
         user=os.getenv('DB_USER', 'root'),
         password=os.getenv('DB_PASSWORD', ''),
-        database=os.getenv('DB_NAME', 'xyzcompany')
+        database=os.getenv('DB_NAME', 'xyzcompany'),
+        local_infile=local_infile
     )
 
-def generate_person_data(num_records=100):
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Person Table")
-    
-    for _ in range(num_records):
-        person_id = fake.unique.random_int(min=1, max=1000)
-        last_name = fake.last_name()
-        first_name = fake.first_name()
-        age = random.randint(18, 64)
-        gender = random.choice(['M', 'F'])
-        address_line1 = fake.street_address()
-        address_line2 = fake.secondary_address()
-        city = fake.city()[:20]  # Truncate to 20 chars
-        state = fake.state_abbr()
-        zip_code = fake.zipcode()
-        email = fake.email()
-
-        sql = """
-            INSERT INTO Person (PersonID, LastName, FirstName, Age, Gender, 
-                              AddressLine1, AddressLine2, City, State, ZipCode, Email)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        values = (person_id, last_name, first_name, age, gender, 
-                 address_line1, address_line2, city, state, zip_code, email)
-        
-        cursor.execute(sql, values)
-    
-    conn.commit()
-    print("✅ Fake data inserted into Person table successfully!")
-    cursor.close()
-    conn.close()
+# Parent ID lists already read by this process during the current stage
+_id_cache = {}
 
-def generate_phone_numbers():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO PhoneNumber Table")
-    
-    # Get all PersonIDs
-    cursor.execute("SELECT PersonID FROM Person")
-    person_ids = [row[0] for row in cursor.fetchall()]
-    
-    for person_id in person_ids:
-        # Generate 1-2 phone numbers per person
-        num_phones = random.randint(1, 2)
-        for _ in range(num_phones):
-            # Generate a 10-digit phone number
-            area_code = random.randint(200, 999)
-            prefix = random.randint(200, 999)
-            line_number = random.randint(1000, 9999)
-            phone_number = f"{area_code}-{prefix}-{line_number}"
-            
-            sql = "INSERT INTO PhoneNumber (PersonID, PhoneNumber) VALUES (%s, %s)"
-            cursor.execute(sql, (person_id, phone_number))
-    
-    conn.commit()
-    print("✅ Phone numbers inserted successfully!")
-    cursor.close()
-    conn.close()
+def fetch_rows(conn, table, columns, first_id=None, last_id=None, **equals):
+    """Key columns of a parent table ordered by the first one, optionally limited
+    to first_id..last_id of it and to rows where column == value.
 
-def generate_person_types():
-    conn = connect_to_db()
+    Reads the database, or the files written so far when generating into a
+    DelimitedFileSink.
+    """
+    if isinstance(conn, DelimitedFileSink):
+        return conn.select(table, columns, first_id, last_id, **equals)
+    conditions, params = [], []
+    if first_id is not None:
+        conditions.append(f"{columns[0]} BETWEEN %s AND %s")
+        params += [first_id, last_id]
+    for column, value in equals.items():
+        conditions.append(f"{column} = %s")
+        params.append(value)
+    sql = f"SELECT {', '.join(columns)} FROM {table}"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {columns[0]}"
     cursor = conn.cursor()
-    
-    print("-- INSERT INTO PersonType Table")
-    
-    cursor.execute("SELECT PersonID FROM Person")
-    person_ids = [row[0] for row in cursor.fetchall()]
-    
-    for person_id in person_ids:
-        # Randomly assign 1-2 types per person
-        types = random.sample(['Employee', 'Customer', 'PotentialEmployee'], 
-                            random.randint(1, 2))
-        for type_name in types:
-            sql = "INSERT INTO PersonType (PersonID, Type) VALUES (%s, %s)"
-            cursor.execute(sql, (person_id, type_name))
-    
-    conn.commit()
-    print("✅ Person types inserted successfully!")
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
     cursor.close()
-    conn.close()
+    return rows
 
-def generate_customer_data():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Customer Table")
-    
+def fetch_ids(conn, table, column, **equals):
+    """Every ID in a parent table column, read once per process and stage."""
+    key = (table, column, tuple(sorted(equals.items())))
+    if key not in _id_cache:
+        _id_cache[key] = [row[0] for row in fetch_rows(conn, table, [column], **equals)]
+    return _id_cache[key]
+
+# Each generator fills one slice [first_id, last_id] of its driving ID range:
+# its own primary keys for independently sized tables, the parent's keys
+# (PersonID, ApplicationID, ...) for tables derived per parent row.
+
+def generate_person_data(conn, first_id, last_id):
+    n = last_id - first_id + 1
+    last_names = cg.words(rng, 'last_name', 20, n)
+    first_names = cg.words(rng, 'first_name', 20, n)
+    columns = ['PersonID', 'LastName', 'FirstName', 'Age', 'Gender',
+               'AddressLine1', 'AddressLine2', 'City', 'State', 'ZipCode', 'Email']
+    with BatchWriter(conn, 'Person', columns) as writer:
+        writer.extend(cg.rows(
+            np.arange(first_id, last_id + 1), last_names, first_names,
+            cg.integers(rng, 18, 64, n),  # Age < 65
+            cg.choice(rng, ['M', 'F'], n),
+            cg.words(rng, 'street_address', 50, n),
+            cg.words(rng, 'secondary_address', 50, n),
+            cg.words(rng, 'city', 20, n),
+            cg.words(rng, 'state_abbr', 13, n),
+            cg.integers(rng, 1001, 99950, n),
+            cg.emails(rng, first_names, last_names)))
+
+def slice_ids(conn, table, column, first_id, last_id, **equals):
+    """IDs of a parent table in first_id..last_id as an array."""
+    return np.array([row[0] for row in fetch_rows(conn, table, [column], first_id, last_id, **equals)],
+                    dtype=np.int64)
+
+def generate_phone_numbers(conn, first_id, last_id):
+    person_ids = slice_ids(conn, 'Person', 'PersonID', first_id, last_id)
+
+    # 1-2 phone numbers per person
+    counts = cg.integers(rng, 1, 2, len(person_ids))
+    with BatchWriter(conn, 'PhoneNumber', ['PersonID', 'PhoneNumber']) as writer:
+        writer.extend(cg.rows(np.repeat(person_ids, counts), cg.phone_numbers(rng, int(counts.sum()))))
+
+def generate_person_types(conn, first_id, last_id):
+    person_ids = slice_ids(conn, 'Person', 'PersonID', first_id, last_id)
+    n = len(person_ids)
+
+    # 1-2 distinct types per person
+    types = np.array(['Employee', 'Customer', 'PotentialEmployee'], dtype=object)
+    picked = cg.sample_distinct(rng, len(types), 2, n)
+    has_second = cg.integers(rng, 1, 2, n) == 2
+    with BatchWriter(conn, 'PersonType', ['PersonID', 'Type']) as writer:
+        writer.extend(cg.rows(cg.interleave(person_ids, person_ids, has_second),
+                              types[cg.interleave(picked[:, 0], picked[:, 1], has_second)]))
+
+def generate_customer_data(conn, first_id, last_id):
     # Get PersonIDs that are marked as Customer in PersonType
-    cursor.execute("""
-        SELECT p.PersonID 
-        FROM Person p 
-        JOIN PersonType pt ON p.PersonID = pt.PersonID 
-        WHERE pt.Type = 'Customer'
-    """)
-    customer_ids = [row[0] for row in cursor.fetchall()]
-    
-    for person_id in customer_ids:
-        sql = "INSERT INTO Customer (PersonID) VALUES (%s)"
-        cursor.execute(sql, (person_id,))
-    
-    conn.commit()
-    print("✅ Customer data inserted successfully!")
-    cursor.close()
-    conn.close()
+    customer_ids = [row[0] for row in fetch_rows(conn, 'PersonType', ['PersonID'], first_id, last_id,
+                                                 Type='Customer')]
 
-def generate_employee_data():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Employee Table")
-    
+    with BatchWriter(conn, 'Customer', ['PersonID']) as writer:
+        for person_id in customer_ids:
+            writer.add((person_id,))
+
+def generate_employee_data(conn, first_id, last_id):
     # Get PersonIDs that are marked as Employee in PersonType
-    cursor.execute("""
-        SELECT p.PersonID 
-        FROM Person p 
-        JOIN PersonType pt ON p.PersonID = pt.PersonID 
-        WHERE pt.Type = 'Employee'
-    """)
-    employee_ids = [row[0] for row in cursor.fetchall()]
-    
-    # First, insert employees without supervisors
-    for person_id in employee_ids:
-        erank = random.choice(['Junior', 'Senior', 'Lead', 'Manager', 'Director'])
-        title = fake.job()[:50]  # Truncate to 50 chars
-        sql = "INSERT INTO Employee (PersonID, Erank, Title) VALUES (%s, %s, %s)"
-        cursor.execute(sql, (person_id, erank, title))
-    
-    # Then, update some employees with supervisors
-    cursor.execute("SELECT PersonID FROM Employee")
-    all_employees = [row[0] for row in cursor.fetchall()]
-    
-    for employee_id in all_employees:
-        if random.random() < 0.7:  # 70% chance of having a supervisor
-            supervisor_id = random.choice([e for e in all_employees if e != employee_id])
-            sql = "UPDATE Employee SET SupervisorID = %s WHERE PersonID = %s"
-            cursor.execute(sql, (supervisor_id, employee_id))
-    
-    conn.commit()
-    print("✅ Employee data inserted successfully!")
-    cursor.close()
-    conn.close()
+    employee_ids = slice_ids(conn, 'PersonType', 'PersonID', first_id, last_id, Type='Employee')
+    n = len(employee_ids)
 
-def generate_department_data():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Department Table")
-    
+    # Employees are inserted without supervisors; generate_supervisors fills
+    # them in once every employee exists
+    with BatchWriter(conn, 'Employee', ['PersonID', 'Erank', 'Title']) as writer:
+        writer.extend(cg.rows(employee_ids,
+                              cg.choice(rng, ['Junior', 'Senior', 'Lead', 'Manager', 'Director'], n),
+                              cg.words(rng, 'job', 50, n)))
+
+def generate_supervisors(conn, first_id, last_id):
+    all_employees = fetch_ids(conn, 'Employee', 'PersonID')
+    employee_ids = slice_ids(conn, 'Employee', 'PersonID', first_id, last_id)
+    if len(all_employees) < 2:
+        return
+
+    # 70% of employees have a supervisor. Supervisors have lower IDs than the
+    # employees they supervise, so chains of command never loop back; the
+    # lowest ID heads the organization
+    supervised = employee_ids[(rng.random(len(employee_ids)) < 0.7) & (employee_ids > all_employees[0])]
+    # Batched upsert on the primary key instead of one UPDATE per employee
+    with BatchWriter(conn, 'Employee', ['PersonID', 'SupervisorID'],
+                     update_columns=['SupervisorID'], label='Employee (supervisors)') as writer:
+        writer.extend(cg.rows(supervised, cg.earlier(rng, all_employees, supervised)))
+
+def generate_department_data(conn, first_id, last_id):
     departments = [
         (1, 'Marketing'),
         (2, 'Sales'),
@@ -178,285 +228,410 @@ def generate_department_data():
         (7, 'Research'),
         (8, 'Customer Service')
     ]
-    
-    for dept_id, dept_name in departments:
-        sql = "INSERT INTO Department (Department_ID, DepartmentName) VALUES (%s, %s)"
-        cursor.execute(sql, (dept_id, dept_name))
-    
-    conn.commit()
-    print("✅ Department data inserted successfully!")
-    cursor.close()
-    conn.close()
 
-def generate_job_positions():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO JobPosition Table")
-    
-    cursor.execute("SELECT Department_ID FROM Department")
-    dept_ids = [row[0] for row in cursor.fetchall()]
-    
+    with BatchWriter(conn, 'Department', ['Department_ID', 'DepartmentName']) as writer:
+        writer.extend(departments)
+
+def generate_job_positions(conn, first_id, last_id):
+    dept_ids = fetch_ids(conn, 'Department', 'Department_ID')
+    n = last_id - first_id + 1
+
     job_titles = [
         'Software Engineer', 'Data Analyst', 'Marketing Specialist',
         'Sales Representative', 'HR Manager', 'Financial Analyst',
         'Operations Manager', 'Research Scientist', 'Customer Support'
     ]
-    
-    for _ in range(50):  # Generate 50 job positions
-        job_id = fake.unique.random_int(min=10000, max=99999)
-        dept_id = random.choice(dept_ids)
-        job_desc = random.choice(job_titles)
-        posted_date = fake.date_between(start_date='-1y', end_date='today')
-        
-        sql = """
-            INSERT INTO JobPosition (JobID, DepartmentID, JobDescription, PostedDate)
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, (job_id, dept_id, job_desc, posted_date))
-    
-    conn.commit()
-    print("✅ Job positions inserted successfully!")
-    cursor.close()
-    conn.close()
 
-def generate_applications():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Application Table")
-    
+    columns = ['JobID', 'DepartmentID', 'JobDescription', 'PostedDate']
+    with BatchWriter(conn, 'JobPosition', columns) as writer:
+        writer.extend(cg.rows(np.arange(first_id, last_id + 1),
+                              cg.choice(rng, dept_ids, n),
+                              cg.choice(rng, job_titles, n),
+                              cg.dates_between(rng, days_before(365), REFERENCE_DATE, n)))
+
+def generate_applications(conn, first_id, last_id):
     # Get potential employees and job positions
-    cursor.execute("""
-        SELECT p.PersonID 
-        FROM Person p 
-        JOIN PersonType pt ON p.PersonID = pt.PersonID 
-        WHERE pt.Type = 'PotentialEmployee'
-    """)
-    applicant_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT JobID FROM JobPosition")
-    job_ids = [row[0] for row in cursor.fetchall()]
-    
-    for _ in range(100):  # Generate 100 applications
-        application_id = fake.unique.random_int(min=1, max=1000)
-        applicant_id = random.choice(applicant_ids)
-        job_id = random.choice(job_ids)
-        application_date = fake.date_between(start_date='-6m', end_date='today')
-        status = random.choice(['Pending', 'Selected', 'Rejected'])
-        
-        sql = """
-            INSERT INTO Application (ApplicationID, ApplicantID, JobID, ApplicationDate, Status)
-            VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, (application_id, applicant_id, job_id, application_date, status))
-    
-    conn.commit()
-    print("✅ Applications inserted successfully!")
-    cursor.close()
-    conn.close()
+    applicant_ids = fetch_ids(conn, 'PersonType', 'PersonID', Type='PotentialEmployee')
+    job_ids = fetch_ids(conn, 'JobPosition', 'JobID')
+    n = last_id - first_id + 1
 
-def generate_interviews():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Interview Table")
-    
+    columns = ['ApplicationID', 'ApplicantID', 'JobID', 'ApplicationDate', 'Status']
+    with BatchWriter(conn, 'Application', columns) as writer:
+        writer.extend(cg.rows(np.arange(first_id, last_id + 1),
+                              cg.choice(rng, applicant_ids, n),
+                              cg.choice(rng, job_ids, n),
+                              cg.dates_between(rng, days_before(182), REFERENCE_DATE, n),
+                              cg.choice(rng, ['Pending', 'Selected', 'Rejected'], n)))
+
+def generate_interviews(conn, first_id, last_id):
     # Get applications with 'Selected' status
-    cursor.execute("""
-        SELECT a.ApplicationID, a.ApplicantID, a.JobID
-        FROM Application a
-        WHERE a.Status = 'Selected'
-    """)
-    selected_applications = cursor.fetchall()
-    
-    for app_id, applicant_id, job_id in selected_applications:
-        interview_id = fake.unique.random_int(min=1, max=1000)
-        interview_time = fake.date_time_between(start_date='-3m', end_date='+3m')
-        
-        sql = """
-            INSERT INTO Interview (InterviewID, JobID, CandidateID, InterviewTime)
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, (interview_id, job_id, applicant_id, interview_time))
-        
-        # Generate interview grades
-        num_rounds = random.randint(3, 7)
-        for round_num in range(1, num_rounds + 1):
-            grade = random.randint(60, 100)
-            sql = """
-                INSERT INTO InterviewGrade (InterviewID, InterviewerID, RoundNumber, Grade)
-                VALUES (%s, %s, %s, %s)
-            """
-            # Randomly select an employee as interviewer
-            cursor.execute("SELECT PersonID FROM Employee ORDER BY RAND() LIMIT 1")
-            interviewer_id = cursor.fetchone()[0]
-            cursor.execute(sql, (interview_id, interviewer_id, round_num, grade))
-    
-    conn.commit()
-    print("✅ Interviews and grades inserted successfully!")
-    cursor.close()
-    conn.close()
+    selected_applications = np.array(
+        fetch_rows(conn, 'Application', ['ApplicationID', 'ApplicantID', 'JobID'],
+                   first_id, last_id, Status='Selected'), dtype=np.int64).reshape(-1, 3)
+    employee_ids = fetch_ids(conn, 'Employee', 'PersonID')
+    # One interview per selected application, so it shares the ID
+    interview_ids, applicant_ids, job_ids = selected_applications.T
+    n = len(interview_ids)
 
-def generate_products():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Product Table")
-    
+    # 3-7 rounds per interview, each graded 60-100 by a random employee
+    num_rounds = cg.integers(rng, 3, 7, n)
+    round_interviews = np.repeat(interview_ids, num_rounds)
+    interviewers = cg.choice(rng, employee_ids, len(round_interviews))
+    # Everyone who graded a round is assigned to the interview
+    assigned = np.unique(np.column_stack([round_interviews, interviewers]), axis=0)
+
+    interviews = BatchWriter(conn, 'Interview', ['InterviewID', 'JobID', 'CandidateID', 'InterviewTime'])
+    # Grades and interviewer assignments reference interviews, so pending
+    # interviews are flushed first
+    assignments = BatchWriter(conn, 'InterviewerAssignment', ['InterviewID', 'InterviewerID'],
+                              parents=[interviews])
+    grades = BatchWriter(conn, 'InterviewGrade', ['InterviewID', 'InterviewerID', 'RoundNumber', 'Grade'],
+                         parents=[interviews])
+    with interviews, assignments, grades:
+        interviews.extend(cg.rows(interview_ids, job_ids, applicant_ids, cg.datetimes_between(
+            rng, days_before(91), REFERENCE_DATE + timedelta(days=91), n)))
+        grades.extend(cg.rows(round_interviews, interviewers, cg.group_positions(num_rounds),
+                              cg.integers(rng, 60, 100, len(round_interviews))))
+        assignments.extend(cg.rows(assigned[:, 0], assigned[:, 1]))
+
+def generate_products(conn, first_id, last_id):
     product_types = ['Electronics', 'Furniture', 'Clothing', 'Food', 'Books']
     sizes = ['Small', 'Medium', 'Large', 'X-Large']
     styles = ['Modern', 'Classic', 'Casual', 'Formal', 'Sport']
-    
-    for _ in range(50):  # Generate 50 products
-        product_id = fake.unique.random_int(min=1, max=1000)
-        product_type = random.choice(product_types)
-        size = random.choice(sizes)
-        list_price = round(random.uniform(10.0, 1000.0), 2)
-        weight = round(random.uniform(0.1, 50.0), 2)
-        style = random.choice(styles)
-        
-        sql = """
-            INSERT INTO Product (ProductID, ProductType, Size, ListPrice, Weight, Style)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, (product_id, product_type, size, list_price, weight, style))
-    
-    conn.commit()
-    print("✅ Products inserted successfully!")
-    cursor.close()
-    conn.close()
+    n = last_id - first_id + 1
 
-def generate_sales():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Sale Table")
-    
+    columns = ['ProductID', 'ProductType', 'Size', 'ListPrice', 'Weight', 'Style']
+    with BatchWriter(conn, 'Product', columns) as writer:
+        writer.extend(cg.rows(np.arange(first_id, last_id + 1),
+                              cg.choice(rng, product_types, n),
+                              cg.choice(rng, sizes, n),
+                              cg.amounts(rng, 10.0, 1000.0, n),
+                              cg.amounts(rng, 0.1, 50.0, n),
+                              cg.choice(rng, styles, n)))
+
+def generate_sites(conn, first_id, last_id):
+    # The original three stores, then generated ones at larger scales
+    sites = [('Main Store', 'New York'),
+             ('Online Store', 'Virtual'),
+             ('Outlet Store', 'Los Angeles')]
+    locations = cg.words(rng, 'city', 25, last_id - first_id + 1).tolist()
+
+    with BatchWriter(conn, 'Site', ['SiteID', 'SiteName', 'Location']) as writer:
+        for site_id, location in zip(range(first_id, last_id + 1), locations):
+            i = site_id - ID_START['Site']
+            if i < len(sites):
+                site_name, location = sites[i]
+            else:
+                site_name = f"{location} Store"[:25]
+            writer.add((site_id, site_name, location))
+
+def generate_sales(conn, first_id, last_id):
     # Get salespeople and customers
-    cursor.execute("""
-        SELECT e.PersonID 
-        FROM Employee e 
-        JOIN PersonType pt ON e.PersonID = pt.PersonID 
-        WHERE pt.Type = 'Employee'
-    """)
-    salesperson_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("""
-        SELECT p.PersonID 
-        FROM Person p 
-        JOIN PersonType pt ON p.PersonID = pt.PersonID 
-        WHERE pt.Type = 'Customer'
-    """)
-    customer_ids = [row[0] for row in cursor.fetchall()]
-    
-    cursor.execute("SELECT ProductID FROM Product")
-    product_ids = [row[0] for row in cursor.fetchall()]
-    
-    # Create some sales sites
-    sites = [(1, 'Main Store', 'New York'),
-             (2, 'Online Store', 'Virtual'),
-             (3, 'Outlet Store', 'Los Angeles')]
-    
-    for site_id, site_name, location in sites:
-        sql = "INSERT INTO Site (SiteID, SiteName, Location) VALUES (%s, %s, %s)"
-        cursor.execute(sql, (site_id, site_name, location))
-    
+    salesperson_ids = fetch_ids(conn, 'Employee', 'PersonID')
+    customer_ids = fetch_ids(conn, 'Customer', 'PersonID')
+    product_ids = fetch_ids(conn, 'Product', 'ProductID')
+    site_ids = fetch_ids(conn, 'Site', 'SiteID')
+    n = last_id - first_id + 1
+
     # Generate sales records
-    for _ in range(200):  # Generate 200 sales
-        sales_id = fake.unique.random_int(min=1, max=1000)
-        salesperson_id = random.choice(salesperson_ids)
-        customer_id = random.choice(customer_ids)
-        product_id = random.choice(product_ids)
-        site_id = random.randint(1, 3)
-        sales_time = fake.date_time_between(start_date='-1y', end_date='now')
-        amount = round(random.uniform(10.0, 1000.0), 2)
-        
-        sql = """
-            INSERT INTO Sale (SalesID, SalesPersonID, CustomerID, ProductID, SiteID, SalesTime, Amount)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, (sales_id, salesperson_id, customer_id, product_id, 
-                           site_id, sales_time, amount))
-    
-    conn.commit()
-    print("✅ Sales data inserted successfully!")
-    cursor.close()
+    columns = ['SalesID', 'SalesPersonID', 'CustomerID', 'ProductID', 'SiteID', 'SalesTime', 'Amount']
+    with BatchWriter(conn, 'Sale', columns) as writer:
+        writer.extend(cg.rows(np.arange(first_id, last_id + 1),
+                              cg.choice(rng, salesperson_ids, n),
+                              cg.choice(rng, customer_ids, n),
+                              cg.choice(rng, product_ids, n),
+                              cg.choice(rng, site_ids, n),
+                              cg.datetimes_between(rng, days_before(365), REFERENCE_DATE, n),
+                              cg.amounts(rng, 10.0, 1000.0, n)))
+
+def generate_salaries(conn, first_id, last_id):
+    employee_ids = slice_ids(conn, 'Employee', 'PersonID', first_id, last_id)
+
+    # 12 months of salary records per employee; each employee owns a block of
+    # 12 transaction numbers
+    months = np.tile(np.arange(1, 13), len(employee_ids))
+    employees = np.repeat(employee_ids, 12)
+    columns = ['EmployeeID', 'TransactionNumber', 'PayDate', 'Amount']
+    with BatchWriter(conn, 'Salary', columns) as writer:
+        writer.extend(cg.rows(employees, (employees - 1) * 12 + months,
+                              cg.monthly(2024, 15)[months - 1],
+                              cg.integers(rng, 3000, 15000, len(employees))))
+
+def generate_preferred_salespeople(conn, first_id, last_id):
+    customer_ids = slice_ids(conn, 'Customer', 'PersonID', first_id, last_id)
+    employee_ids = fetch_ids(conn, 'Employee', 'PersonID')
+
+    # Half of the customers have a preference
+    preferring = customer_ids[rng.random(len(customer_ids)) < 0.5]
+    with BatchWriter(conn, 'PreferredSalesperson', ['CustomerID', 'SalesPersonID']) as writer:
+        writer.extend(cg.rows(preferring, cg.choice(rng, employee_ids, len(preferring))))
+
+def generate_employee_assignments(conn, first_id, last_id):
+    employee_ids = slice_ids(conn, 'Employee', 'PersonID', first_id, last_id)
+    dept_ids = fetch_ids(conn, 'Department', 'Department_ID')
+    site_ids = fetch_ids(conn, 'Site', 'SiteID')
+    n = len(employee_ids)
+
+    # 1-2 consecutive department shifts; only the latest is open-ended
+    starts = cg.datetimes_between(rng, days_before(3 * 365), days_before(365), n)
+    switches = cg.add_days(starts, cg.integers(rng, 30, 300, n))
+    two_shifts = cg.integers(rng, 1, 2, n) == 2
+    first_ends = np.where(two_shifts, cg.as_objects(switches), None)
+    no_end = np.full(n, None, dtype=object)
+
+    # Half of the employees are assigned to a site
+    on_site = rng.random(n) < 0.5
+    site_employees = employee_ids[on_site]
+    m = len(site_employees)
+
+    departments = BatchWriter(conn, 'EmployeeDepartmentAssignment',
+                              ['EmployeeID', 'DepartmentID', 'StartTime', 'EndTime'])
+    sites = BatchWriter(conn, 'EmployeeSiteAssignment',
+                        ['EmployeeID', 'SiteID', 'StartDate', 'EndDate'])
+    with departments, sites:
+        departments.extend(cg.rows(
+            cg.interleave(employee_ids, employee_ids, two_shifts),
+            cg.choice(rng, dept_ids, n + int(two_shifts.sum())),
+            cg.interleave(cg.as_objects(starts), cg.as_objects(switches), two_shifts),
+            cg.interleave(first_ends, no_end, two_shifts)))
+        sites.extend(cg.rows(site_employees, cg.choice(rng, site_ids, m),
+                             cg.dates_between(rng, days_before(3 * 365), REFERENCE_DATE, m),
+                             [None] * m))
+
+def generate_vendors(conn, first_id, last_id):
+    vendor_ids = np.arange(first_id, last_id + 1)
+    n = len(vendor_ids)
+    # Unique by construction
+    account_numbers = [f"AC-{vendor_id:010d}" for vendor_id in range(first_id, last_id + 1)]
+    columns = ['VendorID', 'Name', 'AddressLine1', 'AddressLine2', 'City', 'State',
+               'ZipCode', 'AccountNumber', 'CreditRating', 'PurchasingWebServiceURL']
+    with BatchWriter(conn, 'Vendor', columns) as writer:
+        writer.extend(cg.rows(vendor_ids,
+                              cg.words(rng, 'company', 50, n),
+                              cg.words(rng, 'street_address', 50, n),
+                              cg.words(rng, 'secondary_address', 50, n),
+                              cg.words(rng, 'city', 50, n),
+                              cg.words(rng, 'state_abbr', 13, n),
+                              cg.integers(rng, 1001, 99950, n),
+                              account_numbers,
+                              cg.integers(rng, 0, 10, n),
+                              cg.words(rng, 'url', 255, n)))
+
+def generate_parts(conn, first_id, last_id):
+    product_ids = fetch_ids(conn, 'Product', 'ProductID')
+    vendor_ids = np.asarray(fetch_ids(conn, 'Vendor', 'VendorID'))
+    part_ids = np.arange(first_id, last_id + 1)
+    n = len(part_ids)
+    products = cg.choice(rng, product_ids, n)
+    quantities = cg.integers(rng, 1, 20, n)
+
+    # Each part is offered by 1-3 different vendors
+    picks = min(len(vendor_ids), 3)
+    offered = cg.sample_distinct(rng, len(vendor_ids), picks, n)
+    keep = np.arange(picks) < np.minimum(cg.integers(rng, 1, 3, n), picks)[:, None]
+    vendor_parts_count = int(keep.sum())
+
+    parts = BatchWriter(conn, 'Part', ['PartID', 'ProductID', 'Quantity'])
+    product_parts = BatchWriter(conn, 'ProductPart', ['ProductID', 'PartID', 'Quantity'], parents=[parts])
+    vendor_parts = BatchWriter(conn, 'VendorPart', ['VendorID', 'PartID', 'Price'], parents=[parts])
+    with parts, product_parts, vendor_parts:
+        parts.extend(cg.rows(part_ids, products, quantities))
+        product_parts.extend(cg.rows(products, part_ids, quantities))
+        vendor_parts.extend(cg.rows(vendor_ids[offered[keep]], np.repeat(part_ids, keep.sum(axis=1)),
+                                    cg.amounts(rng, 0.5, 200.0, vendor_parts_count)))
+
+# Generation stages in foreign key order. Tables within a stage only depend on
+# earlier stages, so their slices can be generated concurrently. Each entry is
+# (generator, table whose ID range drives it).
+STAGES = [
+    [(generate_person_data, 'Person'), (generate_department_data, 'Department'),
+     (generate_products, 'Product'), (generate_vendors, 'Vendor'), (generate_sites, 'Site')],
+    [(generate_phone_numbers, 'Person'), (generate_person_types, 'Person'),
+     (generate_job_positions, 'JobPosition'), (generate_parts, 'Part')],
+    [(generate_customer_data, 'Person'), (generate_employee_data, 'Person')],
+    # Alone, so its row locks on Employee never interleave with the shared
+    # locks that foreign key checks from other workers take on the same rows
+    [(generate_supervisors, 'Person')],
+    [(generate_preferred_salespeople, 'Person'),
+     (generate_employee_assignments, 'Person'), (generate_applications, 'Application'),
+     (generate_sales, 'Sale'), (generate_salaries, 'Person')],
+    [(generate_interviews, 'Application')],
+]
+
+def plan_ranges(counts):
+    """Reserve each driving table's ID range: table -> (first_id, last_id)."""
+    reset_sequences()
+    ranges = {'Department': (1, 1)}  # Fixed rows, a single slice
+    for table, count in counts.items():
+        block = sequences[table].reserve(count)
+        ranges[table] = (block[0], block[-1])
+    return ranges
+
+def split_range(first_id, last_id, chunk_size):
+    return [(lo, min(lo + chunk_size - 1, last_id)) for lo in range(first_id, last_id + 1, chunk_size)]
+
+def chunk_seed(seed, name, first_id):
+    return zlib.crc32(f"{seed}:{name}:{first_id}".encode())
+
+_worker_conn = None
+
+def run_slice(task):
+    """Generate one slice on this process's connection, or into its own files
+    under export_dir; returns its load stats."""
+    global _worker_conn
+    generator, first_id, last_id, seed, export_dir, file_format = task
+    seed_generators(chunk_seed(seed, generator.__name__, first_id))
+    load_stats.clear()
+    if export_dir:
+        sink = DelimitedFileSink(export_dir, first_id, last_id, generator.__name__, file_format)
+        generator(sink, first_id, last_id)
+        sink.close()
+    else:
+        if _worker_conn is None:
+            _worker_conn = connect_to_db()
+        generator(_worker_conn, first_id, last_id)
+        _worker_conn.commit()
+    stats = dict(load_stats)
+    load_stats.clear()
+    return stats
+
+def _init_worker():
+    global _worker_conn
+    _worker_conn = None
+    _id_cache.clear()
+
+def run_stages(counts, seed, workers=1, chunk_size=CHUNK_SIZE, export_dir=None, file_format='tsv'):
+    """Generate every stage, fanning slices out over a process pool.
+
+    With export_dir, rows are written to delimited files there instead of the
+    database, ready for load_delimited_files().
+    """
+    global _worker_conn
+    ranges = plan_ranges(counts)
+    totals = {}
+    for stage in STAGES:
+        tasks = [(generator, lo, hi, seed, export_dir, file_format)
+                 for generator, table in stage
+                 for lo, hi in split_range(*ranges[table], chunk_size)]
+        for generator, _ in stage:
+            print(f"-- {generator.__name__}")
+
+        started = time.perf_counter()
+        if workers > 1:
+            # A fresh pool per stage: workers reconnect and re-read parent IDs
+            with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+                results = list(pool.imap_unordered(run_slice, tasks))
+        else:
+            _init_worker()
+            results = [run_slice(task) for task in tasks]
+            if _worker_conn is not None:
+                _worker_conn.close()
+                _worker_conn = None
+        elapsed = time.perf_counter() - started
+
+        # Slices run concurrently, so a table's rate is its rows over the
+        # wall time of the stage that produced it
+        stage_totals = {}
+        for stats in results:
+            for label, (rows, _seconds) in stats.items():
+                stage_totals[label] = stage_totals.get(label, 0) + rows
+        for label, rows in stage_totals.items():
+            total = totals.setdefault(label, [0, 0.0])
+            total[0] += rows
+            total[1] += elapsed
+
+    load_stats.clear()
+    load_stats.update(totals)
+
+def clear_existing_data(mode='truncate'):
+    conn = connect_to_db()
+
+    print(f"Clearing existing data ({mode})...")
+
+    # Every table in DDL.sql, children first, with foreign key checks off
+    for table in reset_tables(conn, mode=mode):
+        print(f"Cleared {table} table")
+
     conn.close()
+    print("✅ All existing data cleared!")
 
-def generate_salaries():
+def suspend_summaries():
+    # Summary and hierarchy triggers would fire for every generated row; rebuild once instead
     conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("-- INSERT INTO Salary Table")
-    
-    cursor.execute("SELECT PersonID FROM Employee")
-    employee_ids = [row[0] for row in cursor.fetchall()]
-    
-    for employee_id in employee_ids:
-        # Generate 12 months of salary records
-        for month in range(1, 13):
-            transaction_number = fake.unique.random_int(min=1, max=10000)
-            pay_date = datetime(2024, month, 15)
-            amount = random.randint(3000, 15000)
-            
-            sql = """
-                INSERT INTO Salary (EmployeeID, TransactionNumber, PayDate, Amount)
-                VALUES (%s, %s, %s, %s)
-            """
-            cursor.execute(sql, (employee_id, transaction_number, pay_date, amount))
-    
-    conn.commit()
-    print("✅ Salary data inserted successfully!")
-    cursor.close()
+    if summaries.suspend(conn):
+        print("Summary table triggers suspended for the load")
+    hierarchy.suspend(conn)
     conn.close()
 
-def clear_existing_data():
+def resume_summaries():
     conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("Clearing existing data...")
-    
-    # Delete in reverse order of dependencies to avoid foreign key constraint issues
-    tables = [
-        'Salary', 'Sale', 'Product', 'Site', 'InterviewGrade', 'Interview', 
-        'Application', 'JobPosition', 'Department', 'Employee', 
-        'Customer', 'PersonType', 'PhoneNumber', 'Person'
-    ]
-    
-    for table in tables:
-        try:
-            cursor.execute(f"DELETE FROM {table}")
-            print(f"Cleared {table} table")
-        except Exception as e:
-            print(f"Error clearing {table}: {e}")
-    
-    conn.commit()
-    cursor.close()
+    if summaries.resume(conn):
+        print("✅ Summary tables rebuilt")
+    try:
+        rows, depth, _cleared = hierarchy.resume(conn)
+        print(f"✅ Employee hierarchy rebuilt ({rows} rows, {depth} levels)")
+    except hierarchy.HierarchyError as e:
+        print(f"⚠️ Employee hierarchy not rebuilt: {e}. "
+              f"Run `python hierarchy.py install --break-cycles` to clear one link per cycle.")
     conn.close()
-    print("✅ All existing data cleared!")
 
-def main():
-    print("Starting data generation...")
-    
-    # Clear existing data first
-    clear_existing_data()
-    
-    # Generate data in the correct order to maintain referential integrity
-    generate_person_data()
-    generate_phone_numbers()
-    generate_person_types()
-    generate_customer_data()
-    generate_employee_data()
-    generate_department_data()
-    generate_job_positions()
-    generate_applications()
-    generate_interviews()
-    generate_products()
-    generate_sales()
-    generate_salaries()
-    
-    print("✅ All data generated successfully!")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Populate the XYZ Company database with random data.")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="scale factor; 1 generates 100 persons, 200 sales, ... and every "
+                             "table grows proportionally")
+    parser.add_argument('--seed', type=int, default=42,
+                        help="random seed, so that runs with the same arguments are reproducible")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes generating and loading slices in parallel "
+                             "(0 uses every core)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help="IDs per slice handed to a worker")
+    parser.add_argument('--export', metavar='DIR',
+                        help="write the generated rows to delimited files in DIR instead "
+                             "of inserting them")
+    parser.add_argument('--load', metavar='DIR',
+                        help="replace the database contents with the files in DIR using "
+                             "LOAD DATA LOCAL INFILE (combine with --export to do both)")
+    parser.add_argument('--format', choices=sorted(DELIMITERS), default='tsv',
+                        help="file format for --export")
+    parser.add_argument('--reset', choices=RESET_MODES, default='truncate',
+                        help="how existing data is cleared first (see reset_db.py)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    counts = row_counts(args.scale)
+    workers = args.workers or os.cpu_count()
+
+    if args.export or not args.load:
+        print(f"Starting data generation (scale {args.scale}, seed {args.seed}, {workers} worker(s))...")
+
+        # Files are loaded into an empty database later; direct inserts need it emptied now
+        if not args.export:
+            clear_existing_data(args.reset)
+
+        # Generate data stage by stage to maintain referential integrity
+        if not args.export:
+            suspend_summaries()
+        run_stages(counts, args.seed, workers=workers, chunk_size=args.chunk_size,
+                   export_dir=args.export, file_format=args.format)
+        if not args.export:
+            resume_summaries()
+
+        print("✅ All data generated successfully!")
+        report_load_stats()
+
+    if args.load:
+        clear_existing_data(args.reset)
+        load_stats.clear()
+        suspend_summaries()
+        conn = connect_to_db(local_infile=True)
+        load_delimited_files(conn, args.load, table_names())
+        conn.close()
+        resume_summaries()
+        print("✅ All files loaded successfully!")
+        report_load_stats()
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,50 +1,39 @@
+import argparse
 import pymysql
 from datetime import datetime, timedelta
 import os
 from dotenv import load_dotenv
+from bulk_insert import DELIMITERS, BatchWriter, DelimitedFileSink, load_delimited_files
+from ddl import table_names
+import summaries
+from reset_db import RESET_MODES, reset_tables
 
 # Load environment variables
 load_dotenv()
 
-def connect_to_db():
+def connect_to_db(local_infile=False):
     return pymysql.connect(
         host=os.getenv('DB_HOST', 'localhost'),
         user=os.getenv('DB_USER', 'root'),
         password=os.getenv('DB_PASSWORD', ''),
-        database=os.getenv('DB_NAME', 'xyzcompany')
+        database=os.getenv('DB_NAME', 'xyzcompany'),
+        local_infile=local_infile
     )
 
-def clear_existing_data():
+def clear_existing_data(mode='truncate'):
     conn = connect_to_db()
-    cursor = conn.cursor()
-    
-    print("Clearing existing data...")
-    
-    # Delete in reverse order of dependencies to avoid foreign key constraint issues
-    tables = [
-        'Salary', 'Sale', 'ProductPart', 'VendorPart', 'Part', 'Product', 
-        'EmployeeSiteAssignment', 'Site', 'Vendor', 'InterviewGrade', 
-        'InterviewerAssignment', 'Interview', 'Application', 'JobPosition', 
-        'EmployeeDepartmentAssignment', 'Department', 'PreferredSalesperson', 
-        'Customer', 'Employee', 'PersonType', 'PhoneNumber', 'Person'
-    ]
-    
-    for table in tables:
-        try:
-            cursor.execute(f"DELETE FROM {table}")
-            print(f"Cleared {table} table")
-        except Exception as e:
-            print(f"Error clearing {table}: {e}")
-    
-    conn.commit()
-    cursor.close()
+
+    print(f"Clearing existing data ({mode})...")
+
+    # Every table in DDL.sql, children first, with foreign key checks off
+    for table in reset_tables(conn, mode=mode):
+        print(f"Cleared {table} table")
+
     conn.close()
     print("✅ All existing data cleared!")
 
-def generate_specific_data():
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    
+def generate_specific_data(conn):
+    """Write the fixed dataset through conn, a connection or a DelimitedFileSink."""
     # Create people
     print("Generating specific person data...")
     people = [
@@ -65,13 +54,11 @@ def generate_specific_data():
         (15, "Thompson", "Sophia", 34, "F", "951 Maple Ln", "Suite 2", "Portland", "OR", "97201", "sophia.t@example.com")
     ]
     
-    for person in people:
-        sql = """
-            INSERT INTO Person 
-            (PersonID, LastName, FirstName, Age, Gender, AddressLine1, AddressLine2, City, State, ZipCode, Email)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, person)
+    with BatchWriter(conn, 'Person', [
+        'PersonID', 'LastName', 'FirstName', 'Age', 'Gender', 'AddressLine1', 'AddressLine2',
+        'City', 'State', 'ZipCode', 'Email'
+    ]) as writer:
+        writer.extend(people)
     
     # Create phone numbers
     print("Generating phone numbers...")
@@ -93,9 +80,8 @@ def generate_specific_data():
         (15, "555-567-1234")
     ]
     
-    for phone in phone_numbers:
-        sql = "INSERT INTO PhoneNumber (PersonID, PhoneNumber) VALUES (%s, %s)"
-        cursor.execute(sql, phone)
+    with BatchWriter(conn, 'PhoneNumber', ['PersonID', 'PhoneNumber']) as writer:
+        writer.extend(phone_numbers)
     
     # Assign person types
     print("Assigning person types...")
@@ -117,17 +103,15 @@ def generate_specific_data():
         (15, "Customer")   # Sophia Thompson - Customer
     ]
     
-    for person_type in person_types:
-        sql = "INSERT INTO PersonType (PersonID, Type) VALUES (%s, %s)"
-        cursor.execute(sql, person_type)
+    with BatchWriter(conn, 'PersonType', ['PersonID', 'Type']) as writer:
+        writer.extend(person_types)
     
     # Create customers
     print("Creating customer records...")
     customers = [5, 6, 8, 10, 12, 15]  # Customer PersonIDs
     
-    for customer_id in customers:
-        sql = "INSERT INTO Customer (PersonID) VALUES (%s)"
-        cursor.execute(sql, (customer_id,))
+    with BatchWriter(conn, 'Customer', ['PersonID']) as writer:
+        writer.extend((customer_id,) for customer_id in customers)
     
     # Create employees
     print("Creating employee records...")
@@ -141,9 +125,8 @@ def generate_specific_data():
         (14, "Senior", "Finance Manager", None)  # James Martin - no supervisor
     ]
     
-    for employee in employees:
-        sql = "INSERT INTO Employee (PersonID, Erank, Title, SupervisorID) VALUES (%s, %s, %s, %s)"
-        cursor.execute(sql, employee)
+    with BatchWriter(conn, 'Employee', ['PersonID', 'Erank', 'Title', 'SupervisorID']) as writer:
+        writer.extend(employees)
     
     # Create departments
     print("Creating departments...")
@@ -155,9 +138,8 @@ def generate_specific_data():
         (5, "Engineering")
     ]
     
-    for dept in departments:
-        sql = "INSERT INTO Department (Department_ID, DepartmentName) VALUES (%s, %s)"
-        cursor.execute(sql, dept)
+    with BatchWriter(conn, 'Department', ['Department_ID', 'DepartmentName']) as writer:
+        writer.extend(departments)
     
     # Assign employees to departments
     print("Assigning employees to departments...")
@@ -176,13 +158,10 @@ def generate_specific_data():
         (1, 5, "2023-04-15 09:00:00", None)   # John Smith - also in Engineering
     ]
     
-    for emp_dept in employee_departments:
-        sql = """
-            INSERT INTO EmployeeDepartmentAssignment 
-            (EmployeeID, DepartmentID, StartTime, EndTime) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, emp_dept)
+    with BatchWriter(conn, 'EmployeeDepartmentAssignment', [
+        'EmployeeID', 'DepartmentID', 'StartTime', 'EndTime'
+    ]) as writer:
+        writer.extend(employee_departments)
     
     # Create job positions
     print("Creating job positions...")
@@ -194,13 +173,10 @@ def generate_specific_data():
         (12345, 5, "Software Engineer", "2023-06-15")  # Job 12345 for the query
     ]
     
-    for job in job_positions:
-        sql = """
-            INSERT INTO JobPosition 
-            (JobID, DepartmentID, JobDescription, PostedDate) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, job)
+    with BatchWriter(conn, 'JobPosition', [
+        'JobID', 'DepartmentID', 'JobDescription', 'PostedDate'
+    ]) as writer:
+        writer.extend(job_positions)
     
     # Create applications
     print("Creating job applications...")
@@ -211,13 +187,10 @@ def generate_specific_data():
         (1004, 4, 12345, "2023-06-25", "Pending")    # James Brown (employee) applied for Software Engineer
     ]
     
-    for app in applications:
-        sql = """
-            INSERT INTO Application 
-            (ApplicationID, ApplicantID, JobID, ApplicationDate, Status) 
-            VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, app)
+    with BatchWriter(conn, 'Application', [
+        'ApplicationID', 'ApplicantID', 'JobID', 'ApplicationDate', 'Status'
+    ]) as writer:
+        writer.extend(applications)
     
     # Create interviews
     print("Creating interviews...")
@@ -225,13 +198,10 @@ def generate_specific_data():
         (101, 11111, 3, "2011-01-15 13:00:00")  # Hellen Cole interview for 11111
     ]
     
-    for interview in interviews:
-        sql = """
-            INSERT INTO Interview 
-            (InterviewID, JobID, CandidateID, InterviewTime) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, interview)
+    with BatchWriter(conn, 'Interview', [
+        'InterviewID', 'JobID', 'CandidateID', 'InterviewTime'
+    ]) as writer:
+        writer.extend(interviews)
     
     # Assign interviewers
     print("Assigning interviewers...")
@@ -240,13 +210,8 @@ def generate_specific_data():
         (101, 4)   # James Brown interviewing Hellen Cole
     ]
     
-    for interviewer in interviewers:
-        sql = """
-            INSERT INTO InterviewerAssignment 
-            (InterviewID, InterviewerID) 
-            VALUES (%s, %s)
-        """
-        cursor.execute(sql, interviewer)
+    with BatchWriter(conn, 'InterviewerAssignment', ['InterviewID', 'InterviewerID']) as writer:
+        writer.extend(interviewers)
     
     # Add interview grades
     print("Adding interview grades...")
@@ -263,13 +228,10 @@ def generate_specific_data():
         (101, 4, 5, 86)   # Round 5 by James Brown
     ]
     
-    for grade in interview_grades:
-        sql = """
-            INSERT INTO InterviewGrade 
-            (InterviewID, InterviewerID, RoundNumber, Grade) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, grade)
+    with BatchWriter(conn, 'InterviewGrade', [
+        'InterviewID', 'InterviewerID', 'RoundNumber', 'Grade'
+    ]) as writer:
+        writer.extend(interview_grades)
     
     # Create products
     print("Creating products...")
@@ -282,13 +244,10 @@ def generate_specific_data():
         (106, "Cup", "Medium", 20.00, 0.5, "Classic")  # Another Cup for the query
     ]
     
-    for product in products:
-        sql = """
-            INSERT INTO Product 
-            (ProductID, ProductType, Size, ListPrice, Weight, Style) 
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, product)
+    with BatchWriter(conn, 'Product', [
+        'ProductID', 'ProductType', 'Size', 'ListPrice', 'Weight', 'Style'
+    ]) as writer:
+        writer.extend(products)
     
     # Create sites
     print("Creating sites...")
@@ -298,9 +257,8 @@ def generate_specific_data():
         (3, "Outlet Store", "Los Angeles")
     ]
     
-    for site in sites:
-        sql = "INSERT INTO Site (SiteID, SiteName, Location) VALUES (%s, %s, %s)"
-        cursor.execute(sql, site)
+    with BatchWriter(conn, 'Site', ['SiteID', 'SiteName', 'Location']) as writer:
+        writer.extend(sites)
     
     # Create site assignments for employees
     print("Assigning employees to sites...")
@@ -310,13 +268,10 @@ def generate_specific_data():
         (11, 3, "2023-02-15", None)  # Emma Jackson at Outlet Store
     ]
     
-    for emp_site in employee_sites:
-        sql = """
-            INSERT INTO EmployeeSiteAssignment 
-            (EmployeeID, SiteID, StartDate, EndDate) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, emp_site)
+    with BatchWriter(conn, 'EmployeeSiteAssignment', [
+        'EmployeeID', 'SiteID', 'StartDate', 'EndDate'
+    ]) as writer:
+        writer.extend(employee_sites)
     
     # Create sales
     print("Creating sales...")
@@ -329,13 +284,10 @@ def generate_specific_data():
         (506, 11, 15, 106, 3, "2023-05-25 15:30:00", 20.00)   # Emma sold Cup to Sophia
     ]
     
-    for sale in sales:
-        sql = """
-            INSERT INTO Sale 
-            (SalesID, SalesPersonID, CustomerID, ProductID, SiteID, SalesTime, Amount) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, sale)
+    with BatchWriter(conn, 'Sale', [
+        'SalesID', 'SalesPersonID', 'CustomerID', 'ProductID', 'SiteID', 'SalesTime', 'Amount'
+    ]) as writer:
+        writer.extend(sales)
     
     # Create vendors
     print("Creating vendors...")
@@ -347,13 +299,10 @@ def generate_specific_data():
         (205, "CupCraft", "555 Pottery Ln", "", "Boulder", "CO", "80301", "CC-97531", 8, "https://cupcraft.com")
     ]
     
-    for vendor in vendors:
-        sql = """
-            INSERT INTO Vendor 
-            (VendorID, Name, AddressLine1, AddressLine2, City, State, ZipCode, AccountNumber, CreditRating, PurchasingWebServiceURL) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(sql, vendor)
+    with BatchWriter(conn, 'Vendor', [
+        'VendorID', 'Name', 'AddressLine1', 'AddressLine2', 'City', 'State', 'ZipCode', 'AccountNumber', 'CreditRating', 'PurchasingWebServiceURL'
+    ]) as writer:
+        writer.extend(vendors)
     
     # Create parts
     print("Creating parts...")
@@ -366,9 +315,8 @@ def generate_specific_data():
         (306, 106, 15)  # Part for Cup
     ]
     
-    for part in parts:
-        sql = "INSERT INTO Part (PartID, ProductID, Quantity) VALUES (%s, %s, %s)"
-        cursor.execute(sql, part)
+    with BatchWriter(conn, 'Part', ['PartID', 'ProductID', 'Quantity']) as writer:
+        writer.extend(parts)
     
     # Create vendor parts
     print("Creating vendor parts pricing...")
@@ -382,9 +330,8 @@ def generate_specific_data():
         (205, 306, 4.50)    # CupCraft provides part 306
     ]
     
-    for vendor_part in vendor_parts:
-        sql = "INSERT INTO VendorPart (VendorID, PartID, Price) VALUES (%s, %s, %s)"
-        cursor.execute(sql, vendor_part)
+    with BatchWriter(conn, 'VendorPart', ['VendorID', 'PartID', 'Price']) as writer:
+        writer.extend(vendor_parts)
     
     # Create product parts
     print("Creating product parts...")
@@ -397,9 +344,8 @@ def generate_specific_data():
         (106, 306, 1)   # Cup uses part 306
     ]
     
-    for product_part in product_parts:
-        sql = "INSERT INTO ProductPart (ProductID, PartID, Quantity) VALUES (%s, %s, %s)"
-        cursor.execute(sql, product_part)
+    with BatchWriter(conn, 'ProductPart', ['ProductID', 'PartID', 'Quantity']) as writer:
+        writer.extend(product_parts)
     
     # Create salaries
     print("Creating salary records...")
@@ -424,28 +370,52 @@ def generate_specific_data():
         (14, 10018, "2023-03-15", 7200)   # James Martin - March
     ]
     
-    for salary in salaries:
-        sql = """
-            INSERT INTO Salary 
-            (EmployeeID, TransactionNumber, PayDate, Amount) 
-            VALUES (%s, %s, %s, %s)
-        """
-        cursor.execute(sql, salary)
+    with BatchWriter(conn, 'Salary', [
+        'EmployeeID', 'TransactionNumber', 'PayDate', 'Amount'
+    ]) as writer:
+        writer.extend(salaries)
     
     conn.commit()
     print("✅ All specific test data generated successfully!")
-    cursor.close()
-    conn.close()
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load the fixed XYZ Company test dataset.")
+    parser.add_argument('--export', metavar='DIR',
+                        help="write the dataset to delimited files in DIR instead of inserting it")
+    parser.add_argument('--load', metavar='DIR',
+                        help="replace the database contents with the files in DIR using "
+                             "LOAD DATA LOCAL INFILE (combine with --export to do both)")
+    parser.add_argument('--format', choices=sorted(DELIMITERS), default='tsv',
+                        help="file format for --export")
+    parser.add_argument('--reset', choices=RESET_MODES, default='truncate',
+                        help="how existing data is cleared first (see reset_db.py)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     print("Starting test data generation...")
-    
-    # Clear existing data first
-    clear_existing_data()
-    
-    # Generate specific data for the queries
-    generate_specific_data()
-    
+
+    if args.export:
+        sink = DelimitedFileSink(args.export, name='test_data', file_format=args.format)
+        generate_specific_data(sink)
+        sink.close()
+    elif not args.load:
+        # Clear existing data first
+        clear_existing_data(args.reset)
+
+        # Generate specific data for the queries
+        conn = connect_to_db()
+        generate_specific_data(conn)
+        conn.close()
+
+    if args.load:
+        clear_existing_data(args.reset)
+        conn = connect_to_db(local_infile=True)
+        summaries.suspend(conn)
+        load_delimited_files(conn, args.load, table_names())
+        summaries.resume(conn)
+        conn.close()
+
     print("✅ Test data generation completed successfully!")
 
 if __name__ == "__main__":
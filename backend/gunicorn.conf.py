@@ -0,0 +1,31 @@
+"""gunicorn settings for the Flask app: gunicorn -c gunicorn.conf.py wsgi:application
+
+Every setting can be overridden through the environment.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5002")
+# One process per core by default; each runs WEB_THREADS request threads
+workers = int(os.getenv("WEB_WORKERS", 0)) or multiprocessing.cpu_count()
+threads = int(os.getenv("WEB_THREADS", 4))
+worker_class = "gthread" if threads > 1 else "sync"
+# Import the app once in the master and fork workers from it
+preload_app = True
+timeout = int(os.getenv("WEB_TIMEOUT", 60))
+# Time in-flight requests get to finish on reload or shutdown
+graceful_timeout = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("WEB_KEEPALIVE", 5))
+# Recycle workers now and then so slow leaks can't build up; jitter keeps them from restarting together
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("WEB_ACCESS_LOG", "-")
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+
+
+def post_fork(server, worker):
+    # Connection pools are per process: drop any the master opened before forking
+    import db_pool
+
+    db_pool.reset_after_fork()
+    server.log.info(f"Worker {worker.pid} started")
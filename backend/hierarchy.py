@@ -0,0 +1,291 @@
+import argparse
+import os
+
+import pymysql
+from dotenv import load_dotenv
+
+from ddl import create_table_statements, index_statements
+
+load_dotenv()
+
+# Closure table of Employee.SupervisorID, created by DDL.sql
+HIERARCHY_TABLE = 'EmployeeHierarchy'
+
+# Rows (a, d) on a path through {row}: a at or above it, d at or below it.
+# Removing them detaches {row}'s subtree from everyone above it; with {row}
+# itself included on both sides, {row}'s own rows go too.
+_PATHS_THROUGH = """
+    DELETE h FROM EmployeeHierarchy h
+    JOIN EmployeeHierarchy up ON up.AncestorID = h.AncestorID AND up.DescendantID = {row}.PersonID{above}
+    JOIN EmployeeHierarchy sub ON sub.DescendantID = h.DescendantID AND sub.AncestorID = {row}.PersonID
+"""
+
+# Paths from every supervisor at or above NEW.SupervisorID to every employee
+# at or below NEW.PersonID
+_ATTACH = """
+    INSERT INTO EmployeeHierarchy (AncestorID, DescendantID, Depth)
+    SELECT up.AncestorID, sub.DescendantID, up.Depth + sub.Depth + 1
+    FROM EmployeeHierarchy up
+    JOIN EmployeeHierarchy sub ON sub.AncestorID = NEW.PersonID
+    WHERE up.DescendantID = NEW.SupervisorID
+"""
+
+_CYCLE_CHECK = """
+    IF NEW.SupervisorID IS NOT NULL AND EXISTS (
+        SELECT 1 FROM EmployeeHierarchy
+        WHERE AncestorID = NEW.PersonID AND DescendantID = NEW.SupervisorID
+    ) THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supervisor change would create a cycle';
+    END IF;
+"""
+
+# (name, timing, event, table, body). Deleting a Person cascades into
+# Employee without firing Employee's triggers, so the Person trigger detaches
+# the subtree first; the FOREIGN KEY ... ON DELETE SET NULL on SupervisorID
+# then turns the direct reports into roots, as the closure already says.
+TRIGGERS = [
+    ('EmployeeHierarchy_employee_before_insert', 'BEFORE', 'INSERT', 'Employee', """
+        IF NEW.SupervisorID = NEW.PersonID THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Supervisor change would create a cycle';
+        END IF;
+    """),
+    ('EmployeeHierarchy_employee_insert', 'AFTER', 'INSERT', 'Employee', f"""
+        INSERT INTO EmployeeHierarchy (AncestorID, DescendantID, Depth) VALUES (NEW.PersonID, NEW.PersonID, 0);
+        {_ATTACH.strip()};
+    """),
+    ('EmployeeHierarchy_employee_before_update', 'BEFORE', 'UPDATE', 'Employee', f"""
+        IF NEW.PersonID <> OLD.PersonID THEN
+            SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'PersonID of an employee cannot change';
+        END IF;
+        IF NOT (NEW.SupervisorID <=> OLD.SupervisorID) THEN
+            {_CYCLE_CHECK.strip()}
+        END IF;
+    """),
+    ('EmployeeHierarchy_employee_update', 'AFTER', 'UPDATE', 'Employee', f"""
+        IF NOT (NEW.SupervisorID <=> OLD.SupervisorID) THEN
+            {_PATHS_THROUGH.format(row='OLD', above=' AND up.Depth > 0').strip()};
+            {_ATTACH.strip()};
+        END IF;
+    """),
+    ('EmployeeHierarchy_employee_delete', 'BEFORE', 'DELETE', 'Employee', f"""
+        {_PATHS_THROUGH.format(row='OLD', above='').strip()};
+    """),
+    ('EmployeeHierarchy_person_delete', 'BEFORE', 'DELETE', 'Person', f"""
+        {_PATHS_THROUGH.format(row='OLD', above='').strip()};
+    """),
+]
+
+TRIGGERS_SQL = "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()"
+INSTALLED_SQL = ("SELECT COUNT(*) FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s")
+
+
+class HierarchyError(Exception):
+    """Raised when the supervisor links contain cycles, which have no closure."""
+
+
+def connect_to_db():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'xyzcompany')
+    )
+
+
+def trigger_statements():
+    """(trigger name, CREATE TRIGGER statement) for every trigger maintaining the closure."""
+    return [(name, f"CREATE TRIGGER {name} {timing} {event} ON {table} FOR EACH ROW\n"
+                   f"BEGIN\n{body.strip()}\nEND")
+            for name, timing, event, table, body in TRIGGERS]
+
+
+def find_cycles(supervisors):
+    """Cycles in {employee: supervisor}, each as its members starting from the lowest ID.
+
+    Follows every chain of command once, so it is linear in the number of
+    employees.
+    """
+    walked = {}
+    cycles = []
+    for start in supervisors:
+        path = []
+        employee = start
+        while employee is not None and employee not in walked:
+            walked[employee] = start
+            path.append(employee)
+            employee = supervisors.get(employee)
+        # Meeting this walk's own path again closes a cycle
+        if employee is not None and walked[employee] == start:
+            cycle = path[path.index(employee):]
+            lowest = cycle.index(min(cycle))
+            cycles.append(cycle[lowest:] + cycle[:lowest])
+    return cycles
+
+
+def table_exists(cursor):
+    cursor.execute(INSTALLED_SQL, (HIERARCHY_TABLE,))
+    return cursor.fetchall()[0][0] > 0
+
+
+def create_table(conn):
+    """Create the closure table and its indexes as in DDL.sql, unless it exists.
+
+    Databases created before DDL.sql had the table lack it.
+    """
+    cursor = conn.cursor()
+    try:
+        if not table_exists(cursor):
+            statement = create_table_statements()[HIERARCHY_TABLE]
+            cursor.execute(statement.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+            for _name, table, index in index_statements():
+                if table == HIERARCHY_TABLE:
+                    cursor.execute(index)
+    finally:
+        cursor.close()
+
+
+def supervisor_links(cursor):
+    cursor.execute("SELECT PersonID, SupervisorID FROM Employee")
+    return {employee: supervisor for employee, supervisor in cursor.fetchall()}
+
+
+def rebuild(conn, break_cycles=False):
+    """Recompute the closure from Employee.SupervisorID in one transaction,
+    creating the table first if needed.
+
+    Each level is one INSERT ... SELECT extending the paths found so far by
+    one supervisor link. Supervisor cycles raise HierarchyError, or with
+    break_cycles lose the link of their lowest-ID member. Returns
+    (closure rows, deepest level, employees whose links were cleared).
+    """
+    create_table(conn)
+    cursor = conn.cursor()
+    try:
+        cycles = find_cycles(supervisor_links(cursor))
+        if cycles and not break_cycles:
+            shown = '; '.join(' -> '.join(map(str, cycle + cycle[:1])) for cycle in cycles[:5])
+            raise HierarchyError(f"{len(cycles)} supervisor cycle(s): {shown}")
+        cleared = [cycle[0] for cycle in cycles]
+        if cleared:
+            cursor.execute(f"UPDATE Employee SET SupervisorID = NULL "
+                           f"WHERE PersonID IN ({', '.join(['%s'] * len(cleared))})", cleared)
+        cursor.execute(f"DELETE FROM {HIERARCHY_TABLE}")
+        cursor.execute(f"INSERT INTO {HIERARCHY_TABLE} (AncestorID, DescendantID, Depth) "
+                       f"SELECT PersonID, PersonID, 0 FROM Employee")
+        rows, depth = cursor.rowcount, 0
+        while True:
+            cursor.execute(
+                f"INSERT INTO {HIERARCHY_TABLE} (AncestorID, DescendantID, Depth) "
+                f"SELECT h.AncestorID, e.PersonID, h.Depth + 1 "
+                f"FROM {HIERARCHY_TABLE} h JOIN Employee e ON e.SupervisorID = h.DescendantID "
+                f"WHERE h.Depth = %s", (depth,)
+            )
+            if not cursor.rowcount:
+                break
+            rows += cursor.rowcount
+            depth += 1
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return rows, depth, cleared
+
+
+def install_triggers(conn):
+    cursor = conn.cursor()
+    for name, statement in trigger_statements():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(statement)
+    cursor.close()
+
+
+def drop_triggers(conn):
+    cursor = conn.cursor()
+    for name, _ in trigger_statements():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.close()
+
+
+def suspend(conn):
+    """Drop the triggers ahead of a bulk load, which resume() follows with a rebuild.
+
+    Each supervisor change moves a whole subtree, so per-row maintenance
+    during a load costs far more than one rebuild afterwards.
+    """
+    drop_triggers(conn)
+
+
+def resume(conn, break_cycles=False):
+    """Rebuild the closure and reinstall its triggers; returns rebuild()'s result."""
+    result = rebuild(conn, break_cycles)
+    install_triggers(conn)
+    return result
+
+
+def status(cursor):
+    """(closure rows, deepest level, missing trigger names); None without the table."""
+    if not table_exists(cursor):
+        return None
+    cursor.execute(f"SELECT COUNT(*), MAX(Depth) FROM {HIERARCHY_TABLE}")
+    rows, depth = cursor.fetchall()[0]
+    cursor.execute(TRIGGERS_SQL)
+    present = {name.lower() for (name,) in cursor.fetchall()}
+    missing = [name for name, _ in trigger_statements() if name.lower() not in present]
+    return rows, depth or 0, missing
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain EmployeeHierarchy, the closure table of "
+                                                 "Employee.SupervisorID, with triggers.")
+    parser.add_argument('command', choices=['install', 'rebuild', 'check', 'status', 'uninstall'])
+    parser.add_argument('--break-cycles', action='store_true',
+                        help="clear the supervisor of the lowest-ID employee in each cycle "
+                             "instead of failing")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect_to_db()
+    try:
+        if args.command in ('install', 'rebuild'):
+            rows, depth, cleared = (resume(conn, args.break_cycles) if args.command == 'install'
+                                    else rebuild(conn, args.break_cycles))
+            if cleared:
+                print(f"Cleared the supervisor of {len(cleared)} employee(s) to break cycles: "
+                      f"{', '.join(map(str, cleared))}")
+            print(f"✅ {HIERARCHY_TABLE} rebuilt: {rows} rows, {depth} level(s) below the top")
+        elif args.command == 'check':
+            cursor = conn.cursor()
+            cycles = find_cycles(supervisor_links(cursor))
+            cursor.close()
+            for cycle in cycles:
+                print("CYCLE " + " -> ".join(map(str, cycle + cycle[:1])))
+            print(f"{'❌' if cycles else '✅'} {len(cycles)} supervisor cycle(s)")
+            return 1 if cycles else 0
+        elif args.command == 'uninstall':
+            drop_triggers(conn)
+            print(f"Triggers dropped; {HIERARCHY_TABLE} is no longer maintained")
+        else:
+            cursor = conn.cursor()
+            state = status(cursor)
+            cursor.close()
+            if state is None:
+                print(f"{HIERARCHY_TABLE} does not exist; run `python hierarchy.py install`")
+                return 1
+            rows, depth, missing = state
+            print(f"{HIERARCHY_TABLE}: {rows} rows, {depth} level(s) below the top, "
+                  + (f"triggers missing: {', '.join(missing)}" if missing else "maintained by triggers"))
+    except (HierarchyError, pymysql.MySQLError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+import argparse
+import os
+import sys
+
+import pymysql
+from dotenv import load_dotenv
+
+from ddl import index_statements
+from queries import predefined_queries, query_params
+from query_templates import bind
+
+load_dotenv()
+
+# Full scans of tables estimated below this many rows are not worth an index
+SCAN_ROW_THRESHOLD = int(os.getenv('EXPLAIN_SCAN_ROW_THRESHOLD', 1000))
+
+# Scans the check tolerates, by query and EXPLAIN table (the alias used in the
+# query): these read every row of the driving table by design, either to
+# aggregate over it or to test each of its rows. '*' allows any table.
+EXPECTED_SCANS = {
+    "Employees with no supervisees": {'e'},
+    "Jobs with no hires after 1 month of posting": {'jp'},
+    "Salespeople who sold all products > $200": {'sp', 's', 'pt', 'pe', 'pc'},
+    "Best seller's type": {'s', 'e', 'pt'},
+    "Product type with highest net profit": {'pr', 'pp', 'vp'},
+    "Employees working in all departments": {'e'},
+    "Interviewees selected (name and email)": {'i'},
+    "Interviewees (name, phone, email)": {'i'},
+    "Employee with highest average salary": {'s', 'p'},
+    "View: Employee Average Monthly Salaries": {'*'},
+    "View: Interview Rounds Passed": {'*'},
+    "View: Product Type Sales": {'*'},
+    "View: Product Part Costs": {'*'},
+}
+
+
+def connect_to_db():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'xyzcompany')
+    )
+
+
+def existing_indexes(cursor):
+    cursor.execute(
+        "SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE()"
+    )
+    return {(table.lower(), name.lower()) for table, name in cursor.fetchall()}
+
+
+def apply_indexes(conn):
+    """Create every index from DDL.sql that the database does not have yet.
+
+    MySQL has no CREATE INDEX IF NOT EXISTS, so existing indexes are looked up
+    in information_schema first; running this again is a no-op. Tables the
+    database does not have yet (EmployeeHierarchy, created by
+    `python hierarchy.py install`) are skipped.
+    """
+    cursor = conn.cursor()
+    existing = existing_indexes(cursor)
+    cursor.execute("SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+    tables = {table.lower() for (table,) in cursor.fetchall()}
+    created = []
+    for name, table, statement in index_statements():
+        if (table.lower(), name.lower()) in existing or table.lower() not in tables:
+            continue
+        print(f"Creating {name} on {table}")
+        cursor.execute(statement)
+        created.append(name)
+    cursor.close()
+    return created
+
+
+def explain(cursor, query, args=None):
+    """EXPLAIN rows of a query as dicts keyed by column name."""
+    cursor.execute("EXPLAIN " + query.strip().rstrip(';'), args or None)
+    columns = [d[0].lower() for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def full_scans(plan, threshold=SCAN_ROW_THRESHOLD, allowed=()):
+    """Plan rows that scan a whole table estimated to hold more than threshold rows.
+
+    Derived tables and materialized subqueries (<derived2>, <subquery3>) are
+    skipped; their own plan rows are checked instead.
+    """
+    if '*' in allowed:
+        return []
+    return [row for row in plan
+            if row.get('type') == 'ALL'
+            and not str(row.get('table', '')).startswith('<')
+            and row.get('table') not in allowed
+            and (row.get('rows') or 0) > threshold]
+
+
+def check_queries(conn, queries=predefined_queries, threshold=SCAN_ROW_THRESHOLD):
+    """EXPLAIN every query with its default parameters; returns
+    {name: [offending plan rows]} and {name: error}."""
+    cursor = conn.cursor()
+    scans, errors = {}, {}
+    for name, template in queries.items():
+        query, args, _values = bind(template, query_params.get(name, ()))
+        try:
+            offending = full_scans(explain(cursor, query, args), threshold, EXPECTED_SCANS.get(name, ()))
+        except pymysql.MySQLError as e:
+            errors[name] = str(e)
+            continue
+        if offending:
+            scans[name] = offending
+    cursor.close()
+    return scans, errors
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the secondary indexes from DDL.sql and "
+                                                 "check the predefined queries use them.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('apply', help="create missing indexes")
+    check = subparsers.add_parser('check', help="EXPLAIN every predefined query and fail on "
+                                                "full scans of large tables")
+    check.add_argument('--threshold', type=int, default=SCAN_ROW_THRESHOLD,
+                       help="estimated rows above which a full table scan fails the check")
+    check.add_argument('--strict', action='store_true',
+                       help="also fail when a query cannot be explained (e.g. missing columns)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect_to_db()
+    try:
+        if args.command == 'apply':
+            created = apply_indexes(conn)
+            print(f"✅ {len(created)} index(es) created")
+            return 0
+
+        scans, errors = check_queries(conn, threshold=args.threshold)
+    finally:
+        conn.close()
+
+    for name, error in errors.items():
+        print(f"SKIPPED {name}: {error}")
+    for name, rows in scans.items():
+        for row in rows:
+            print(f"FULL SCAN {name}: table {row['table']} (~{row['rows']} rows)")
+    failed = bool(scans) or (args.strict and bool(errors))
+    checked = len(predefined_queries) - len(errors)
+    print(f"{'❌' if failed else '✅'} {checked} queries explained, {len(scans)} with full scans "
+          f"over {args.threshold} rows")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
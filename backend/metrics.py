@@ -0,0 +1,211 @@
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+
+# Queries slower than this (connect + execute + fetch) go to the slow-query log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 1000))
+# Result logging: at most this many rows and characters, for this share of executions
+LOG_RESULT_ROWS = int(os.getenv("LOG_RESULT_ROWS", 5))
+LOG_RESULT_CHARS = int(os.getenv("LOG_RESULT_CHARS", 2000))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+ROWS_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+PREFIX = "xyz"
+# Pool and cache fields that are point-in-time values; every other numeric field is a running count
+GAUGE_FIELDS = {"size", "open", "idle", "in_use", "entries", "bytes", "max_bytes", "targets", "clients",
+                "waiting"}
+
+query_log = logging.getLogger("queries")
+slow_log = logging.getLogger("queries.slow")
+
+
+def _truncate(text, limit=LOG_RESULT_CHARS):
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+def log_query(query, rows):
+    """Log a query and a sample of its result at DEBUG.
+
+    Only the first LOG_RESULT_ROWS rows are formatted, and nothing at all when
+    DEBUG is off or the execution is not sampled, so logging a large result
+    costs no more than logging a small one.
+    """
+    if not query_log.isEnabledFor(logging.DEBUG) or random.random() >= LOG_SAMPLE_RATE:
+        return
+    query_log.debug("Executed Query: %s", _truncate(" ".join(query.split())))
+    sample = rows[:LOG_RESULT_ROWS]
+    more = f" (+{len(rows) - len(sample)} more rows)" if len(rows) > len(sample) else ""
+    query_log.debug("Results: %s%s", _truncate(repr(sample)), more)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
+
+
+class Histogram:
+    """Cumulative bucket histogram per label set, in the Prometheus layout."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(values[-1])}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            lines.append(f"{self.name}{_labels(key)} {_number(value)}")
+        return lines
+
+
+class QueryMetrics:
+    """Per-query latency and row-count histograms plus the slow-query log."""
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self.connect = Histogram(f"{PREFIX}_query_connect_seconds",
+                                 "Time to check out a pooled connection.", SECONDS_BUCKETS)
+        self.execute = Histogram(f"{PREFIX}_query_execute_seconds",
+                                 "Time until the server starts returning the result.", SECONDS_BUCKETS)
+        self.fetch = Histogram(f"{PREFIX}_query_fetch_seconds",
+                               "Time to read the result rows.", SECONDS_BUCKETS)
+        self.rows = Histogram(f"{PREFIX}_query_rows", "Rows returned per execution.", ROWS_BUCKETS)
+        self.errors = Counter(f"{PREFIX}_query_errors_total", "Executions that raised an error.")
+        self.slow = Counter(f"{PREFIX}_slow_queries_total",
+                            "Executions slower than the slow-query threshold.")
+
+    def observe(self, name, connect, execute, fetch, rows, sql=None):
+        """Record one execution; timings in seconds."""
+        self.connect.observe(connect, query=name)
+        self.execute.observe(execute, query=name)
+        self.fetch.observe(fetch, query=name)
+        self.rows.observe(rows, query=name)
+        total_ms = (connect + execute + fetch) * 1000
+        if total_ms >= self.slow_query_ms:
+            self.slow.inc(query=name)
+            slow_log.warning(
+                "Slow query %r: %.1f ms (connect %.1f, execute %.1f, fetch %.1f), %d rows%s",
+                name, total_ms, connect * 1000, execute * 1000, fetch * 1000, rows,
+                f": {_truncate(' '.join(sql.split()))}" if sql else "")
+
+    def error(self, name):
+        self.errors.inc(query=name)
+
+    def render(self):
+        lines = []
+        for metric in (self.connect, self.execute, self.fetch, self.rows, self.errors, self.slow):
+            lines.extend(metric.render())
+        return lines
+
+
+class Stopwatch:
+    """Splits one execution into laps: lap() returns seconds since the previous lap."""
+
+    def __init__(self):
+        self._last = time.perf_counter()
+
+    def lap(self):
+        now = time.perf_counter()
+        elapsed, self._last = now - self._last, now
+        return elapsed
+
+
+def gauges(name, help_text, samples):
+    """Render a gauge from [(labels dict, value), ...]."""
+    return _family(name, "gauge", help_text, samples)
+
+
+def counters(name, help_text, samples):
+    """Render a counter from [(labels dict, value), ...]; name should end in _total."""
+    return _family(name, "counter", help_text, samples)
+
+
+def _family(name, kind, help_text, samples):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(sorted(labels.items())))} {_number(value)}")
+    return lines
+
+
+def _stat(name, field, help_text, samples):
+    # Point-in-time fields are gauges; the rest only ever grow, so rate() needs them as counters
+    if field in GAUGE_FIELDS:
+        return gauges(f"{name}_{field}", help_text, samples)
+    return counters(f"{name}_{field}_total", help_text, samples)
+
+
+def render_exposition(query_metrics, pools, caches):
+    """Prometheus text exposition of query metrics, pool state and cache counters.
+
+    pools is pool_metrics() output; caches maps a cache name to its metrics dict.
+    """
+    lines = query_metrics.render()
+    pool_fields = sorted({field for pool in pools for field, value in pool.items()
+                          if isinstance(value, (int, float)) and field != "size"})
+    for field in ["size"] + pool_fields:
+        lines.extend(_stat(f"{PREFIX}_pool", field, f"Connection pool {field.replace('_', ' ')}.",
+                           [({"target": pool["target"]}, pool[field]) for pool in pools if field in pool]))
+    for cache, stats in sorted(caches.items()):
+        numeric = {field: value for field, value in stats.items() if isinstance(value, (int, float))}
+        for field, value in sorted(numeric.items()):
+            lines.extend(_stat(f"{PREFIX}_{cache}", field, f"{cache.replace('_', ' ')} {field}.", [({}, value)]))
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,115 @@
+import base64
+import json
+import os
+import re
+
+# Rows per page when the client does not ask for a size, and the most it may ask for
+PAGE_SIZE = int(os.getenv("QUERY_PAGE_SIZE", 100))
+MAX_PAGE_SIZE = int(os.getenv("QUERY_MAX_PAGE_SIZE", 5000))
+
+_LIMIT_RE = re.compile(r"\bLIMIT\s+\d+(\s*,\s*\d+|\s+OFFSET\s+\d+)?\s*$", re.IGNORECASE)
+_ORDER_BY_RE = re.compile(r"\s+ORDER\s+BY\s+[\w\s.,`]+$", re.IGNORECASE)
+
+
+class InvalidPageToken(ValueError):
+    """Raised for a page token that is malformed or belongs to another query."""
+
+
+def encode_page_token(name, offset, page_size, values=None, after=None):
+    """Opaque token for the page of a named query starting at offset.
+
+    values holds the query's parameter values as strings, so later pages are
+    read with the same bindings. after holds the keyset values of the last row
+    read, for queries paged by keyset.
+    """
+    payload = {"q": name, "o": offset, "n": page_size}
+    if values:
+        payload["p"] = values
+    if after is not None:
+        payload["k"] = after
+    # Decimals and dates go as strings, which MySQL compares with their columns
+    payload = json.dumps(payload, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_token(token, name):
+    """Return (offset, page_size, values, after) from a token issued for the named query.
+
+    Tokens are not signed, so the page size is clamped like a requested one.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset, page_size = int(payload["o"]), int(payload["n"])
+        values = dict(payload.get("p") or {})
+        after = payload.get("k")
+    except (ValueError, KeyError, TypeError) as err:
+        raise InvalidPageToken(f"Invalid page token: {err}") from err
+    if payload.get("q") != name or offset < 0 or page_size <= 0:
+        raise InvalidPageToken("Page token does not belong to this query.")
+    if after is not None and not (isinstance(after, list) and all(
+            value is None or isinstance(value, (str, int, float)) for value in after)):
+        raise InvalidPageToken("Invalid page token: bad keyset values.")
+    return offset, clamp_page_size(page_size), values, after
+
+
+def clamp_page_size(page_size):
+    if not page_size or page_size <= 0:
+        return PAGE_SIZE
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def paged_query(query, offset, limit, keyset=None, after=None):
+    """Append LIMIT/OFFSET to a query, returning (sql, params).
+
+    The clause goes on the statement itself rather than around it, because
+    MySQL may drop the ORDER BY of a derived table. Queries that already end in
+    a LIMIT are returned unchanged (params None) and form a single page. Pages
+    are only stable for queries with a total ORDER BY.
+
+    With a keyset, a list of (output column, "ASC" or "DESC") that orders the
+    rows totally, the query is read in that order instead and a page after
+    the first starts after the keyset values in after, so the server never
+    skips over the earlier pages' rows.
+    """
+    sql = query.strip().rstrip(";").rstrip()
+    if _LIMIT_RE.search(sql):
+        return sql, None
+    if not keyset:
+        return f"{sql}\nLIMIT %s OFFSET %s", (limit, offset)
+    order = ", ".join(f"`{column}` {direction}" for column, direction in keyset)
+    sql = f"SELECT * FROM ({_ORDER_BY_RE.sub('', sql)}) AS page"
+    if after is None:
+        # First page, or a token issued before the query had a keyset
+        return f"{sql}\nORDER BY {order}\nLIMIT %s OFFSET %s", (limit, offset)
+    if len(after) != len(keyset):
+        raise InvalidPageToken("Page token does not belong to this query.")
+    condition, params = keyset_condition(keyset, after)
+    return f"{sql}\nWHERE {condition}\nORDER BY {order}\nLIMIT %s", tuple(params) + (limit,)
+
+
+def keyset_condition(keyset, after):
+    """WHERE condition for the rows ordered after the keyset values after; (sql, params).
+
+    Like MySQL's ORDER BY, NULLs sort first ascending and last descending.
+    """
+    terms, params = [], []
+    equal, equal_params = [], []
+    for (column, direction), value in zip(keyset, after):
+        if value is None:
+            later, later_params = (f"`{column}` IS NOT NULL" if direction == "ASC" else None), []
+        elif direction == "ASC":
+            later, later_params = f"`{column}` > %s", [value]
+        else:
+            later, later_params = f"(`{column}` < %s OR `{column}` IS NULL)", [value]
+        if later is not None:
+            terms.append("(" + " AND ".join(equal + [later]) + ")")
+            params += equal_params + later_params
+        equal.append(f"`{column}` <=> %s")
+        equal_params.append(value)
+    return " OR ".join(terms) or "FALSE", params
+
+
+def keyset_after(columns, row, keyset):
+    """Keyset values of a result row, for the token of the page after it."""
+    return [row[columns.index(column)] for column, _ in keyset]
@@ -0,0 +1,415 @@
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+import pymysql
+from dotenv import load_dotenv
+
+import summaries
+from indexes import explain
+from queries import predefined_queries, query_params
+from query_templates import bind
+
+load_dotenv()
+
+# Tables range-partitioned on a date column, one partition per period:
+#   column      - the partitioning column, added to the primary key (MySQL
+#                 requires every unique key to include it)
+#   period      - 'month' or 'year'
+#   primary_key - the primary key once partitioned
+#   retention   - periods kept, counting the current one; older partitions
+#                 are archived or dropped by maintain. 0 keeps them all.
+PARTITIONED_TABLES = {
+    'Sale': {
+        'column': 'SalesTime',
+        'period': 'month',
+        'primary_key': ['SalesID', 'SalesTime'],
+        'retention': int(os.getenv('SALE_PARTITION_RETENTION', 0)),
+    },
+    'Salary': {
+        'column': 'PayDate',
+        'period': 'year',
+        'primary_key': ['EmployeeID', 'TransactionNumber', 'PayDate'],
+        'retention': int(os.getenv('SALARY_PARTITION_RETENTION', 0)),
+    },
+}
+
+# Empty partitions kept ready beyond the current period
+FUTURE_PERIODS = int(os.getenv('PARTITION_FUTURE_PERIODS', 3))
+
+# Catch-all for rows past the last period partition
+MAXVALUE_PARTITION = 'pmax'
+
+PARTITIONS_SQL = """
+    SELECT PARTITION_NAME, TABLE_ROWS
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    ORDER BY PARTITION_ORDINAL_POSITION
+"""
+
+FOREIGN_KEYS_SQL = """
+    SELECT TABLE_NAME, CONSTRAINT_NAME, REFERENCED_TABLE_NAME
+    FROM information_schema.REFERENTIAL_CONSTRAINTS
+    WHERE CONSTRAINT_SCHEMA = DATABASE() AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+"""
+
+COLUMN_TYPE_SQL = """
+    SELECT DATA_TYPE
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+"""
+
+# A date range on a column bound from two query parameters
+_RANGE_RE = re.compile(r"\b(?:(\w+)\.)?(\w+)\s+BETWEEN\s+:(\w+)\s+AND\s+:(\w+)", re.IGNORECASE)
+_TABLE_ALIAS_RE = r"\b(?:FROM|JOIN)\s+`?{table}`?(?:\s+(?:AS\s+)?(\w+))?"
+# Words that can follow a table name without being its alias
+_KEYWORDS = {'ON', 'USING', 'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'CROSS', 'GROUP', 'ORDER', 'LIMIT', 'HAVING'}
+
+
+class PartitionError(Exception):
+    """Raised when a table can't be partitioned as configured."""
+
+
+def connect_to_db():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'xyzcompany')
+    )
+
+
+# Periods and partition names
+
+def period_start(day, period):
+    return date(day.year, day.month if period == 'month' else 1, 1)
+
+
+def next_period(start, period, count=1):
+    if period == 'year':
+        return date(start.year + count, 1, 1)
+    months = start.year * 12 + start.month - 1 + count
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def partition_name(start, period):
+    """p201103 for March 2011, p2024 for 2024."""
+    return f"p{start:%Y%m}" if period == 'month' else f"p{start:%Y}"
+
+
+def partition_period(name, period):
+    """First day of the period a partition holds, or None for the catch-all."""
+    if name == MAXVALUE_PARTITION:
+        return None
+    return date(int(name[1:5]), int(name[5:7]) if period == 'month' else 1, 1)
+
+
+def partition_bounds(names, period):
+    """(name, lower, upper) of each partition; None for an open end.
+
+    A partition holds rows before the end of its period, from the end of the
+    partition before it; the first one also holds everything older.
+    """
+    bounds, lower = [], None
+    for name in names:
+        start = partition_period(name, period)
+        upper = None if start is None else next_period(start, period)
+        bounds.append((name, lower, upper))
+        lower = upper
+    return bounds
+
+
+def partition_definition(name, upper, data_type):
+    """PARTITION clause for rows before upper; TIMESTAMP columns go through
+    UNIX_TIMESTAMP(), the only function MySQL partitions them by."""
+    if upper is None:
+        return f"PARTITION {name} VALUES LESS THAN {'MAXVALUE' if data_type == 'timestamp' else '(MAXVALUE)'}"
+    if data_type == 'timestamp':
+        return f"PARTITION {name} VALUES LESS THAN (UNIX_TIMESTAMP('{upper:%Y-%m-%d} 00:00:00'))"
+    return f"PARTITION {name} VALUES LESS THAN ('{upper:%Y-%m-%d}')"
+
+
+def partition_expression(column, data_type):
+    if data_type == 'timestamp':
+        return f"RANGE (UNIX_TIMESTAMP({column}))"
+    return f"RANGE COLUMNS ({column})"
+
+
+# Inspection
+
+def existing_partitions(cursor, table):
+    """[(name, estimated rows)] of a partitioned table, [] if it isn't partitioned."""
+    cursor.execute(PARTITIONS_SQL, (table,))
+    return [(name, rows) for name, rows in cursor.fetchall() if name is not None]
+
+
+def column_type(cursor, table, column):
+    cursor.execute(COLUMN_TYPE_SQL, (table, column))
+    row = cursor.fetchone()
+    if row is None:
+        raise PartitionError(f"{table} has no column {column}")
+    return row[0].lower()
+
+
+def summary_views(table):
+    """Materialized views whose summaries are computed from a table."""
+    return [view for view, spec in summaries.SUMMARIES.items()
+            if any(source[0] == table for source in spec['sources'])]
+
+
+# Changes
+
+def partition_table(conn, table, today=None):
+    """Range-partition a table by period, from its oldest row to FUTURE_PERIODS ahead.
+
+    Partitioned InnoDB tables can't have foreign keys, so the table's own are
+    dropped; a table that others reference is refused. The primary key is
+    extended with the partitioning column. Returns False if the table was
+    already partitioned.
+    """
+    spec = PARTITIONED_TABLES[table]
+    column, period = spec['column'], spec['period']
+    today = today or date.today()
+    cursor = conn.cursor()
+    try:
+        if existing_partitions(cursor, table):
+            return False
+        data_type = column_type(cursor, table, column)
+        cursor.execute(FOREIGN_KEYS_SQL, (table, table))
+        foreign_keys = cursor.fetchall()
+        referencing = sorted({child for child, _name, parent in foreign_keys if parent == table})
+        if referencing:
+            raise PartitionError(f"{table} is referenced by foreign keys from {', '.join(referencing)}")
+        # Primary key columns can't be NULL
+        cursor.execute(f"SELECT SUM({column} IS NULL), MIN({column}) FROM {table}")
+        nulls, oldest = cursor.fetchone()
+        if nulls:
+            raise PartitionError(f"{nulls} row(s) of {table} have no {column}")
+        first = period_start(oldest or today, period)
+        last = next_period(period_start(today, period), period, FUTURE_PERIODS)
+        starts = [first]
+        while starts[-1] < last:
+            starts.append(next_period(starts[-1], period))
+        definitions = [partition_definition(partition_name(start, period), next_period(start, period), data_type)
+                       for start in starts]
+        definitions.append(partition_definition(MAXVALUE_PARTITION, None, data_type))
+        for _child, name, _parent in foreign_keys:
+            print(f"Dropping foreign key {name} on {table}")
+            cursor.execute(f"ALTER TABLE {table} DROP FOREIGN KEY {name}")
+        print(f"Partitioning {table} by {period} into {len(definitions)} partitions")
+        cursor.execute(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(spec['primary_key'])}) "
+            f"PARTITION BY {partition_expression(column, data_type)} ({', '.join(definitions)})"
+        )
+    finally:
+        cursor.close()
+    return True
+
+
+def add_future_partitions(conn, table, today=None):
+    """Split the catch-all so there are partitions up to FUTURE_PERIODS ahead; returns their names."""
+    spec = PARTITIONED_TABLES[table]
+    period = spec['period']
+    today = today or date.today()
+    cursor = conn.cursor()
+    try:
+        names = [name for name, _rows in existing_partitions(cursor, table)]
+        if not names:
+            raise PartitionError(f"{table} is not partitioned; run apply first")
+        data_type = column_type(cursor, table, spec['column'])
+        bounds = partition_bounds(names, period)
+        covered = max((upper for _name, _lower, upper in bounds if upper is not None),
+                      default=period_start(today, period))
+        last = next_period(period_start(today, period), period, FUTURE_PERIODS + 1)
+        added = []
+        while covered < last:
+            added.append((partition_name(covered, period), next_period(covered, period)))
+            covered = next_period(covered, period)
+        if added:
+            definitions = [partition_definition(name, upper, data_type) for name, upper in added]
+            definitions.append(partition_definition(MAXVALUE_PARTITION, None, data_type))
+            cursor.execute(f"ALTER TABLE {table} REORGANIZE PARTITION {MAXVALUE_PARTITION} "
+                           f"INTO ({', '.join(definitions)})")
+    finally:
+        cursor.close()
+    return [name for name, _upper in added]
+
+
+def expire_partitions(conn, table, archive=True, today=None):
+    """Remove the partitions older than the table's retention; returns their names.
+
+    archive swaps each one with an empty standalone table, <table>_<partition>,
+    before dropping it, so its rows move out without being copied. Dropped
+    partitions bypass triggers, so the summaries over the table are rebuilt.
+    """
+    spec = PARTITIONED_TABLES[table]
+    if not spec['retention']:
+        return []
+    period = spec['period']
+    cutoff = next_period(period_start(today or date.today(), period), period, 1 - spec['retention'])
+    cursor = conn.cursor()
+    try:
+        names = [name for name, _rows in existing_partitions(cursor, table)]
+        # The oldest partition on or after the cutoff stays, whatever it holds
+        expired = [name for name, _lower, upper in partition_bounds(names, period)
+                   if upper is not None and upper <= cutoff]
+        for name in expired:
+            if archive:
+                archive_table = f"{table}_{name}"
+                print(f"Archiving {table} partition {name} to {archive_table}")
+                cursor.execute(f"CREATE TABLE {archive_table} LIKE {table}")
+                cursor.execute(f"ALTER TABLE {archive_table} REMOVE PARTITIONING")
+                cursor.execute(f"ALTER TABLE {table} EXCHANGE PARTITION {name} WITH TABLE {archive_table}")
+            else:
+                print(f"Dropping {table} partition {name}")
+            cursor.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+        active = bool(expired) and summaries.installed(cursor)
+    finally:
+        cursor.close()
+    if active:
+        summaries.rebuild(conn, summary_views(table))
+    return expired
+
+
+def maintain(conn, tables=None, archive=True, today=None):
+    """Add future partitions and expire old ones; returns {table: (added, expired)}."""
+    return {table: (add_future_partitions(conn, table, today), expire_partitions(conn, table, archive, today))
+            for table in tables or PARTITIONED_TABLES}
+
+
+# Pruning check
+
+def date_ranges(template):
+    """{partitioned table: [(from parameter, to parameter)]} for the BETWEEN ranges
+    a query puts on a partitioning column, with the aliases the table goes by."""
+    columns = {spec['column'].lower(): table for table, spec in PARTITIONED_TABLES.items()}
+    ranges = {}
+    for _alias, column, low, high in _RANGE_RE.findall(template):
+        table = columns.get(column.lower())
+        if table is not None:
+            ranges.setdefault(table, []).append((low, high))
+    return ranges
+
+
+def table_aliases(template, table):
+    """Names a table goes by in a query's plan: its aliases, or its own name."""
+    return {table if not alias or alias.upper() in _KEYWORDS else alias
+            for alias in re.findall(_TABLE_ALIAS_RE.format(table=table), template, re.IGNORECASE)}
+
+
+def expected_partitions(names, period, ranges):
+    """Partitions whose bounds overlap any of the (from, to) date ranges."""
+    return {name for name, lower, upper in partition_bounds(names, period)
+            if any((lower is None or lower <= high) and (upper is None or upper > low) for low, high in ranges)}
+
+
+def check_pruning(conn, queries=predefined_queries):
+    """EXPLAIN every query that filters a partitioned table by a date range.
+
+    Returns {name: [(table alias, partitions read, partitions expected)]} for
+    the plan rows reading more partitions than the range covers, {name: error}
+    for queries that failed, and {name: partitions read} for every query checked.
+    """
+    cursor = conn.cursor()
+    partitions = {table: [name for name, _rows in existing_partitions(cursor, table)]
+                  for table in PARTITIONED_TABLES}
+    violations, errors, checked = {}, {}, {}
+    for name, template in queries.items():
+        ranges = {table: found for table, found in date_ranges(template).items() if partitions[table]}
+        if not ranges:
+            continue
+        params = query_params.get(name, ())
+        query, args, values = bind(template, params)
+        typed = {param.name: param.parse(values[param.name]) for param in params}
+        try:
+            plan = explain(cursor, query, args)
+        except pymysql.MySQLError as e:
+            errors[name] = str(e)
+            continue
+        checked[name] = []
+        for table, table_ranges in ranges.items():
+            expected = expected_partitions(partitions[table], PARTITIONED_TABLES[table]['period'],
+                                           [(typed[low], typed[high]) for low, high in table_ranges])
+            aliases = table_aliases(template, table)
+            for row in plan:
+                if row.get('table') not in aliases:
+                    continue
+                read = set((row.get('partitions') or '').split(',')) - {''}
+                checked[name].append((row['table'], len(read), len(partitions[table])))
+                if not read or read - expected:
+                    violations.setdefault(name, []).append((row['table'], sorted(read), sorted(expected)))
+    cursor.close()
+    return violations, errors, checked
+
+
+def print_status(conn):
+    cursor = conn.cursor()
+    for table, spec in PARTITIONED_TABLES.items():
+        existing = existing_partitions(cursor, table)
+        if not existing:
+            print(f"{table}: not partitioned")
+            continue
+        rows = sum(count or 0 for _name, count in existing)
+        print(f"{table}: {len(existing)} partitions by {spec['period']} on {spec['column']}, ~{rows} rows, "
+              f"{existing[0][0]}..{existing[-1][0]}, retention "
+              f"{spec['retention'] or 'unlimited'}")
+    cursor.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Range-partition Sale and Salary by date, keep their "
+                                                 "partitions current and check date queries are pruned.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('apply', help="partition the tables that aren't partitioned yet "
+                                        "(drops their foreign keys)")
+    maintain_parser = subparsers.add_parser('maintain', help="add future partitions and archive or drop "
+                                                             "the ones past retention")
+    maintain_parser.add_argument('--drop', action='store_true',
+                                 help="drop expired partitions instead of archiving them to tables")
+    subparsers.add_parser('verify', help="EXPLAIN the date-filtered queries and fail if they read "
+                                         "partitions outside their range")
+    subparsers.add_parser('status')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect_to_db()
+    try:
+        if args.command == 'apply':
+            for table in PARTITIONED_TABLES:
+                if not partition_table(conn, table):
+                    print(f"{table} is already partitioned")
+            print_status(conn)
+        elif args.command == 'maintain':
+            for table, (added, expired) in maintain(conn, archive=not args.drop).items():
+                print(f"{table}: {len(added)} partition(s) added, {len(expired)} expired")
+        elif args.command == 'status':
+            print_status(conn)
+        else:
+            violations, errors, checked = check_pruning(conn)
+            for name, error in errors.items():
+                print(f"SKIPPED {name}: {error}")
+            for name, reads in checked.items():
+                for alias, read, total in reads:
+                    print(f"{name}: {alias} reads {read} of {total} partitions")
+            for name, rows in violations.items():
+                for alias, read, expected in rows:
+                    print(f"NOT PRUNED {name}: {alias} reads {', '.join(read) or 'no listed partitions'}, "
+                          f"expected only {', '.join(expected)}")
+            failed = bool(violations) or not checked
+            print(f"{'❌' if failed else '✅'} {len(checked)} date-filtered queries explained, "
+                  f"{len(violations)} not pruned")
+            return 1 if failed else 0
+    except PartitionError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,365 @@
+import summaries
+from ddl import base_tables, referenced_tables
+from query_templates import Param, bind
+
+# Predefined queries based on requirements. Values that vary between uses are
+# :name placeholders, declared with their types and defaults in query_params.
+predefined_queries = {
+    "Interviewers for Hellen Cole (Job 11111)": """
+        SELECT DISTINCT i.InterviewerID, p.LastName, p.FirstName 
+        FROM InterviewerAssignment i 
+        JOIN Interview iv ON i.InterviewID = iv.InterviewID 
+        JOIN JobPosition jp ON iv.JobID = jp.JobID 
+        JOIN Person p ON i.InterviewerID = p.PersonID 
+        WHERE iv.CandidateID = (SELECT PersonID FROM Person WHERE FirstName = :first_name AND LastName = :last_name) 
+        AND jp.JobID = :job_id;
+    """,
+    "Jobs posted by Marketing (January 2011)": """
+        SELECT j.JobID 
+        FROM JobPosition j 
+        JOIN Department d ON j.DepartmentID = d.Department_ID 
+        WHERE d.DepartmentName = :department 
+        AND j.PostedDate >= :posted_from 
+        AND j.PostedDate < :posted_before;
+    """,
+    # Anti-join on idx_employee_supervisor; the original NOT IN skipped NULL
+    # supervisors, so the two return the same rows
+    "Employees with no supervisees": """
+        SELECT e.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
+        FROM Employee e 
+        JOIN Person p ON e.PersonID = p.PersonID 
+        LEFT JOIN Employee sub ON sub.SupervisorID = e.PersonID 
+        WHERE sub.PersonID IS NULL;
+    """,
+    # Anti-join instead of NOT IN. NOT IN returns no rows at all once a March
+    # sale has a NULL SiteID, hence the NOT EXISTS; each site still appears
+    # once per Marketing department
+    "Marketing sites with no sales (March 2011)": """
+        SELECT s.SiteID, s.Location 
+        FROM Site s 
+        JOIN Department d ON d.DepartmentName = :department 
+        LEFT JOIN Sale sa ON sa.SiteID = s.SiteID 
+            AND sa.SalesTime BETWEEN :sales_from AND :sales_to 
+        WHERE sa.SalesID IS NULL 
+        AND NOT EXISTS (
+            SELECT 1 
+            FROM Sale sn 
+            WHERE sn.SiteID IS NULL 
+            AND sn.SalesTime BETWEEN :sales_from AND :sales_to
+        );
+    """,
+    "Jobs with no hires after 1 month of posting": """
+        SELECT jp.JobID, jp.JobDescription 
+        FROM JobPosition jp 
+        WHERE NOT EXISTS (
+            SELECT 1 
+            FROM Application a 
+            WHERE a.JobID = jp.JobID 
+            AND a.ApplicationDate <= DATE_ADD(jp.PostedDate, INTERVAL 1 MONTH)
+            AND a.Status = 'Selected'
+        );
+    """,
+    # Division by counting: one pass over Sale counts the > $200 product types
+    # each salesperson sold. As with the nested NOT IN it replaces, anyone who
+    # sold an untyped product qualifies, and without sales only if no product
+    # is over $200
+    "Salespeople who sold all products > $200": """
+        SELECT sp.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
+        FROM Employee sp 
+        JOIN Person p ON sp.PersonID = p.PersonID 
+        LEFT JOIN (
+            SELECT s.SalesPersonID, 
+                   MAX(pr.ProductType IS NULL) AS SoldUntyped, 
+                   COUNT(DISTINCT pt.ProductType) AS TypesSold 
+            FROM Sale s 
+            JOIN Product pr ON s.ProductID = pr.ProductID 
+            LEFT JOIN (
+                SELECT DISTINCT ProductType 
+                FROM Product 
+                WHERE ListPrice > :min_price
+            ) pt ON pt.ProductType = pr.ProductType 
+            GROUP BY s.SalesPersonID
+        ) sold ON sold.SalesPersonID = sp.PersonID 
+        WHERE CASE 
+            WHEN sold.SalesPersonID IS NULL 
+                THEN NOT EXISTS (SELECT 1 FROM Product pe WHERE pe.ListPrice > :min_price) 
+            ELSE sold.SoldUntyped = 1 
+                OR sold.TypesSold = (SELECT COUNT(DISTINCT pc.ProductType) FROM Product pc WHERE pc.ListPrice > :min_price) 
+        END;
+    """,
+    "Departments with no job posts (Jan-Feb 2011)": """
+        SELECT d.Department_ID, d.DepartmentName 
+        FROM Department d 
+        WHERE d.Department_ID NOT IN (
+            SELECT jp.DepartmentID 
+            FROM JobPosition jp 
+            WHERE jp.PostedDate BETWEEN :posted_from AND :posted_to
+        );
+    """,
+    "Employees applying for job 12345": """
+        SELECT e.PersonID AS EmployeeID, CONCAT(p.FirstName, ' ', p.LastName) AS Name, ed.DepartmentID 
+        FROM Employee e 
+        JOIN Person p ON e.PersonID = p.PersonID 
+        JOIN Application a ON e.PersonID = a.ApplicantID 
+        JOIN JobPosition jp ON a.JobID = jp.JobID 
+        LEFT JOIN EmployeeDepartmentAssignment ed ON e.PersonID = ed.EmployeeID 
+        WHERE jp.JobID = :job_id;
+    """,
+    "Best seller's type": """
+        SELECT pt.Type AS EmployeeType, COUNT(*) AS TotalSales 
+        FROM Sale s 
+        JOIN Employee e ON s.SalesPersonID = e.PersonID 
+        JOIN PersonType pt ON e.PersonID = pt.PersonID 
+        WHERE pt.Type = 'Employee' 
+        GROUP BY pt.Type 
+        ORDER BY TotalSales DESC 
+        LIMIT 1;
+    """,
+    "Product type with highest net profit": """
+        SELECT pr.ProductType 
+        FROM Product pr 
+        JOIN ProductPart pp ON pr.ProductID = pp.ProductID 
+        JOIN VendorPart vp ON pp.PartID = vp.PartID 
+        GROUP BY pr.ProductType 
+        ORDER BY (SUM(pr.ListPrice) - SUM(vp.Price)) DESC 
+        LIMIT 1;
+    """,
+    "Employees working in all departments": """
+        SELECT e.EmployeeID AS PersonID, p.LastName, p.FirstName 
+        FROM EmployeeDepartmentAssignment e 
+        JOIN Person p ON e.EmployeeID = p.PersonID 
+        GROUP BY e.EmployeeID, p.LastName, p.FirstName 
+        HAVING COUNT(DISTINCT e.DepartmentID) = (SELECT COUNT(*) FROM Department);
+    """,
+    "Interviewees selected (name and email)": """
+        SELECT CONCAT(p.FirstName, ' ', p.LastName) AS IntervieweeName, p.Email AS EmailAddress 
+        FROM Interview i 
+        JOIN Person p ON i.CandidateID = p.PersonID 
+        WHERE EXISTS (
+            SELECT 1 
+            FROM InterviewGrade ig 
+            WHERE ig.InterviewID = i.InterviewID 
+            AND ig.Grade >= :min_grade
+            GROUP BY ig.InterviewID
+            HAVING COUNT(DISTINCT ig.RoundNumber) >= :min_rounds
+        );
+    """,
+    "Interviewees (name, phone, email)": """
+        SELECT p.FirstName, p.LastName, ph.PhoneNumber, p.Email
+        FROM Person p 
+        JOIN PhoneNumber ph ON p.PersonID = ph.PersonID 
+        JOIN Interview i ON p.PersonID = i.CandidateID
+        WHERE EXISTS (
+            SELECT 1 
+            FROM InterviewGrade ig 
+            WHERE ig.InterviewID = i.InterviewID 
+            AND ig.Grade >= :min_grade
+            GROUP BY ig.InterviewID
+            HAVING COUNT(DISTINCT ig.RoundNumber) >= :min_rounds
+        );
+    """,
+    "Employee with highest average salary": """
+        SELECT p.PersonID, p.FirstName, p.LastName 
+        FROM Person p 
+        JOIN Salary s ON p.PersonID = s.EmployeeID 
+        GROUP BY s.EmployeeID 
+        ORDER BY AVG(s.Amount) DESC 
+        LIMIT 1;
+    """,
+    "Vendor supplying 'Cup' (lowest price)": """
+        SELECT v.VendorID, v.Name AS VendorName 
+        FROM Vendor v 
+        JOIN VendorPart vp ON v.VendorID = vp.VendorID 
+        JOIN Part p ON vp.PartID = p.PartID 
+        WHERE p.PartName = :part_name 
+        AND p.Weight < :max_weight 
+        AND vp.Price = (
+            SELECT MIN(vp2.Price) 
+            FROM VendorPart vp2 
+            JOIN Part p2 ON vp2.PartID = p2.PartID 
+            WHERE p2.PartName = :part_name 
+            AND p2.Weight < :max_weight
+        );
+    """,
+    # Org-chart queries read the supervisor closure table (hierarchy.py): a
+    # whole subtree or chain of command is one index range, at any depth
+    "Reports under a manager (all levels)": """
+        SELECT h.DescendantID AS PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name, e.Title,
+               h.Depth AS Level
+        FROM EmployeeHierarchy h
+        JOIN Employee e ON e.PersonID = h.DescendantID
+        JOIN Person p ON p.PersonID = h.DescendantID
+        WHERE h.AncestorID = :manager_id AND h.Depth > 0
+        ORDER BY h.Depth, h.DescendantID;
+    """,
+    "Chain of command above an employee": """
+        SELECT h.AncestorID AS PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name, e.Title,
+               h.Depth AS LevelsUp
+        FROM EmployeeHierarchy h
+        JOIN Employee e ON e.PersonID = h.AncestorID
+        JOIN Person p ON p.PersonID = h.AncestorID
+        WHERE h.DescendantID = :employee_id AND h.Depth > 0
+        ORDER BY h.Depth;
+    """,
+    "Span of control by level": """
+        SELECT h.Depth AS Level, COUNT(*) AS Employees
+        FROM EmployeeHierarchy h
+        WHERE h.AncestorID = :manager_id AND h.Depth > 0
+        GROUP BY h.Depth
+        ORDER BY h.Depth;
+    """,
+    "View: Employee Average Monthly Salaries": """
+        SELECT * FROM EmployeeAverageSalary
+        ORDER BY AverageMonthlySalary DESC;
+    """,
+    "View: Interview Rounds Passed": """
+        SELECT * FROM InterviewRoundsPassed
+        WHERE PassedRounds >= :min_rounds
+        ORDER BY PassedRounds DESC;
+    """,
+    "View: Product Type Sales": """
+        SELECT * FROM ProductTypeSales
+        ORDER BY TotalItemsSold DESC;
+    """,
+    "View: Product Part Costs": """
+        SELECT * FROM ProductPartCost
+        ORDER BY TotalPartCost DESC;
+    """
+}
+
+# The requirement-style formulations of the queries rewritten above as joins
+# and aggregates. They define the expected results: check_rewrites.py runs
+# both versions and compares them row for row.
+original_queries = {
+    "Employees with no supervisees": """
+        SELECT e.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
+        FROM Employee e 
+        JOIN Person p ON e.PersonID = p.PersonID 
+        WHERE e.PersonID NOT IN (
+            SELECT SupervisorID 
+            FROM Employee 
+            WHERE SupervisorID IS NOT NULL
+        );
+    """,
+    "Marketing sites with no sales (March 2011)": """
+        SELECT s.SiteID, s.Location 
+        FROM Site s 
+        JOIN Department d ON d.DepartmentName = :department 
+        WHERE s.SiteID NOT IN (
+            SELECT SiteID 
+            FROM Sale 
+            WHERE SalesTime BETWEEN :sales_from AND :sales_to
+        );
+    """,
+    "Salespeople who sold all products > $200": """
+        SELECT sp.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name 
+        FROM Employee sp 
+        JOIN Person p ON sp.PersonID = p.PersonID 
+        WHERE NOT EXISTS (
+            SELECT pt.ProductType 
+            FROM Product pt 
+            WHERE pt.ListPrice > :min_price 
+            AND pt.ProductType NOT IN (
+                SELECT DISTINCT pr.ProductType 
+                FROM Sale s 
+                JOIN Product pr ON s.ProductID = pr.ProductID 
+                WHERE s.SalesPersonID = sp.PersonID
+            )
+        );
+    """,
+}
+
+# Parameters of each templated query; the defaults reproduce the requirements
+query_params = {
+    "Interviewers for Hellen Cole (Job 11111)": [
+        Param("first_name", "string", "Hellen"),
+        Param("last_name", "string", "Cole"),
+        Param("job_id", "int", 11111, "Job ID"),
+    ],
+    "Jobs posted by Marketing (January 2011)": [
+        Param("department", "string", "Marketing"),
+        Param("posted_from", "date", "2011-01-01", "Posted on or after"),
+        Param("posted_before", "date", "2011-02-01", "Posted before"),
+    ],
+    "Marketing sites with no sales (March 2011)": [
+        Param("department", "string", "Marketing"),
+        Param("sales_from", "date", "2011-03-01", "Sales from"),
+        Param("sales_to", "date", "2011-03-31", "Sales to"),
+    ],
+    "Salespeople who sold all products > $200": [
+        Param("min_price", "decimal", "200", "List price above"),
+    ],
+    "Departments with no job posts (Jan-Feb 2011)": [
+        Param("posted_from", "date", "2011-01-01", "Posted from"),
+        Param("posted_to", "date", "2011-02-28", "Posted to"),
+    ],
+    "Employees applying for job 12345": [
+        Param("job_id", "int", 12345, "Job ID"),
+    ],
+    "Interviewees selected (name and email)": [
+        Param("min_grade", "int", 70, "Passing grade"),
+        Param("min_rounds", "int", 5, "Rounds passed"),
+    ],
+    "Interviewees (name, phone, email)": [
+        Param("min_grade", "int", 70, "Passing grade"),
+        Param("min_rounds", "int", 5, "Rounds passed"),
+    ],
+    "Vendor supplying 'Cup' (lowest price)": [
+        Param("part_name", "string", "Cup"),
+        Param("max_weight", "decimal", "4", "Weight below"),
+    ],
+    "Reports under a manager (all levels)": [
+        Param("manager_id", "int", 1, "Manager ID"),
+    ],
+    "Chain of command above an employee": [
+        Param("employee_id", "int", 1, "Employee ID"),
+    ],
+    "Span of control by level": [
+        Param("manager_id", "int", 1, "Manager ID"),
+    ],
+    "View: Interview Rounds Passed": [
+        Param("min_rounds", "int", 5, "Rounds passed"),
+    ],
+}
+
+
+# Total orders for queries whose results run to many pages: (output column,
+# direction), starting with the query's own ORDER BY. Their later pages are
+# read by keyset, after the last row's values, rather than by OFFSET.
+query_keysets = {
+    "Reports under a manager (all levels)": [("Level", "ASC"), ("PersonID", "ASC")],
+    "View: Employee Average Monthly Salaries": [("AverageMonthlySalary", "DESC"), ("PersonID", "ASC")],
+    "View: Interview Rounds Passed": [("PassedRounds", "DESC"), ("CandidateID", "ASC"), ("JobID", "ASC")],
+    "View: Product Type Sales": [("TotalItemsSold", "DESC"), ("ProductType", "ASC")],
+    "View: Product Part Costs": [("TotalPartCost", "DESC"), ("ProductID", "ASC")],
+}
+
+
+# Cached results live for QUERY_CACHE_TTL seconds unless overridden here; the
+# views aggregate Sale and Salary, which change most often.
+query_cache_ttls = {
+    "View: Employee Average Monthly Salaries": 60,
+    "View: Interview Rounds Passed": 60,
+    "View: Product Type Sales": 60,
+    "View: Product Part Costs": 60,
+}
+
+# Base tables each predefined query reads, with views expanded
+query_tables = {name: base_tables(query) for name, query in predefined_queries.items()}
+# Triggers on Employee write EmployeeHierarchy, so its readers depend on Employee too
+for tables in query_tables.values():
+    if "EmployeeHierarchy" in tables:
+        tables.add("Employee")
+
+# Predefined queries over a DDL.sql view, which can be answered from its
+# summary table once `python summaries.py install` has been run
+query_views = {}
+for name, query in predefined_queries.items():
+    views = referenced_tables(query) & set(summaries.SUMMARIES)
+    if len(views) == 1:
+        query_views[name] = views.pop()
+
+
+def bind_query(name, values=None, queries=predefined_queries):
+    """(sql, args, bound values) for a predefined query; see query_templates.bind."""
+    return bind(queries[name], query_params.get(name, ()), values)
@@ -0,0 +1,119 @@
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Bounds staleness where invalidation can't reach: other worker processes and writes made outside the app
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 300))
+
+
+def database_of(target):
+    """(host, port, database) of a connection target, whichever user it connects as."""
+    return None if target is None else (target[0], target[1], target[3])
+
+
+def estimate_size(columns, rows):
+    """Rough in-memory footprint of a result set in bytes."""
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(c) for c in columns)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class QueryCache:
+    """LRU cache of query results bounded by memory, with per-entry TTLs.
+
+    Entries remember the base tables they were computed from so that a write
+    to any of those tables can drop them. Each write also bumps its tables'
+    generation, so a result read before the write is not stored after it.
+    """
+
+    def __init__(self, max_bytes=QUERY_CACHE_MAX_BYTES, default_ttl=QUERY_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (columns, rows, tables, expires_at, size)
+        self._bytes = 0
+        self._generations = {}  # (database, table) -> writes invalidated so far
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0,
+                      "stale_puts": 0}
+
+    def get(self, key):
+        """Return (columns, rows) for a live entry, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[3] < time.monotonic():
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0], entry[1]
+
+    def generation(self, target, tables):
+        """Generation of the tables in target's database; take it before running a query, for put()."""
+        database = database_of(target)
+        with self._lock:
+            return tuple(self._generations.get((database, table), 0) for table in sorted(tables))
+
+    def put(self, key, columns, rows, tables, ttl=None, generation=None):
+        """Store a result, unless a table it reads was written since generation was taken."""
+        size = estimate_size(columns, rows)
+        if size > self.max_bytes:
+            return
+        ttl = self.default_ttl if ttl is None else ttl
+        database = database_of(key[0])
+        with self._lock:
+            if generation is not None and generation != tuple(
+                    self._generations.get((database, table), 0) for table in sorted(tables)):
+                self.stats["stale_puts"] += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (columns, rows, frozenset(tables), time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def invalidate_tables(self, target, tables):
+        """Drop every entry that reads any of the tables from target's database."""
+        return self.invalidate_database(database_of(target), tables)
+
+    def invalidate_database(self, database, tables):
+        """Drop every entry that reads any of the tables from a (host, port, database).
+
+        A write changes the data every user of the database sees, so entries
+        cached by other users' sessions go too.
+        """
+        tables = set(tables)
+        with self._lock:
+            for table in tables:
+                self._generations[database, table] = self._generations.get((database, table), 0) + 1
+            stale = [key for key, entry in self._entries.items()
+                     if database_of(key[0]) == database and entry[2] & tables]
+            for key in stale:
+                self._remove(key)
+            self.stats["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self._bytes,
+                        max_bytes=self.max_bytes)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[4]
@@ -0,0 +1,97 @@
+import datetime
+import decimal
+import re
+from functools import lru_cache
+
+# Longest accepted string parameter, so a value can't balloon a cache key
+MAX_STRING_LENGTH = 100
+
+# A quoted literal (skipped) or a :name placeholder
+_TOKEN_RE = re.compile(r"'(?:[^'\\]|\\.)*'|(?<![:\w]):([a-z_][a-z0-9_]*)")
+
+
+class InvalidParameter(ValueError):
+    """Raised for a parameter value that does not parse as its declared type."""
+
+
+class Param:
+    """A named, typed query parameter with a default value."""
+
+    TYPES = {
+        "int": int,
+        "decimal": decimal.Decimal,
+        "date": datetime.date.fromisoformat,
+        "string": str,
+    }
+
+    def __init__(self, name, kind, default, label=None):
+        if kind not in self.TYPES:
+            raise ValueError(f"Unknown parameter type: {kind}")
+        self.name = name
+        self.type = kind
+        self.label = label or name.replace("_", " ").capitalize()
+        self.default = self.parse(default)
+
+    def parse(self, raw):
+        if raw is None or raw == "":
+            raise InvalidParameter(f"Missing value for {self.name}.")
+        if self.type == "string":
+            value = str(raw)
+            if len(value) > MAX_STRING_LENGTH:
+                raise InvalidParameter(f"{self.name} is longer than {MAX_STRING_LENGTH} characters.")
+            return value
+        if isinstance(raw, bool):
+            raise InvalidParameter(f"{self.name} must be {self.type}, not a boolean.")
+        try:
+            return self.TYPES[self.type](str(raw))
+        except (ValueError, decimal.InvalidOperation) as err:
+            raise InvalidParameter(f"{self.name} must be {self.type}: {err}") from err
+
+    def format(self, value):
+        """Value as a string that parse() reads back."""
+        return value.isoformat() if isinstance(value, datetime.date) else str(value)
+
+    def describe(self):
+        return {"name": self.name, "type": self.type, "label": self.label,
+                "default": self.format(self.default)}
+
+
+@lru_cache(maxsize=256)
+def compile_template(template):
+    """Turn :name placeholders into positional %s ones: (sql, names in order).
+
+    A name may appear several times; it is bound once per appearance.
+    Placeholders inside quoted literals are left alone.
+    """
+    names = []
+
+    def replace(match):
+        if match.group(1) is None:
+            return match.group(0)
+        names.append(match.group(1))
+        return "%s"
+
+    return _TOKEN_RE.sub(replace, template), tuple(names)
+
+
+def bind(template, params, values=None):
+    """Bind a template: (sql, args, bound) with bound as {name: string value}.
+
+    Values missing from `values` take their defaults; unknown names raise
+    InvalidParameter. Values are parsed to their declared types and sent as
+    statement parameters, never spliced into the SQL.
+    """
+    values = values or {}
+    declared = {param.name: param for param in params}
+    unknown = sorted(set(values) - set(declared))
+    if unknown:
+        raise InvalidParameter(f"Unknown parameters: {', '.join(unknown)}")
+    typed = {}
+    for name, param in declared.items():
+        typed[name] = param.parse(values[name]) if name in values else param.default
+    sql, names = compile_template(template)
+    missing = sorted(set(names) - set(declared))
+    if missing:
+        raise ValueError(f"Template uses undeclared parameters: {', '.join(missing)}")
+    bound = {name: declared[name].format(value) for name, value in typed.items()}
+    return sql, tuple(typed[name] for name in names), bound
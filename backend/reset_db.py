@@ -0,0 +1,118 @@
+import argparse
+import os
+
+import pymysql
+from dotenv import load_dotenv
+
+import hierarchy
+import summaries
+from ddl import create_table_statements, dependent_tables, index_statements, table_names
+
+load_dotenv()
+
+RESET_MODES = ['truncate', 'recreate', 'delete']
+
+EXISTING_TABLES_SQL = "SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()"
+
+
+def connect_to_db():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'xyzcompany')
+    )
+
+
+def tables_to_reset(tables=None):
+    """The requested tables plus every table referencing them, children first.
+
+    Emptying a parent with foreign key checks off would otherwise leave
+    orphaned rows behind in its children.
+    """
+    names = table_names()
+    if not tables:
+        return names[::-1]
+    unknown = set(tables) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(sorted(unknown))}")
+    selected = set()
+    for table in tables:
+        selected |= dependent_tables(table)
+    return [name for name in reversed(names) if name in selected]
+
+
+def reset_tables(conn, tables=None, mode='truncate'):
+    """Empty tables from DDL.sql (all of them by default) and return their names.
+
+    truncate: TRUNCATE TABLE with foreign key checks off; no per-row logging
+        or cascades, and AUTO_INCREMENT counters restart.
+    recreate: DROP TABLE and re-run the table's CREATE TABLE and CREATE INDEX
+        statements from DDL.sql, which also resets schema drift.
+    delete: the old DELETE FROM per table, for servers where the others are
+        not permitted.
+
+    TRUNCATE and DROP commit implicitly, so the reset cannot be rolled back;
+    foreign key checks are switched back on even if a statement fails. Both
+    bypass triggers (and DROP removes them), so installed summary tables are
+    rebuilt afterwards, and so is the employee hierarchy when it was reset.
+    Tables DDL.sql gained after the database was created are skipped, except
+    by recreate, which creates them.
+    """
+    if mode not in RESET_MODES:
+        raise ValueError(f"Unknown reset mode {mode!r}")
+    tables = tables_to_reset(tables)
+    cursor = conn.cursor()
+    if mode != 'recreate':
+        cursor.execute(EXISTING_TABLES_SQL)
+        # information_schema may report names in another case
+        existing = {name.lower() for (name,) in cursor.fetchall()}
+        tables = [table for table in tables if table.lower() in existing]
+    cursor.execute("SET foreign_key_checks = 0")
+    try:
+        if mode == 'truncate':
+            for table in tables:
+                cursor.execute(f"TRUNCATE TABLE {table}")
+        elif mode == 'recreate':
+            statements = create_table_statements()
+            for table in tables:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            # Parents first, as in DDL.sql, then their secondary indexes
+            for table in reversed(tables):
+                cursor.execute(statements[table])
+            for _name, table, statement in index_statements():
+                if table in tables:
+                    cursor.execute(statement)
+        else:
+            for table in tables:
+                cursor.execute(f"DELETE FROM {table}")
+        conn.commit()
+    finally:
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.close()
+    summaries.resume(conn)
+    if hierarchy.HIERARCHY_TABLE in tables:
+        hierarchy.resume(conn)
+    return tables
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Empty the XYZ Company tables.")
+    parser.add_argument('--mode', choices=RESET_MODES, default='truncate',
+                        help="how to empty the tables (default: truncate)")
+    parser.add_argument('--tables', type=lambda s: s.split(','),
+                        help="comma-separated tables to reset; tables referencing them "
+                             "are reset too (default: every table in DDL.sql)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect_to_db()
+    tables = reset_tables(conn, args.tables, args.mode)
+    conn.close()
+    print(f"✅ Reset {len(tables)} table(s) ({args.mode}): {', '.join(tables)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# How long a loaded catalog is trusted before checking for DDL changes
+CATALOG_CHECK_INTERVAL = float(os.getenv("SCHEMA_CATALOG_CHECK_INTERVAL", 30))
+# Tables sampled at once; each sample checks out its own pooled connection
+SAMPLE_WORKERS = int(os.getenv("SCHEMA_SAMPLE_WORKERS", 4))
+
+# Changes whenever a table or column is added, dropped, renamed or retyped
+FINGERPRINT_SQL = """
+    SELECT COUNT(*),
+           SUM(CRC32(CONCAT_WS(':', TABLE_NAME, COLUMN_NAME, ORDINAL_POSITION, COLUMN_TYPE,
+                               IS_NULLABLE, COLUMN_KEY)))
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+"""
+
+TABLES_SQL = """
+    SELECT TABLE_NAME, TABLE_TYPE, TABLE_ROWS
+    FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME
+"""
+
+COLUMNS_SQL = """
+    SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE, COLUMN_KEY
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+FOREIGN_KEYS_SQL = """
+    SELECT TABLE_NAME, COLUMN_NAME, REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+
+def _text(value):
+    # Some connector versions return information_schema strings as bytes
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return value
+
+
+def fingerprint(cursor):
+    cursor.execute(FINGERPRINT_SQL)
+    count, checksum = cursor.fetchall()[0]
+    return int(count), int(checksum or 0)
+
+
+def load_catalog(cursor):
+    """Tables with their columns, keys, row estimates and foreign keys, by name."""
+    tables = {}
+    cursor.execute(TABLES_SQL)
+    for name, table_type, row_estimate in cursor.fetchall():
+        name = _text(name)
+        tables[name] = {
+            "name": name,
+            "type": "view" if _text(table_type) == "VIEW" else "table",
+            "rowEstimate": row_estimate,
+            "columns": [],
+            "foreignKeys": [],
+        }
+    cursor.execute(COLUMNS_SQL)
+    for table, column, column_type, nullable, key in cursor.fetchall():
+        entry = tables.get(_text(table))
+        if entry is not None:
+            entry["columns"].append({
+                "name": _text(column),
+                "type": _text(column_type),
+                "nullable": _text(nullable) == "YES",
+                "key": _text(key) or None,
+            })
+    cursor.execute(FOREIGN_KEYS_SQL)
+    for table, column, referenced_table, referenced_column in cursor.fetchall():
+        entry = tables.get(_text(table))
+        if entry is not None:
+            entry["foreignKeys"].append({
+                "column": _text(column),
+                "table": _text(referenced_table),
+                "referencedColumn": _text(referenced_column),
+            })
+    return tables
+
+
+class SchemaCatalog:
+    """Per connection target cache of the information_schema catalog.
+
+    A cached catalog is served as is for check_interval seconds, then checked
+    against a cheap column fingerprint and reloaded only if the schema changed.
+    """
+
+    def __init__(self, check_interval=CATALOG_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._entries = {}  # target -> [fingerprint, checked_at, tables]
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "checks": 0, "loads": 0}
+
+    def get(self, target, pool):
+        with self._lock:
+            entry = self._entries.get(target)
+            if entry is not None and time.monotonic() - entry[1] < self.check_interval:
+                self.stats["hits"] += 1
+                return entry[2]
+
+        connection = pool.acquire()
+        try:
+            cursor = connection.cursor()
+            current = fingerprint(cursor)
+            if entry is not None and entry[0] == current:
+                tables = entry[2]
+                counter = "checks"
+            else:
+                tables = load_catalog(cursor)
+                counter = "loads"
+            cursor.close()
+        finally:
+            connection.close()
+
+        with self._lock:
+            self._entries[target] = [current, time.monotonic(), tables]
+            self.stats[counter] += 1
+        return tables
+
+    def invalidate(self, target=None):
+        """Forget one target's catalog (all of them by default), e.g. after running DDL."""
+        with self._lock:
+            if target is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(target, None)
+
+    def metrics(self):
+        with self._lock:
+            return dict(self.stats, targets=len(self._entries))
+
+
+def _sample(pool, table, limit):
+    connection = pool.acquire()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"SELECT * FROM `{table}` LIMIT %s", (limit,))
+        rows = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        cursor.close()
+        return columns, rows
+    finally:
+        connection.close()
+
+
+def sample_tables(pool, tables, limit=5, workers=SAMPLE_WORKERS):
+    """First rows of every table, fetched concurrently: {table: (columns, rows)}.
+
+    Concurrency is also bounded by the pool, since each sample holds a
+    connection while it runs.
+    """
+    tables = list(tables)
+    if not tables:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, pool.size, len(tables)))) as executor:
+        results = executor.map(lambda table: _sample(pool, table, limit), tables)
+        return dict(zip(tables, results))
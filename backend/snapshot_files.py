@@ -0,0 +1,428 @@
+"""Columnar snapshot files of the large tables, for offline analysis.
+
+export reads each table in primary-key order, EXPORT_CHUNK_ROWS rows per
+keyset query, inside one consistent-snapshot transaction, and writes it to
+<directory>/<Table>/:
+
+    table.json          columns, row count and per-chunk min/max/NULL stats
+    <Column>.values     fixed-width little-endian values, one per row: int64
+                        for integers and DECIMALs (scaled by 10**scale),
+                        datetime64 days or seconds for dates and timestamps,
+                        int32 dictionary codes for strings (-1 for NULL)
+    <Column>.nulls      one byte per row, only for columns with NULLs
+    <Column>.dictionary JSON list of a string column's distinct values
+
+SnapshotTable memory-maps the files, so columns are read straight from the
+page cache without copies, and scan() skips the chunks whose stats rule out
+its predicates. A new export replaces a table's directory only once it is
+complete.
+
+    python backend/snapshot_files.py export --dir snapshots
+    python backend/snapshot_files.py info --dir snapshots
+    python backend/snapshot_files.py scan --dir snapshots --table Sale --where 'Amount >= 900'
+"""
+import argparse
+import json
+import operator
+import os
+import re
+import shutil
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from columnar_engine import Column, ColumnTable, snapshot_columns
+
+# Tables exported by default
+EXPORT_TABLES = ["Sale", "Salary", "InterviewGrade", "VendorPart"]
+# Rows read per keyset query; also the unit of the min/max stats
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 65536))
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+
+PRIMARY_KEY_SQL = """
+    SELECT TABLE_NAME, COLUMN_NAME
+    FROM information_schema.KEY_COLUMN_USAGE
+    WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_NAME = 'PRIMARY'
+    ORDER BY TABLE_NAME, ORDINAL_POSITION
+"""
+
+# On-disk type of each column kind
+DTYPES = {
+    "int": "<i8",
+    "decimal": "<i8",
+    "date": "<M8[D]",
+    "datetime": "<M8[s]",
+    "string": "<i4",
+}
+
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+_PREDICATE_RE = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|=|<|>)\s*(.*?)\s*$")
+
+
+class SnapshotError(Exception):
+    """Raised for a missing or unreadable snapshot, or a predicate it can't evaluate."""
+
+
+def primary_keys(cursor):
+    """Primary key columns of each table, in key order."""
+    cursor.execute(PRIMARY_KEY_SQL)
+    keys = {}
+    for table, column in cursor.fetchall():
+        keys.setdefault(table, []).append(column)
+    return keys
+
+
+def keyset_chunks(cursor, table, columns, key, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Rows of a table in primary key order, chunk_rows at a time.
+
+    Each chunk starts after the last key of the previous one, so every
+    query is a short range read on the primary key whatever the offset.
+    """
+    names = [name for name, _, _ in columns]
+    select = f"SELECT {', '.join(f'`{name}`' for name in names)} FROM `{table}`"
+    key_list = ", ".join(f"`{column}`" for column in key)
+    order = f" ORDER BY {key_list} LIMIT {int(chunk_rows)}"
+    positions = [names.index(column) for column in key]
+    after = f" WHERE ({key_list}) > ({', '.join(['%s'] * len(key))})"
+    cursor.execute(select + order)
+    rows = cursor.fetchall()
+    while rows:
+        yield rows
+        if len(rows) < chunk_rows:
+            break
+        cursor.execute(select + after + order, tuple(rows[-1][i] for i in positions))
+        rows = cursor.fetchall()
+
+
+def stat_value(kind, scale, value):
+    """A stored value as it is written to table.json."""
+    if kind in ("int", "string"):
+        return value.item() if isinstance(value, np.generic) else value
+    if kind == "decimal":
+        return str(Column("decimal", np.array([value]), scale=scale).python([0])[0])
+    return str(value)
+
+
+def stored_value(kind, scale, value):
+    """A predicate or stats value (as text or JSON) in a column's stored form."""
+    if kind == "int":
+        return int(value)
+    if kind == "decimal":
+        return Column.from_values("decimal", [value], scale).values[0].item()
+    if kind == "date":
+        return np.datetime64(value, "D")
+    if kind == "datetime":
+        return np.datetime64(str(value).replace(" ", "T"), "s")
+    return value
+
+
+class ColumnWriter:
+    """Appends chunks of one column to its files, collecting the string dictionary."""
+
+    def __init__(self, directory, name, kind, scale):
+        self.path = os.path.join(directory, name)
+        self.name, self.kind, self.scale = name, kind, scale or 0
+        self.values = open(self.path + ".values", "wb")
+        self.nulls = open(self.path + ".nulls", "wb")
+        self.null_count = 0
+        self.codes = {}
+
+    def append(self, values):
+        """Write one chunk of driver values; returns its [min, max, NULL count]."""
+        nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+        if self.kind == "string":
+            codes = self.codes
+            stored = np.fromiter((-1 if value is None else codes.setdefault(value, len(codes))
+                                  for value in values), dtype=np.int32, count=len(values))
+            present = [value for value in values if value is not None]
+            low, high = (min(present), max(present)) if present else (None, None)
+        else:
+            stored = Column.from_values(self.kind, values, self.scale).values
+            present = stored[~nulls]
+            low, high = ((stat_value(self.kind, self.scale, present.min()),
+                          stat_value(self.kind, self.scale, present.max())) if len(present) else (None, None))
+        stored.astype(DTYPES[self.kind]).tofile(self.values)
+        nulls.astype(np.uint8).tofile(self.nulls)
+        self.null_count += int(nulls.sum())
+        return [low, high, int(nulls.sum())]
+
+    def close(self):
+        self.values.close()
+        self.nulls.close()
+        if not self.null_count:
+            os.remove(self.path + ".nulls")
+        if self.kind == "string":
+            with open(self.path + ".dictionary", "w") as f:
+                json.dump(list(self.codes), f, ensure_ascii=False)
+        return {"name": self.name, "kind": self.kind, "scale": self.scale,
+                "dtype": DTYPES[self.kind], "nulls": self.null_count}
+
+
+def export_table(conn, directory, table, columns, key, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write one table's snapshot under directory/table, replacing any previous one.
+
+    Returns the table's metadata.
+    """
+    if not key:
+        raise SnapshotError(f"{table} has no primary key to scan by")
+    final = os.path.join(directory, table)
+    staging = final + ".partial"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    writers = [ColumnWriter(staging, name, kind, scale) for name, kind, scale in columns]
+    chunks, rows = [], 0
+    cursor = conn.cursor()
+    try:
+        # Every chunk reads the table as of the same moment
+        cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        started = datetime.now()
+        for chunk in keyset_chunks(cursor, table, columns, key, chunk_rows):
+            values = list(zip(*chunk))
+            stats = {writer.name: writer.append(column) for writer, column in zip(writers, values)}
+            chunks.append({"start": rows, "rows": len(chunk), "stats": stats})
+            rows += len(chunk)
+        conn.commit()
+    finally:
+        cursor.close()
+        column_meta = [writer.close() for writer in writers]
+    meta = {"table": table, "exportedAt": started.isoformat(timespec="seconds"), "rows": rows,
+            "key": key, "chunkRows": chunk_rows, "columns": column_meta, "chunks": chunks}
+    with open(os.path.join(staging, "table.json"), "w") as f:
+        json.dump(meta, f, indent=1, ensure_ascii=False)
+    # Readers of the previous snapshot keep their mappings of the replaced files
+    previous = final + ".previous"
+    if os.path.exists(final):
+        shutil.rmtree(previous, ignore_errors=True)
+        os.rename(final, previous)
+    os.rename(staging, final)
+    shutil.rmtree(previous, ignore_errors=True)
+    return meta
+
+
+def export(conn, directory=SNAPSHOT_DIR, tables=EXPORT_TABLES, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Export tables to snapshot files; returns {table: metadata}."""
+    os.makedirs(directory, exist_ok=True)
+    cursor = conn.cursor()
+    try:
+        columns = snapshot_columns(cursor, tables)
+        keys = primary_keys(cursor)
+    finally:
+        cursor.close()
+    missing = [table for table in tables if table not in columns]
+    if missing:
+        raise SnapshotError(f"Tables not in the database: {', '.join(missing)}")
+    return {table: export_table(conn, directory, table, columns[table], keys.get(table), chunk_rows)
+            for table in tables}
+
+
+def parse_predicate(text):
+    """'Column op value' as (column, op, value text)."""
+    match = _PREDICATE_RE.match(text)
+    if not match:
+        raise SnapshotError(f"Predicate must look like 'Column >= value': {text!r}")
+    column, op, value = match.groups()
+    return column, op, value.strip("'\"")
+
+
+class SnapshotTable:
+    """One exported table, read through memory maps."""
+
+    def __init__(self, directory, table):
+        self.path = os.path.join(directory, table)
+        try:
+            with open(os.path.join(self.path, "table.json")) as f:
+                self.meta = json.load(f)
+        except OSError as err:
+            raise SnapshotError(f"No snapshot of {table} in {directory}: {err}") from None
+        self.name = table
+        self.rows = self.meta["rows"]
+        self.chunks = self.meta["chunks"]
+        self.specs = {column["name"]: column for column in self.meta["columns"]}
+        self._columns = {}
+
+    def __len__(self):
+        return self.rows
+
+    def _map(self, name, suffix, dtype):
+        if not self.rows:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name + suffix), dtype=dtype, mode="r", shape=(self.rows,))
+
+    def column(self, name):
+        """A Column whose values and NULL mask are memory-mapped from the files."""
+        if name not in self._columns:
+            spec = self.specs.get(name)
+            if spec is None:
+                raise SnapshotError(f"Unknown column '{name}' in snapshot of {self.name}")
+            nulls = self._map(name, ".nulls", np.bool_) if spec["nulls"] else None
+            dictionary = None
+            if spec["kind"] == "string":
+                with open(os.path.join(self.path, name + ".dictionary")) as f:
+                    values = json.load(f)
+                dictionary = np.empty(len(values), dtype=object)
+                dictionary[:] = values
+            self._columns[name] = Column(spec["kind"], self._map(name, ".values", spec["dtype"]), nulls,
+                                         dictionary, spec["scale"])
+        return self._columns[name]
+
+    def table(self, columns=None):
+        """A ColumnTable of the snapshot, for the columnar engine's building blocks."""
+        return ColumnTable(self.name, {name: self.column(name) for name in columns or self.specs})
+
+    def _typed(self, where):
+        typed = []
+        for column, op, value in where:
+            spec = self.specs.get(column)
+            if spec is None:
+                raise SnapshotError(f"Unknown column '{column}' in snapshot of {self.name}")
+            if op not in OPERATORS:
+                raise SnapshotError(f"Unsupported operator {op!r}")
+            try:
+                typed.append((column, op, stored_value(spec["kind"], spec["scale"], value)))
+            except (TypeError, ValueError, ArithmeticError):
+                raise SnapshotError(f"Bad {spec['kind']} value for {column}: {value!r}") from None
+        return typed
+
+    def chunk_may_match(self, chunk, column, op, value):
+        """Whether a chunk's min/max stats leave room for rows where `column op value`."""
+        low, high, _nulls = chunk["stats"][column]
+        if low is None:
+            # Only NULLs, which no comparison matches
+            return False
+        spec = self.specs[column]
+        low, high = stored_value(spec["kind"], spec["scale"], low), stored_value(spec["kind"], spec["scale"], high)
+        if op == "=":
+            return low <= value <= high
+        if op == "!=":
+            return not low == high == value
+        if op in ("<", "<="):
+            return OPERATORS[op](low, value)
+        return OPERATORS[op](high, value)
+
+    def matching_chunks(self, where):
+        """Chunks whose stats don't rule out every row for the (column, op, value) predicates."""
+        typed = self._typed(where)
+        return [chunk for chunk in self.chunks
+                if all(self.chunk_may_match(chunk, *predicate) for predicate in typed)]
+
+    def scan(self, where=(), columns=None):
+        """Rows matching all (column, op, value) predicates, as a ColumnTable.
+
+        String comparisons are exact and use code point order, unlike
+        MySQL's case-insensitive collation. Returns (table, chunks read).
+        """
+        typed = self._typed(where)
+        chunks = self.matching_chunks(where)
+        selected = []
+        for chunk in chunks:
+            start, stop = chunk["start"], chunk["start"] + chunk["rows"]
+            keep = np.ones(stop - start, dtype=bool)
+            for column, op, value in typed:
+                col = self.column(column)
+                if col.kind == "string":
+                    # Compare each distinct value once, then look the codes up
+                    matches = np.fromiter((OPERATORS[op](entry, value) for entry in col.dictionary),
+                                          dtype=bool, count=len(col.dictionary))
+                    codes = col.values[start:stop]
+                    keep &= (codes >= 0) & np.append(matches, False)[codes]
+                else:
+                    keep &= OPERATORS[op](col.values[start:stop], value)
+                    if col.nulls is not None:
+                        keep &= ~col.nulls[start:stop]
+            selected.append(start + np.flatnonzero(keep))
+        rows = np.concatenate(selected) if selected else np.zeros(0, dtype=np.int64)
+        result = {}
+        for name in columns or self.specs:
+            col = self.column(name)
+            result[name] = Column(col.kind, np.asarray(col.values[rows]),
+                                  None if col.nulls is None else np.asarray(col.nulls[rows]),
+                                  col.dictionary, col.scale)
+        return ColumnTable(self.name, result), len(chunks)
+
+
+def read_tables(directory=SNAPSHOT_DIR):
+    """Every table exported under directory, by name."""
+    if not os.path.isdir(directory):
+        raise SnapshotError(f"No snapshot directory {directory}")
+    return {name: SnapshotTable(directory, name) for name in sorted(os.listdir(directory))
+            if os.path.isfile(os.path.join(directory, name, "table.json"))}
+
+
+def file_size(table):
+    return sum(entry.stat().st_size for entry in os.scandir(table.path))
+
+
+def print_rows(table, limit):
+    names = list(table.columns)
+    print("\t".join(names))
+    rows = np.arange(min(limit, len(table)))
+    for row in zip(*(table[name].python(rows) for name in names)):
+        print("\t".join("NULL" if value is None else str(value) for value in row))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export large tables of the database configured by DB_HOST/DB_USER/DB_PASSWORD/DB_NAME "
+                    "to memory-mappable columnar files, and read them back.")
+    parser.add_argument('command', choices=['export', 'info', 'scan'])
+    parser.add_argument('--dir', default=SNAPSHOT_DIR, help="snapshot directory (default: SNAPSHOT_DIR)")
+    parser.add_argument('--tables', type=lambda s: s.split(','), default=EXPORT_TABLES,
+                        help="comma-separated tables to export")
+    parser.add_argument('--chunk-rows', type=int, default=EXPORT_CHUNK_ROWS)
+    parser.add_argument('--table', help="table to scan")
+    parser.add_argument('--where', action='append', default=[],
+                        help="predicate such as 'Amount >= 100' (repeatable; all must hold)")
+    parser.add_argument('--columns', type=lambda s: s.split(','), help="comma-separated columns to print")
+    parser.add_argument('--limit', type=int, default=20, help="rows printed by scan")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.command == 'export':
+            import generate_random_data as gen
+
+            conn = gen.connect_to_db()
+            try:
+                for table in args.tables:
+                    started = time.perf_counter()
+                    meta = export(conn, args.dir, [table], args.chunk_rows)[table]
+                    print(f"{table:<16} {meta['rows']:>10} rows in {len(meta['chunks'])} chunks, "
+                          f"{time.perf_counter() - started:.1f} s")
+            finally:
+                conn.close()
+        elif args.command == 'info':
+            for name, table in read_tables(args.dir).items():
+                print(f"{name:<16} {len(table):>10} rows, {len(table.chunks)} chunks, "
+                      f"{file_size(table) / 2**20:.1f} MiB, exported {table.meta['exportedAt']}")
+        else:
+            if not args.table:
+                print("scan needs --table")
+                return 2
+            table = SnapshotTable(args.dir, args.table)
+            where = [parse_predicate(text) for text in args.where]
+            started = time.perf_counter()
+            result, read = table.scan(where, args.columns)
+            elapsed = (time.perf_counter() - started) * 1000
+            print_rows(result, args.limit)
+            print(f"{len(result)} rows from {read} of {len(table.chunks)} chunks in {elapsed:.1f} ms",
+                  file=sys.stderr)
+    except SnapshotError as err:
+        print(f"❌ {err}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
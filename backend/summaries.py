@@ -0,0 +1,514 @@
+import argparse
+import os
+import re
+import threading
+import time
+
+import pymysql
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Rebuild time and staleness of every materialized view
+STATE_TABLE = 'SummaryRefresh'
+
+# Each DDL.sql view is materialized as running counts and sums in a summary
+# table that triggers on its base tables keep up to date:
+#   table   - the summary table and its CREATE TABLE body
+#   rebuild - SELECT computing every summary row from the base tables
+#   read    - SELECT over the summary returning the view's columns
+#   sources - (base table, add, remove, events); add/remove adjust the summary
+#             for one row, written against {row} (NEW or OLD). A DELETE source
+#             marked 'BEFORE DELETE' is a parent whose rows cascade into the
+#             aggregated table, which MySQL does without firing triggers.
+SUMMARIES = {
+    'EmployeeAverageSalary': {
+        'table': ('EmployeeAverageSalarySummary', """
+            EmployeeID INT PRIMARY KEY,
+            SalaryRows INT NOT NULL,
+            AmountCount INT NOT NULL,
+            AmountSum BIGINT NOT NULL
+        """),
+        'rebuild': """
+            SELECT EmployeeID, COUNT(*), COUNT(Amount), IFNULL(SUM(Amount), 0)
+            FROM Salary
+            GROUP BY EmployeeID
+        """,
+        'read': """
+            SELECT s.EmployeeID AS PersonID,
+                   CONCAT(p.FirstName, ' ', p.LastName) AS EmployeeName,
+                   s.AmountSum / NULLIF(s.AmountCount, 0) AS AverageMonthlySalary
+            FROM EmployeeAverageSalarySummary s
+            JOIN Employee e ON e.PersonID = s.EmployeeID
+            JOIN Person p ON p.PersonID = s.EmployeeID
+            WHERE s.SalaryRows > 0
+        """,
+        'sources': [
+            ('Salary', """
+                INSERT INTO EmployeeAverageSalarySummary (EmployeeID, SalaryRows, AmountCount, AmountSum)
+                VALUES ({row}.EmployeeID, 1, {row}.Amount IS NOT NULL, IFNULL({row}.Amount, 0))
+                ON DUPLICATE KEY UPDATE SalaryRows = SalaryRows + 1,
+                    AmountCount = AmountCount + VALUES(AmountCount),
+                    AmountSum = AmountSum + VALUES(AmountSum)
+            """, """
+                UPDATE EmployeeAverageSalarySummary
+                SET SalaryRows = SalaryRows - 1,
+                    AmountCount = AmountCount - ({row}.Amount IS NOT NULL),
+                    AmountSum = AmountSum - IFNULL({row}.Amount, 0)
+                WHERE EmployeeID = {row}.EmployeeID
+            """, ['INSERT', 'UPDATE', 'DELETE']),
+        ],
+    },
+    'InterviewRoundsPassed': {
+        'table': ('InterviewRoundsPassedSummary', """
+            CandidateID INT,
+            JobID INT,
+            RoundNumber INT,
+            Passes INT NOT NULL,
+            PRIMARY KEY (CandidateID, JobID, RoundNumber)
+        """),
+        'rebuild': """
+            SELECT i.CandidateID, i.JobID, ig.RoundNumber, COUNT(*)
+            FROM Interview i
+            JOIN InterviewGrade ig ON ig.InterviewID = i.InterviewID
+            WHERE ig.Grade >= 60 AND i.CandidateID IS NOT NULL AND i.JobID IS NOT NULL
+            GROUP BY i.CandidateID, i.JobID, ig.RoundNumber
+        """,
+        'read': """
+            SELECT s.CandidateID,
+                   CONCAT(p.FirstName, ' ', p.LastName) AS CandidateName,
+                   s.JobID,
+                   jp.JobDescription,
+                   COUNT(*) AS PassedRounds
+            FROM InterviewRoundsPassedSummary s
+            JOIN Person p ON p.PersonID = s.CandidateID
+            JOIN JobPosition jp ON jp.JobID = s.JobID
+            WHERE s.Passes > 0
+            GROUP BY s.CandidateID, p.FirstName, p.LastName, s.JobID, jp.JobDescription
+        """,
+        'sources': [
+            ('InterviewGrade', """
+                INSERT INTO InterviewRoundsPassedSummary (CandidateID, JobID, RoundNumber, Passes)
+                SELECT i.CandidateID, i.JobID, {row}.RoundNumber, 1
+                FROM Interview i
+                WHERE i.InterviewID = {row}.InterviewID AND {row}.Grade >= 60
+                AND i.CandidateID IS NOT NULL AND i.JobID IS NOT NULL
+                ON DUPLICATE KEY UPDATE Passes = Passes + 1
+            """, """
+                UPDATE InterviewRoundsPassedSummary s
+                JOIN Interview i ON i.CandidateID = s.CandidateID AND i.JobID = s.JobID
+                SET s.Passes = s.Passes - 1
+                WHERE i.InterviewID = {row}.InterviewID AND s.RoundNumber = {row}.RoundNumber
+                AND {row}.Grade >= 60
+            """, ['INSERT', 'UPDATE', 'DELETE']),
+            # Grades move with their interview's candidate and job
+            ('Interview', """
+                INSERT INTO InterviewRoundsPassedSummary (CandidateID, JobID, RoundNumber, Passes)
+                SELECT {row}.CandidateID, {row}.JobID, RoundNumber, COUNT(*)
+                FROM InterviewGrade
+                WHERE InterviewID = {row}.InterviewID AND Grade >= 60
+                AND {row}.CandidateID IS NOT NULL AND {row}.JobID IS NOT NULL
+                GROUP BY RoundNumber
+                ON DUPLICATE KEY UPDATE Passes = Passes + VALUES(Passes)
+            """, """
+                UPDATE InterviewRoundsPassedSummary s
+                JOIN (SELECT RoundNumber, COUNT(*) AS Passes
+                      FROM InterviewGrade
+                      WHERE InterviewID = {row}.InterviewID AND Grade >= 60
+                      GROUP BY RoundNumber) g ON g.RoundNumber = s.RoundNumber
+                SET s.Passes = s.Passes - g.Passes
+                WHERE s.CandidateID = {row}.CandidateID AND s.JobID = {row}.JobID
+            """, ['UPDATE', 'BEFORE DELETE']),
+        ],
+    },
+    'ProductTypeSales': {
+        # Kept per product and grouped by type when read, so products changing
+        # type need no maintenance and products without sales still show up
+        # TotalItemsSold is cast back to the BIGINT the view's COUNT returns
+        'table': ('ProductTypeSalesSummary', """
+            ProductID INT PRIMARY KEY,
+            SaleCount INT NOT NULL,
+            AmountCount INT NOT NULL,
+            AmountSum DECIMAL(32, 2) NOT NULL
+        """),
+        'rebuild': """
+            SELECT ProductID, COUNT(*), COUNT(Amount), IFNULL(SUM(Amount), 0)
+            FROM Sale
+            WHERE ProductID IS NOT NULL
+            GROUP BY ProductID
+        """,
+        'read': """
+            SELECT p.ProductType,
+                   CAST(COALESCE(SUM(s.SaleCount), 0) AS SIGNED) AS TotalItemsSold,
+                   SUM(IF(s.AmountCount > 0, s.AmountSum, NULL)) AS TotalSalesAmount
+            FROM Product p
+            LEFT JOIN ProductTypeSalesSummary s ON s.ProductID = p.ProductID
+            GROUP BY p.ProductType
+        """,
+        'sources': [
+            ('Sale', """
+                INSERT INTO ProductTypeSalesSummary (ProductID, SaleCount, AmountCount, AmountSum)
+                SELECT {row}.ProductID, 1, {row}.Amount IS NOT NULL, IFNULL({row}.Amount, 0)
+                FROM DUAL
+                WHERE {row}.ProductID IS NOT NULL
+                ON DUPLICATE KEY UPDATE SaleCount = SaleCount + 1,
+                    AmountCount = AmountCount + VALUES(AmountCount),
+                    AmountSum = AmountSum + VALUES(AmountSum)
+            """, """
+                UPDATE ProductTypeSalesSummary
+                SET SaleCount = SaleCount - 1,
+                    AmountCount = AmountCount - ({row}.Amount IS NOT NULL),
+                    AmountSum = AmountSum - IFNULL({row}.Amount, 0)
+                WHERE ProductID = {row}.ProductID
+            """, ['INSERT', 'UPDATE', 'DELETE']),
+        ],
+    },
+    'ProductPartCost': {
+        'table': ('ProductPartCostSummary', """
+            ProductID INT PRIMARY KEY,
+            PairCount INT NOT NULL,
+            CostCount INT NOT NULL,
+            CostSum DECIMAL(32, 2) NOT NULL
+        """),
+        'rebuild': """
+            SELECT pp.ProductID, COUNT(*), COUNT(pp.Quantity * vp.Price),
+                   IFNULL(SUM(pp.Quantity * vp.Price), 0)
+            FROM ProductPart pp
+            JOIN VendorPart vp ON vp.PartID = pp.PartID
+            GROUP BY pp.ProductID
+        """,
+        'read': """
+            SELECT s.ProductID,
+                   p.ProductType,
+                   IF(s.CostCount > 0, s.CostSum, NULL) AS TotalPartCost
+            FROM ProductPartCostSummary s
+            JOIN Product p ON p.ProductID = s.ProductID
+            WHERE s.PairCount > 0
+        """,
+        'sources': [
+            ('ProductPart', """
+                INSERT INTO ProductPartCostSummary (ProductID, PairCount, CostCount, CostSum)
+                SELECT {row}.ProductID, COUNT(*), COUNT({row}.Quantity * vp.Price),
+                       IFNULL(SUM({row}.Quantity * vp.Price), 0)
+                FROM VendorPart vp
+                WHERE vp.PartID = {row}.PartID
+                ON DUPLICATE KEY UPDATE PairCount = PairCount + VALUES(PairCount),
+                    CostCount = CostCount + VALUES(CostCount),
+                    CostSum = CostSum + VALUES(CostSum)
+            """, """
+                UPDATE ProductPartCostSummary s
+                JOIN (SELECT COUNT(*) AS Pairs, COUNT({row}.Quantity * vp.Price) AS Costs,
+                             IFNULL(SUM({row}.Quantity * vp.Price), 0) AS Cost
+                      FROM VendorPart vp
+                      WHERE vp.PartID = {row}.PartID) d
+                SET s.PairCount = s.PairCount - d.Pairs,
+                    s.CostCount = s.CostCount - d.Costs,
+                    s.CostSum = s.CostSum - d.Cost
+                WHERE s.ProductID = {row}.ProductID
+            """, ['INSERT', 'UPDATE', 'DELETE']),
+            ('VendorPart', """
+                INSERT INTO ProductPartCostSummary (ProductID, PairCount, CostCount, CostSum)
+                SELECT pp.ProductID, 1, pp.Quantity * {row}.Price IS NOT NULL,
+                       IFNULL(pp.Quantity * {row}.Price, 0)
+                FROM ProductPart pp
+                WHERE pp.PartID = {row}.PartID
+                ON DUPLICATE KEY UPDATE PairCount = PairCount + 1,
+                    CostCount = CostCount + VALUES(CostCount),
+                    CostSum = CostSum + VALUES(CostSum)
+            """, """
+                UPDATE ProductPartCostSummary s
+                JOIN ProductPart pp ON pp.ProductID = s.ProductID
+                SET s.PairCount = s.PairCount - 1,
+                    s.CostCount = s.CostCount - (pp.Quantity * {row}.Price IS NOT NULL),
+                    s.CostSum = s.CostSum - IFNULL(pp.Quantity * {row}.Price, 0)
+                WHERE pp.PartID = {row}.PartID
+            """, ['INSERT', 'UPDATE', 'DELETE']),
+            # Deleting a vendor cascades into VendorPart
+            ('Vendor', None, """
+                UPDATE ProductPartCostSummary s
+                JOIN (SELECT pp.ProductID, COUNT(*) AS Pairs,
+                             COUNT(pp.Quantity * vp.Price) AS Costs,
+                             IFNULL(SUM(pp.Quantity * vp.Price), 0) AS Cost
+                      FROM VendorPart vp
+                      JOIN ProductPart pp ON pp.PartID = vp.PartID
+                      WHERE vp.VendorID = {row}.VendorID
+                      GROUP BY pp.ProductID) d ON d.ProductID = s.ProductID
+                SET s.PairCount = s.PairCount - d.Pairs,
+                    s.CostCount = s.CostCount - d.Costs,
+                    s.CostSum = s.CostSum - d.Cost
+            """, ['BEFORE DELETE']),
+        ],
+    },
+}
+
+
+def connect_to_db():
+    return pymysql.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        user=os.getenv('DB_USER', 'root'),
+        password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'xyzcompany')
+    )
+
+
+def triggers(view):
+    """(trigger name, CREATE TRIGGER statement) for every trigger maintaining a view."""
+    summary = SUMMARIES[view]['table'][0]
+    result = []
+    for table, add, remove, events in SUMMARIES[view]['sources']:
+        for event in events:
+            timing, _, action = event.rpartition(' ')
+            timing = timing or 'AFTER'
+            if action == 'INSERT':
+                body = add.format(row='NEW')
+            elif action == 'DELETE':
+                body = remove.format(row='OLD')
+            else:
+                # An update is the old row leaving the summary and the new one entering it
+                body = f"BEGIN\n{remove.format(row='OLD').strip()};\n{add.format(row='NEW').strip()};\nEND"
+            name = f"{summary}_{table}_{action.lower()}"
+            result.append((name, f"CREATE TRIGGER {name} {timing} {action} ON {table} "
+                                 f"FOR EACH ROW {body.strip()}"))
+    return result
+
+
+def materialized_query(view, query):
+    """Rewrite a query over a view to read the view's summary table instead."""
+    read = ' '.join(SUMMARIES[view]['read'].split())
+    return re.sub(rf"\b(FROM|JOIN)\s+`?{view}`?\b", rf"\1 ({read}) AS {view}", query)
+
+
+# Seconds the app trusts a database's summary status before reading it again
+SUMMARY_STATUS_TTL = float(os.getenv("SUMMARY_STATUS_TTL", 5))
+
+INSTALLED_SQL = ("SELECT COUNT(*) FROM information_schema.TABLES "
+                 "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s")
+STATE_SQL = f"SELECT ViewName, RebuiltAt, StaleSince, StaleReason FROM {STATE_TABLE}"
+TRIGGERS_SQL = "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()"
+
+
+def installed(cursor):
+    cursor.execute(INSTALLED_SQL, (STATE_TABLE,))
+    # fetchall, so an unbuffered cursor is left ready for the next statement
+    return cursor.fetchall()[0][0] > 0
+
+
+def status(cursor):
+    """Map each view to (rebuilt_at, stale_since, reason), or {} if not installed.
+
+    A view is stale when it was marked so, or when any of its triggers is
+    missing (dropping or recreating a base table drops its triggers).
+    """
+    if not installed(cursor):
+        return {}
+    cursor.execute(STATE_SQL)
+    state_rows = cursor.fetchall()
+    cursor.execute(TRIGGERS_SQL)
+    return status_from_rows(state_rows, [name for (name,) in cursor.fetchall()])
+
+
+def status_from_rows(state_rows, trigger_names):
+    """status() from the rows of STATE_SQL and TRIGGERS_SQL, for callers running them elsewhere."""
+    rows = {view: (rebuilt_at, stale_since, reason)
+            for view, rebuilt_at, stale_since, reason in state_rows}
+    present = {name.lower() for name in trigger_names}
+    result = {}
+    for view in SUMMARIES:
+        rebuilt_at, stale_since, reason = rows.get(view, (None, None, None))
+        if rebuilt_at is None:
+            stale_since, reason = stale_since, reason or "never built"
+        elif any(name.lower() not in present for name, _ in triggers(view)):
+            reason = reason or "maintenance triggers missing"
+            stale_since = stale_since or rebuilt_at
+        result[view] = (rebuilt_at, stale_since, reason)
+    return result
+
+
+class StatusCache:
+    """status() per connection target, reused for SUMMARY_STATUS_TTL seconds.
+
+    Saves the three status queries in front of every uncached query over a
+    view. rebuild() and mark_stale() clear it; when they run in another
+    process the change shows once the entry expires.
+    """
+
+    def __init__(self, ttl=SUMMARY_STATUS_TTL):
+        self.ttl = ttl
+        self._entries = {}  # target -> (status, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, target):
+        """A target's cached status, or None."""
+        with self._lock:
+            entry = self._entries.get(target)
+        if entry is None or entry[1] < time.monotonic():
+            return None
+        return entry[0]
+
+    def put(self, target, state):
+        now = time.monotonic()
+        with self._lock:
+            # Targets come and go with sessions; drop the expired ones as we go
+            for stale in [key for key, (_, expires_at) in self._entries.items() if expires_at < now]:
+                del self._entries[stale]
+            self._entries[target] = (state, now + self.ttl)
+
+    def status(self, cursor, target):
+        """status(cursor), cached for target."""
+        state = self.get(target)
+        if state is None:
+            state = status(cursor)
+            self.put(target, state)
+        return state
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+status_cache = StatusCache()
+
+
+def is_fresh(state):
+    """Whether a status() entry's summary can be read instead of its view."""
+    return state is not None and state[0] is not None and state[1] is None
+
+
+def describe(state):
+    """One line for the app: where a view's rows came from and how fresh they are."""
+    if state is None:
+        return "live view"
+    rebuilt_at, stale_since, reason = state
+    if not is_fresh(state):
+        return f"live view; summary stale since {stale_since or 'install'} ({reason})"
+    return f"summary table, rebuilt {rebuilt_at:%Y-%m-%d %H:%M:%S} and maintained incrementally"
+
+
+def install(conn):
+    """Create the summary tables and triggers, then build every summary."""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} ("
+        "ViewName VARCHAR(64) PRIMARY KEY, RebuiltAt DATETIME, "
+        "StaleSince DATETIME, StaleReason VARCHAR(255))"
+    )
+    for view, spec in SUMMARIES.items():
+        table, columns = spec['table']
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns})")
+        cursor.execute(f"INSERT IGNORE INTO {STATE_TABLE} (ViewName) VALUES (%s)", (view,))
+    conn.commit()
+    cursor.close()
+    install_triggers(conn)
+    rebuild(conn)
+
+
+def install_triggers(conn, views=None):
+    cursor = conn.cursor()
+    for view in views or SUMMARIES:
+        for name, statement in triggers(view):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(statement)
+    cursor.close()
+
+
+def drop_triggers(conn, views=None):
+    cursor = conn.cursor()
+    for view in views or SUMMARIES:
+        for name, _ in triggers(view):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.close()
+    status_cache.clear()
+
+
+def rebuild(conn, views=None):
+    """Recompute summaries from scratch in one transaction each."""
+    cursor = conn.cursor()
+    for view in views or SUMMARIES:
+        table = SUMMARIES[view]['table'][0]
+        cursor.execute(f"DELETE FROM {table}")
+        cursor.execute(f"INSERT INTO {table} {SUMMARIES[view]['rebuild']}")
+        cursor.execute(
+            f"UPDATE {STATE_TABLE} SET RebuiltAt = NOW(), StaleSince = NULL, StaleReason = NULL "
+            "WHERE ViewName = %s", (view,)
+        )
+        conn.commit()
+    cursor.close()
+    status_cache.clear()
+
+
+def mark_stale(conn, reason, views=None):
+    cursor = conn.cursor()
+    for view in views or SUMMARIES:
+        cursor.execute(
+            f"UPDATE {STATE_TABLE} SET StaleSince = COALESCE(StaleSince, NOW()), StaleReason = %s "
+            "WHERE ViewName = %s", (reason, view)
+        )
+    conn.commit()
+    cursor.close()
+    status_cache.clear()
+
+
+def suspend(conn, reason="bulk load in progress"):
+    """Drop the triggers ahead of a bulk load; returns False if not installed.
+
+    Per-row trigger work would dominate a bulk load, so summaries are marked
+    stale instead and rebuilt by resume().
+    """
+    cursor = conn.cursor()
+    active = installed(cursor)
+    cursor.close()
+    if active:
+        mark_stale(conn, reason)
+        drop_triggers(conn)
+    return active
+
+
+def resume(conn):
+    """Reinstall the triggers and rebuild, if summaries are installed."""
+    cursor = conn.cursor()
+    active = installed(cursor)
+    cursor.close()
+    if active:
+        install_triggers(conn)
+        rebuild(conn)
+    return active
+
+
+def uninstall(conn):
+    drop_triggers(conn)
+    cursor = conn.cursor()
+    for spec in SUMMARIES.values():
+        cursor.execute(f"DROP TABLE IF EXISTS {spec['table'][0]}")
+    cursor.execute(f"DROP TABLE IF EXISTS {STATE_TABLE}")
+    cursor.close()
+    status_cache.clear()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Materialize the DDL.sql views as summary tables "
+                                                 "maintained by triggers.")
+    parser.add_argument('command', choices=['install', 'rebuild', 'status', 'uninstall'])
+    parser.add_argument('--views', type=lambda s: s.split(','),
+                        help="comma-separated views to rebuild (default: all)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    conn = connect_to_db()
+    if args.command == 'install':
+        install(conn)
+    elif args.command == 'rebuild':
+        install_triggers(conn, args.views)
+        rebuild(conn, args.views)
+    elif args.command == 'uninstall':
+        uninstall(conn)
+    cursor = conn.cursor()
+    for view, state in status(cursor).items():
+        print(f"{view:<25} {describe(state)}")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
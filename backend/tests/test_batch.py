@@ -0,0 +1,49 @@
+import pymysql
+import pytest
+
+from batch import (BATCH_MAX_WORKERS, BATCH_QUERY_TIMEOUT_MS, batch_page_size, batch_params, batch_workers,
+                   is_query_timeout, query_timeout_ms)
+from pagination import MAX_PAGE_SIZE, PAGE_SIZE
+
+
+def test_defaults():
+    assert batch_workers() == BATCH_MAX_WORKERS
+    assert batch_page_size() == PAGE_SIZE
+    assert query_timeout_ms() == BATCH_QUERY_TIMEOUT_MS
+    assert batch_params() == {}
+
+
+def test_numbers_may_come_as_strings_and_are_capped():
+    assert batch_workers("1") == 1
+    assert batch_workers(10 ** 6) == BATCH_MAX_WORKERS
+    assert batch_page_size("10") == 10
+    assert batch_page_size(10 ** 9) == MAX_PAGE_SIZE
+    assert query_timeout_ms("50") == 50
+
+
+@pytest.mark.parametrize("check, value", [
+    (batch_workers, "x"),
+    (batch_workers, 0),
+    (batch_workers, [2]),
+    (batch_page_size, "ten"),
+    (batch_page_size, {}),
+    (query_timeout_ms, 0),
+    (query_timeout_ms, "abc"),
+    (batch_params, ["Employees with no supervisees"]),
+    (batch_params, {"Employees with no supervisees": "manager_id=1"}),
+])
+def test_bad_values_are_rejected(check, value):
+    with pytest.raises(ValueError):
+        check(value)
+
+
+def test_params_by_query():
+    params = {"Span of control by level": {"manager_id": "1"}, "Employees with no supervisees": None}
+    assert batch_params(params) == params
+
+
+def test_query_timeouts_are_recognized():
+    assert is_query_timeout(pymysql.err.OperationalError(3024, "maximum statement execution time exceeded"))
+    assert is_query_timeout(pymysql.err.OperationalError(1969, "Query execution was interrupted"))
+    assert not is_query_timeout(pymysql.err.ProgrammingError(1146, "Table doesn't exist"))
+    assert not is_query_timeout(ValueError())
@@ -0,0 +1,43 @@
+import pytest
+
+from bulk_insert import DELIMITERS, decode_line, encode_value
+
+AWKWARD = [
+    "plain",
+    "",
+    None,
+    "\\N",
+    "tab\there",
+    "new\nline\r\n",
+    "back\\slash\\",
+    "comma, and more",
+    "nul\0byte",
+    "\\n is not a newline",
+    "N",
+]
+
+
+@pytest.mark.parametrize("file_format", sorted(DELIMITERS))
+def test_values_round_trip(file_format):
+    delimiter = DELIMITERS[file_format]
+    line = delimiter.join(encode_value(value, delimiter) for value in AWKWARD) + "\n"
+    assert "\n" not in line[:-1]
+    assert decode_line(line, delimiter) == AWKWARD
+
+
+@pytest.mark.parametrize("file_format", sorted(DELIMITERS))
+def test_numbers_are_written_as_text(file_format):
+    delimiter = DELIMITERS[file_format]
+    line = delimiter.join(encode_value(value, delimiter) for value in [1, 2.5, None])
+    assert decode_line(line, delimiter) == ["1", "2.5", None]
+
+
+def test_null_and_empty_string_differ():
+    assert encode_value(None, "\t") == "\\N"
+    assert encode_value("", "\t") == ""
+    assert encode_value("\\N", "\t") == "\\\\N"
+
+
+def test_csv_escapes_the_delimiter():
+    assert encode_value("a,b", ",") == "a\\,b"
+    assert encode_value("a,b", "\t") == "a,b"
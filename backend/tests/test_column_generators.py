@@ -0,0 +1,97 @@
+import re
+from datetime import datetime
+
+import numpy as np
+
+import column_generators as cg
+
+
+def rng():
+    return np.random.default_rng(7)
+
+
+def test_integers_include_both_ends():
+    values = cg.integers(rng(), 1, 3, 1000)
+    assert values.shape == (1000,)
+    assert set(values.tolist()) == {1, 2, 3}
+
+
+def test_amounts_are_in_range_and_rounded_to_cents():
+    values = cg.amounts(rng(), 10, 20, 500)
+    assert values.min() >= 10 and values.max() <= 20
+    assert np.allclose(values * 100, np.round(values * 100))
+
+
+def test_datetimes_and_dates_between():
+    start, end = datetime(2011, 1, 1), datetime(2011, 1, 3, 12)
+    times = cg.datetimes_between(rng(), start, end, 1000)
+    assert times.dtype == np.dtype("datetime64[s]")
+    assert times.min() >= np.datetime64(start) and times.max() <= np.datetime64(end)
+    days = cg.dates_between(rng(), start, end, 1000)
+    assert set(days.astype(str).tolist()) == {"2011-01-01", "2011-01-02", "2011-01-03"}
+    assert cg.add_days(days[:1], [31])[0] > days[0]
+
+
+def test_sample_distinct_rows_are_distinct_and_in_range():
+    picks = cg.sample_distinct(rng(), 6, 4, 2000)
+    assert picks.shape == (2000, 4)
+    assert picks.min() >= 0 and picks.max() < 6
+    assert all(len(set(row)) == 4 for row in picks.tolist())
+
+
+def test_sample_distinct_can_take_everything():
+    picks = cg.sample_distinct(rng(), 5, 5, 100)
+    assert (np.sort(picks, axis=1) == np.arange(5)).all()
+
+
+def test_earlier_links_point_to_smaller_values():
+    values = np.array([3, 10, 11, 40, 41, 42])
+    own = values[1:].repeat(50)
+    links = cg.earlier(rng(), values, own)
+    assert (links < own).all()
+    assert np.isin(links, values).all()
+
+
+def test_interleave():
+    first = np.array([1, 2, 3])
+    second = np.array([10, 20, 30])
+    assert cg.interleave(first, second, np.array([True, False, True])).tolist() == [1, 10, 2, 3, 30]
+
+
+def test_group_positions():
+    assert cg.group_positions(np.array([2, 0, 3, 1])).tolist() == [1, 2, 1, 2, 3, 1]
+
+
+def test_phone_numbers():
+    numbers = cg.phone_numbers(rng(), 200)
+    assert len(numbers) == 200
+    assert all(re.fullmatch(r"[2-9]\d\d-[2-9]\d\d-\d{4}", number) for number in numbers)
+
+
+def test_emails_are_lower_case_and_short():
+    first = np.array(["Ann", "Bob" * 40], dtype=object)
+    last = np.array(["Lee", "Ray"], dtype=object)
+    addresses = cg.emails(rng(), first, last)
+    assert addresses[0].startswith("ann.lee") and "@" in addresses[0]
+    assert all(address == address.lower() and len(address) <= 100 for address in addresses)
+
+
+def test_vocabulary_is_sorted_distinct_and_cut():
+    values = cg.vocabulary("city", 5)
+    assert values.dtype == object
+    assert values.tolist() == sorted(set(values.tolist()))
+    assert max(len(value) for value in values) <= 5
+    assert cg.vocabulary("city", 5) is values
+
+
+def test_words_draw_from_the_vocabulary():
+    drawn = cg.words(rng(), "last_name", 50, 300)
+    assert drawn.shape == (300,)
+    assert np.isin(drawn, cg.vocabulary("last_name", 50)).all()
+
+
+def test_rows_and_monthly():
+    assert list(cg.rows(np.array([1, 2]), ["a", None])) == [(1, "a"), (2, None)]
+    assert [day.month for day in cg.monthly(2011, 15)] == list(range(1, 13))
+    times = cg.as_objects(np.array(["2011-01-02T03:04:05"], dtype="datetime64[s]"))
+    assert times.tolist() == [datetime(2011, 1, 2, 3, 4, 5)]
@@ -0,0 +1,154 @@
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+
+import columnar_engine as ce
+import ddl
+
+# Employee 1 runs the company; 2 and 3 report to 1, 4 to 2
+PEOPLE = [
+    (1, "Ace", "Ann", 50, "F", None, None, None, None, None, None),
+    (2, "Bee", "Bob", 40, "M", None, None, None, None, None, None),
+    (3, "Cee", "Cat", 35, "F", None, None, None, None, None, None),
+    (4, "Dee", "Dan", 25, "M", None, None, None, None, None, None),
+]
+EMPLOYEES = [
+    (1, "Top", "CEO", None),
+    (2, "Mid", "Manager", 1),
+    (3, "Mid", "Engineer", 1),
+    (4, "Low", "Intern", 2),
+]
+
+
+def closure(supervisors):
+    rows = []
+    for employee in supervisors:
+        ancestor, depth = employee, 0
+        while ancestor is not None:
+            rows.append((ancestor, employee, depth))
+            ancestor, depth = supervisors[ancestor], depth + 1
+    return rows
+
+
+ROWS = {
+    "Person": PEOPLE,
+    "Employee": EMPLOYEES,
+    "EmployeeHierarchy": closure({employee: supervisor for employee, _, _, supervisor in EMPLOYEES}),
+    "Department": [(1, "Marketing"), (2, "Sales"), (3, "marketing")],
+    "JobPosition": [
+        (10, 1, "Writer", "2011-01-05"),
+        (11, 1, "Designer", "2011-02-01"),
+        (12, 2, "Seller", "2011-01-10"),
+        (13, 3, "Analyst", "2011-01-31"),
+        (14, None, "Orphan", "2011-01-15"),
+        (15, 1, "Undated", None),
+    ],
+    "Product": [
+        (100, "Cups", "Small", "5.00", "1.00", None),
+        (101, "Cups", "Large", "7.50", "2.00", None),
+        (102, "Plates", "Small", "9.00", "1.00", None),
+        (103, "cups", "Small", "1.00", "1.00", None),
+        (104, "Bowls", "Small", "3.00", "1.00", None),
+    ],
+    "Sale": [
+        (1000, 2, None, 100, None, "2011-03-01 10:00:00", "5.00"),
+        (1001, 2, None, 101, None, "2011-03-02 10:00:00", "7.50"),
+        (1002, 3, None, 103, None, "2011-03-03 10:00:00", None),
+        (1003, 3, None, 102, None, "2011-03-04 10:00:00", "9.00"),
+        (1004, 3, None, None, None, "2011-03-05 10:00:00", "1.00"),
+        (1005, 3, None, 999, None, "2011-03-06 10:00:00", "1.00"),
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def snapshot():
+    types = ddl.column_types()
+    tables = {}
+    for table in ce.SNAPSHOT_TABLES:
+        specs = [(column, ce.KINDS[kind], scale or 0) for column, kind, scale in types[table]]
+        tables[table] = ce.ColumnTable.from_rows(table, specs, ROWS.get(table, []))
+    return ce.ColumnarSnapshot(tables)
+
+
+def test_employees_with_no_supervisees(snapshot):
+    columns, rows = snapshot.execute("Employees with no supervisees")
+    assert columns == ["PersonID", "Name"]
+    assert sorted(rows) == [(3, "Cat Cee"), (4, "Dan Dee")]
+
+
+def test_jobs_posted_by_department_ignores_case(snapshot):
+    columns, rows = snapshot.execute("Jobs posted by Marketing (January 2011)")
+    assert columns == ["JobID"]
+    assert sorted(rows) == [(10,), (13,)]
+    _, rows = snapshot.execute("Jobs posted by Marketing (January 2011)",
+                               {"department": "sales", "posted_before": "2011-03-01"})
+    assert rows == [(12,)]
+
+
+def test_reports_under_a_manager(snapshot):
+    columns, rows = snapshot.execute("Reports under a manager (all levels)", {"manager_id": "1"})
+    assert columns == ["PersonID", "Name", "Title", "Level"]
+    assert rows == [(2, "Bob Bee", "Manager", 1), (3, "Cat Cee", "Engineer", 1), (4, "Dan Dee", "Intern", 2)]
+    assert snapshot.execute("Reports under a manager (all levels)", {"manager_id": "4"})[1] == []
+
+
+def test_chain_of_command(snapshot):
+    columns, rows = snapshot.execute("Chain of command above an employee", {"employee_id": "4"})
+    assert columns == ["PersonID", "Name", "Title", "LevelsUp"]
+    assert rows == [(2, "Bob Bee", "Manager", 1), (1, "Ann Ace", "CEO", 2)]
+
+
+def test_span_of_control(snapshot):
+    assert snapshot.execute("Span of control by level", {"manager_id": "1"}) == (
+        ["Level", "Employees"], [(1, 2), (2, 1)])
+
+
+def test_product_type_sales_groups_case_insensitively(snapshot):
+    columns, rows = snapshot.execute("View: Product Type Sales")
+    assert columns == ["ProductType", "TotalItemsSold", "TotalSalesAmount"]
+    assert rows[0] == ("Cups", 3, Decimal("12.50"))
+    assert sorted(rows[1:], key=str) == [("Bowls", 0, None), ("Plates", 1, Decimal("9.00"))]
+
+
+def test_results_are_kept_per_parameter_values(snapshot):
+    first = snapshot.execute("Span of control by level", {"manager_id": "2"})
+    assert first == (["Level", "Employees"], [(1, 1)])
+    assert snapshot.execute("Span of control by level", {"manager_id": "2"}) is first
+
+
+def test_missing_table_is_an_engine_error():
+    snapshot = ce.ColumnarSnapshot({})
+    with pytest.raises(ce.EngineError, match="not in the snapshot"):
+        snapshot.execute("Employees with no supervisees")
+
+
+def test_unknown_column_is_an_engine_error(snapshot):
+    with pytest.raises(ce.EngineError, match="Unknown column"):
+        snapshot.table("Person")["Nickname"]
+
+
+def test_concurrent_first_queries_share_one_load(monkeypatch, snapshot):
+    loads = []
+
+    def load_snapshot(conn, previous):
+        loads.append(previous)
+        time.sleep(0.05)
+        return ce.ColumnarSnapshot(snapshot.tables), list(snapshot.tables)
+
+    class Connection:
+        def close(self):
+            pass
+
+    monkeypatch.setattr(ce, "load_snapshot", load_snapshot)
+    engine = ce.ColumnarEngine(Connection)
+    threads = [threading.Thread(target=engine.execute, args=("Employees with no supervisees",))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [None]
+    assert engine.metrics()["loads"] == 1
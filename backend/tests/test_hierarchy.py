@@ -0,0 +1,27 @@
+from hierarchy import find_cycles
+
+
+def test_tree_has_no_cycles():
+    assert find_cycles({1: None, 2: 1, 3: 1, 4: 2, 5: 4}) == []
+
+
+def test_empty():
+    assert find_cycles({}) == []
+
+
+def test_self_supervision_is_a_cycle():
+    assert find_cycles({1: None, 2: 2}) == [[2]]
+
+
+def test_cycles_start_at_their_lowest_id():
+    supervisors = {9: 7, 7: 8, 8: 9, 5: 6, 6: 5, 1: None}
+    assert sorted(find_cycles(supervisors)) == [[5, 6], [7, 8, 9]]
+
+
+def test_chains_into_a_cycle_are_not_part_of_it():
+    supervisors = {10: 11, 11: 3, 12: 10, 3: 4, 4: 3, 20: 12}
+    assert find_cycles(supervisors) == [[3, 4]]
+
+
+def test_supervisor_outside_the_mapping_ends_the_chain():
+    assert find_cycles({2: 1, 3: 2}) == []
@@ -0,0 +1,28 @@
+from metrics import QueryMetrics, render_exposition
+
+POOL = {"target": "u@h:3306/d", "size": 8, "open": 3, "idle": 2, "in_use": 1, "checkouts": 40, "waits": 2,
+        "timeouts": 0}
+CACHE = {"hits": 9, "misses": 4, "evictions": 1, "entries": 3, "bytes": 1024, "max_bytes": 4096}
+
+
+def families(text):
+    return {line.split()[2]: line.split()[3] for line in text.splitlines() if line.startswith("# TYPE")}
+
+
+def test_running_counts_are_counters_and_current_values_gauges():
+    types = families(render_exposition(QueryMetrics(), [POOL], {"query_cache": CACHE}))
+    for field in ("checkouts", "waits", "timeouts"):
+        assert types[f"xyz_pool_{field}_total"] == "counter"
+    for field in ("size", "open", "idle", "in_use"):
+        assert types[f"xyz_pool_{field}"] == "gauge"
+    for field in ("hits", "misses", "evictions"):
+        assert types[f"xyz_query_cache_{field}_total"] == "counter"
+    for field in ("entries", "bytes", "max_bytes"):
+        assert types[f"xyz_query_cache_{field}"] == "gauge"
+
+
+def test_samples_carry_labels_and_values():
+    text = render_exposition(QueryMetrics(), [POOL], {"query_cache": CACHE})
+    assert 'xyz_pool_checkouts_total{target="u@h:3306/d"} 40' in text
+    assert "xyz_query_cache_hits_total 9" in text
+    assert text.endswith("\n")
@@ -0,0 +1,88 @@
+import base64
+import datetime
+
+import pytest
+
+from pagination import (MAX_PAGE_SIZE, PAGE_SIZE, InvalidPageToken, decode_page_token,
+                        encode_page_token, keyset_after, paged_query)
+
+KEYSET = [("Total", "DESC"), ("PersonID", "ASC")]
+
+
+def test_token_round_trip():
+    token = encode_page_token("Top sellers", 200, 50, {"min_price": "200"}, [12.5, 7])
+    assert decode_page_token(token, "Top sellers") == (200, 50, {"min_price": "200"}, [12.5, 7])
+
+
+def test_token_sends_dates_as_strings():
+    token = encode_page_token("q", 0, 10, after=[datetime.date(2011, 1, 2), None])
+    assert decode_page_token(token, "q") == (0, 10, {}, ["2011-01-02", None])
+
+
+def test_token_page_size_is_clamped():
+    token = encode_page_token("q", 0, 10 ** 9)
+    assert decode_page_token(token, "q")[1] == MAX_PAGE_SIZE
+
+
+def _token(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("token", [
+    encode_page_token("other query", 0, 10),
+    encode_page_token("q", -1, 10),
+    encode_page_token("q", 0, 0),
+    encode_page_token("q", 0, 10, after={"Total": 1}),
+    encode_page_token("q", 0, 10, after=[[1]]),
+    _token('{"q":"q","o":"x","n":10}'),
+    _token('{"q":"q","n":10}'),
+    _token("[1, 2]"),
+    "not a token!",
+    "",
+])
+def test_bad_tokens_are_rejected(token):
+    with pytest.raises(InvalidPageToken):
+        decode_page_token(token, "q")
+
+
+def test_offset_paging():
+    sql, params = paged_query("SELECT a FROM t ORDER BY a;\n", 20, 10)
+    assert sql == "SELECT a FROM t ORDER BY a\nLIMIT %s OFFSET %s"
+    assert params == (10, 20)
+
+
+def test_query_with_limit_is_one_page():
+    assert paged_query("SELECT a FROM t ORDER BY a LIMIT 5", 0, 10) == ("SELECT a FROM t ORDER BY a LIMIT 5", None)
+
+
+def test_keyset_first_page():
+    sql, params = paged_query("SELECT PersonID, Total FROM t ORDER BY Total DESC", 0, 10, KEYSET)
+    assert sql == ("SELECT * FROM (SELECT PersonID, Total FROM t) AS page\n"
+                   "ORDER BY `Total` DESC, `PersonID` ASC\nLIMIT %s OFFSET %s")
+    assert params == (10, 0)
+
+
+def test_keyset_later_page():
+    sql, params = paged_query("SELECT PersonID, Total FROM t", 0, 10, KEYSET, [99, 7])
+    assert "WHERE ((`Total` < %s OR `Total` IS NULL)) OR (`Total` <=> %s AND `PersonID` > %s)" in sql
+    assert sql.endswith("LIMIT %s")
+    assert params == (99, 99, 7, 10)
+
+
+def test_keyset_after_null_ascending():
+    sql, params = paged_query("SELECT a, b FROM t", 0, 10, [("a", "ASC"), ("b", "ASC")], [None, 3])
+    assert "WHERE (`a` IS NOT NULL) OR (`a` <=> %s AND `b` > %s)" in sql
+    assert params == (None, 3, 10)
+
+
+def test_keyset_after_of_wrong_length_is_rejected():
+    with pytest.raises(InvalidPageToken):
+        paged_query("SELECT a FROM t", 0, 10, KEYSET, [1])
+
+
+def test_keyset_after_reads_the_row():
+    assert keyset_after(["PersonID", "Name", "Total"], (7, "Ann", 99), KEYSET) == [99, 7]
+
+
+def test_default_page_size_is_positive():
+    assert 0 < PAGE_SIZE <= MAX_PAGE_SIZE
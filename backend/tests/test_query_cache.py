@@ -0,0 +1,60 @@
+from query_cache import QueryCache
+
+TARGET = ("db", 3306, "app", "xyz")
+OTHER_USER = ("db", 3306, "admin", "xyz")
+
+
+def key(name, target=TARGET):
+    return (target, name, (), 0, 100, None)
+
+
+def test_put_and_get():
+    cache = QueryCache()
+    cache.put(key("q"), ["a"], [(1,)], {"Sale"})
+    assert cache.get(key("q")) == (["a"], [(1,)])
+    assert cache.get(key("other")) is None
+
+
+def test_expired_entries_are_misses():
+    cache = QueryCache()
+    cache.put(key("q"), ["a"], [(1,)], {"Sale"}, ttl=-1)
+    assert cache.get(key("q")) is None
+    assert cache.metrics()["expired"] == 1
+
+
+def test_writes_drop_entries_of_every_user_of_the_database():
+    cache = QueryCache()
+    cache.put(key("sales"), ["a"], [(1,)], {"Sale"})
+    cache.put(key("sales", OTHER_USER), ["a"], [(1,)], {"Sale", "Product"})
+    cache.put(key("people"), ["a"], [(1,)], {"Person"})
+    assert cache.invalidate_tables(TARGET, {"Sale"}) == 2
+    assert cache.get(key("people")) is not None
+
+
+def test_result_read_before_a_write_is_not_stored_after_it():
+    cache = QueryCache()
+    generation = cache.generation(TARGET, {"Sale", "Product"})
+    cache.invalidate_tables(OTHER_USER, {"Product"})
+    cache.put(key("q"), ["a"], [(1,)], {"Sale", "Product"}, generation=generation)
+    assert cache.get(key("q")) is None
+    assert cache.metrics()["stale_puts"] == 1
+    cache.put(key("q"), ["a"], [(1,)], {"Sale", "Product"},
+              generation=cache.generation(TARGET, {"Sale", "Product"}))
+    assert cache.get(key("q")) is not None
+
+
+def test_writes_to_other_tables_or_databases_keep_the_generation():
+    cache = QueryCache()
+    generation = cache.generation(TARGET, {"Sale"})
+    cache.invalidate_tables(TARGET, {"Person"})
+    cache.invalidate_tables(("db", 3306, "app", "other"), {"Sale"})
+    assert cache.generation(TARGET, {"Sale"}) == generation
+
+
+def test_memory_bound_evicts_least_recently_used():
+    cache = QueryCache(max_bytes=2000)
+    for i in range(20):
+        cache.put(key(i), ["a"], [(i,)], {"Sale"})
+    metrics = cache.metrics()
+    assert metrics["bytes"] <= 2000 and metrics["evictions"] > 0
+    assert cache.get(key(19)) is not None and cache.get(key(0)) is None
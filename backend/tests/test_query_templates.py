@@ -0,0 +1,68 @@
+import datetime
+import decimal
+
+import pytest
+
+from query_templates import InvalidParameter, Param, bind, compile_template
+
+PARAMS = [
+    Param("department", "string", "Marketing"),
+    Param("posted_from", "date", "2011-01-01"),
+    Param("min_price", "decimal", "200"),
+]
+
+TEMPLATE = ("SELECT JobID FROM JobPosition WHERE DepartmentName = :department "
+            "AND PostedDate >= :posted_from AND ListPrice > :min_price")
+
+
+def test_bind_uses_defaults():
+    sql, args, bound = bind(TEMPLATE, PARAMS)
+    assert sql.count("%s") == 3 and ":" not in sql
+    assert args == ("Marketing", datetime.date(2011, 1, 1), decimal.Decimal("200"))
+    assert bound == {"department": "Marketing", "posted_from": "2011-01-01", "min_price": "200"}
+
+
+def test_bind_parses_overrides():
+    _, args, bound = bind(TEMPLATE, PARAMS, {"posted_from": "2024-02-29", "min_price": 12.5})
+    assert args == ("Marketing", datetime.date(2024, 2, 29), decimal.Decimal("12.5"))
+    assert bound["posted_from"] == "2024-02-29"
+
+
+def test_bind_rejects_unknown_parameter():
+    with pytest.raises(InvalidParameter, match="nope"):
+        bind(TEMPLATE, PARAMS, {"nope": "1"})
+
+
+@pytest.mark.parametrize("name, value", [
+    ("posted_from", "2011-02-30"),
+    ("min_price", "cheap"),
+    ("min_price", True),
+    ("department", ""),
+    ("department", "x" * 101),
+])
+def test_bind_rejects_bad_values(name, value):
+    with pytest.raises(InvalidParameter):
+        bind(TEMPLATE, PARAMS, {name: value})
+
+
+def test_bind_rejects_undeclared_placeholder():
+    with pytest.raises(ValueError, match="missing"):
+        bind("SELECT :missing", PARAMS)
+
+
+def test_repeated_placeholder_is_bound_each_time():
+    sql, args, _ = bind("SELECT :department, :department", PARAMS, {"department": "Sales"})
+    assert sql == "SELECT %s, %s"
+    assert args == ("Sales", "Sales")
+
+
+def test_placeholders_in_literals_are_left_alone():
+    sql, names = compile_template("SELECT ':department', 'it''s', '\\':x' FROM t WHERE a = :department")
+    assert sql == "SELECT ':department', 'it''s', '\\':x' FROM t WHERE a = %s"
+    assert names == ("department",)
+
+
+def test_casts_and_times_are_not_placeholders():
+    sql, names = compile_template("SELECT a::text, '10:30' FROM t WHERE b = :b")
+    assert names == ("b",)
+    assert sql.endswith("b = %s")
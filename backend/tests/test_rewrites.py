@@ -0,0 +1,69 @@
+"""The rewritten anti-join and division queries against their original
+formulations, on SQLite, through the same scenarios check_rewrites.py runs
+against MySQL."""
+import datetime
+import sqlite3
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+
+import ddl
+from check_rewrites import SCENARIOS
+from queries import bind_query, original_queries, predefined_queries
+
+ROWS = {
+    "Person": [(i, f"Last{i}", f"First{i}", 30, "F", None, None, None, None, None, None) for i in range(1, 6)],
+    # 2 and 3 report to 1, 4 to 2; 5 supervises no one
+    "Employee": [(1, "A", "CEO", None), (2, "B", "Manager", 1), (3, "C", "Seller", 1),
+                 (4, "C", "Seller", 2), (5, "C", "Seller", None)],
+    "Department": [(1, "Marketing"), (2, "Sales")],
+    "Site": [(1, "North", "Oslo"), (2, "South", "Rome"), (3, "East", "Kyiv")],
+    "Product": [(10, "Desk", "L", "300.00", "9.00", None), (11, "Lamp", "S", "250.00", "1.00", None),
+                (12, "Desk", "S", "120.00", "5.00", None), (13, "Pen", "S", "2.00", "0.10", None)],
+    # 2 sold every type over $200, 3 only desks, 4 a pen, 5 nothing; only site 1 sold in March
+    "Sale": [(100, 2, None, 12, 1, "2011-03-02 10:00:00", "120.00"),
+             (101, 2, None, 11, 2, "2011-04-02 10:00:00", "250.00"),
+             (102, 3, None, 10, 1, "2011-03-31 00:00:00", "300.00"),
+             (103, 4, None, 13, 2, "2011-02-28 23:59:59", "2.00")],
+}
+
+# Results of the unchanged data, so agreement can't come from both being empty
+EXPECTED = {
+    "Employees with no supervisees": {(3, "First3 Last3"), (4, "First4 Last4"), (5, "First5 Last5")},
+    "Marketing sites with no sales (March 2011)": {(2, "Rome"), (3, "Kyiv")},
+    "Salespeople who sold all products > $200": {(2, "First2 Last2")},
+}
+
+
+def connect():
+    db = sqlite3.connect(":memory:")
+    for table, statement in ddl.create_table_statements().items():
+        db.execute(statement)
+    for table, rows in ROWS.items():
+        db.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(rows[0]))})", rows)
+    return db
+
+
+def run(db, name, queries):
+    sql, args, _bound = bind_query(name, queries=queries)
+    sql = sql.replace("CONCAT(p.FirstName, ' ', p.LastName)", "p.FirstName || ' ' || p.LastName")
+    args = [float(arg) if isinstance(arg, Decimal) else arg.isoformat() if isinstance(arg, datetime.date)
+            else arg for arg in args]
+    return Counter(db.execute(sql.replace("%s", "?"), args).fetchall())
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_unchanged_data(name):
+    db = connect()
+    assert set(run(db, name, original_queries)) == EXPECTED[name]
+    assert run(db, name, predefined_queries) == run(db, name, original_queries)
+
+
+@pytest.mark.parametrize("label, statements", SCENARIOS, ids=[label for label, _ in SCENARIOS])
+@pytest.mark.parametrize("name", sorted(original_queries))
+def test_rewrite_matches_original(name, label, statements):
+    db = connect()
+    for statement in statements:
+        db.execute(statement)
+    assert run(db, name, predefined_queries) == run(db, name, original_queries)
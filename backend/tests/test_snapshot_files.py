@@ -0,0 +1,128 @@
+import datetime
+import os
+import re
+from decimal import Decimal
+
+import pytest
+
+import snapshot_files as sf
+
+COLUMNS = [
+    ("SalesID", "int", 0),
+    ("SalesPersonID", "int", 0),
+    ("SalesTime", "datetime", 0),
+    ("Amount", "decimal", 2),
+    ("Note", "string", 0),
+    ("SaleDate", "date", 0),
+]
+ROWS = [
+    (sales_id, None if sales_id % 4 == 0 else sales_id % 3,
+     datetime.datetime(2011, 3, 1) + datetime.timedelta(hours=sales_id),
+     None if sales_id == 5 else Decimal(sales_id) * 10 + Decimal("0.25"),
+     None if sales_id % 5 == 0 else ["alpha", "beta", "Gamma"][sales_id % 3],
+     datetime.date(2011, 3, 1) + datetime.timedelta(days=sales_id))
+    for sales_id in range(1, 11)
+]
+
+
+class FakeCursor:
+    """Serves ROWS to keyset_chunks' queries: ORDER BY the key, after a key value, LIMIT n."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.result = []
+
+    def execute(self, sql, args=None):
+        if not sql.startswith("SELECT"):
+            return
+        rows = sorted(self.rows)
+        if args:
+            rows = [row for row in rows if row[0] > args[0]]
+        self.result = rows[:int(re.search(r"LIMIT (\d+)", sql).group(1))]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self):
+        return FakeCursor(self.rows)
+
+    def commit(self):
+        pass
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    sf.export_table(FakeConnection(ROWS), str(tmp_path), "Sale", COLUMNS, ["SalesID"], chunk_rows=4)
+    return str(tmp_path)
+
+
+def test_round_trip(snapshot_dir):
+    table = sf.SnapshotTable(snapshot_dir, "Sale")
+    assert len(table) == len(ROWS)
+    assert [chunk["rows"] for chunk in table.chunks] == [4, 4, 2]
+    for i, (name, _kind, _scale) in enumerate(COLUMNS):
+        assert table.column(name).python(range(len(ROWS))) == [row[i] for row in ROWS]
+
+
+def test_chunk_stats(snapshot_dir):
+    chunks = sf.SnapshotTable(snapshot_dir, "Sale").chunks
+    assert chunks[0]["stats"]["SalesID"] == [1, 4, 0]
+    assert chunks[1]["stats"]["Amount"] == ["60.25", "80.25", 1]
+    assert chunks[2]["stats"]["Note"] == ["alpha", "alpha", 1]
+    assert chunks[0]["stats"]["SaleDate"] == ["2011-03-02", "2011-03-05", 0]
+
+
+def test_columns_without_nulls_have_no_nulls_file(snapshot_dir):
+    files = set(os.listdir(os.path.join(snapshot_dir, "Sale")))
+    assert "SalesID.nulls" not in files and "Amount.nulls" in files
+    assert "Note.dictionary" in files
+    assert os.listdir(snapshot_dir) == ["Sale"]
+
+
+def test_scan_skips_chunks_and_filters_rows(snapshot_dir):
+    table = sf.SnapshotTable(snapshot_dir, "Sale")
+    result, chunks = table.scan([("Amount", ">=", "70"), ("SalesPersonID", "!=", "0")], ["SalesID", "Amount"])
+    assert chunks == 2
+    assert result["SalesID"].python(range(len(result))) == [7, 10]
+    result, chunks = table.scan([("Note", "=", "beta")])
+    assert chunks == 2
+    assert result["SalesID"].python(range(len(result))) == [1, 4, 7]
+    assert table.scan([("SalesTime", "<", "2011-03-01 02:00:00")])[0]["SalesID"].python([0]) == [1]
+
+
+def test_export_replaces_the_previous_snapshot(snapshot_dir):
+    sf.export_table(FakeConnection(ROWS[:3]), snapshot_dir, "Sale", COLUMNS, ["SalesID"], chunk_rows=4)
+    assert len(sf.read_tables(snapshot_dir)["Sale"]) == 3
+
+
+def test_empty_table(tmp_path):
+    sf.export_table(FakeConnection([]), str(tmp_path), "Sale", COLUMNS, ["SalesID"])
+    table = sf.SnapshotTable(str(tmp_path), "Sale")
+    assert len(table) == 0 and table.scan([("SalesID", ">", "0")])[1] == 0
+
+
+@pytest.mark.parametrize("where", [[("Nope", "=", "1")], [("Amount", "~", "1")], [("SaleDate", "=", "soon")]])
+def test_bad_predicates(snapshot_dir, where):
+    with pytest.raises(sf.SnapshotError):
+        sf.SnapshotTable(snapshot_dir, "Sale").scan(where)
+
+
+def test_parse_predicate():
+    assert sf.parse_predicate("Amount >= '900'") == ("Amount", ">=", "900")
+    with pytest.raises(sf.SnapshotError):
+        sf.parse_predicate("Amount between 1 and 2")
+
+
+def test_missing_snapshot(tmp_path):
+    with pytest.raises(sf.SnapshotError):
+        sf.SnapshotTable(str(tmp_path), "Sale")
+    with pytest.raises(sf.SnapshotError):
+        sf.export_table(FakeConnection(ROWS), str(tmp_path), "Sale", COLUMNS, [])
@@ -0,0 +1,50 @@
+import datetime
+
+import summaries
+
+REBUILT = datetime.datetime(2024, 1, 1)
+
+
+class FakeCursor:
+    """Answers the three status queries; counts the statements run."""
+
+    def __init__(self):
+        self.executed = 0
+
+    def execute(self, sql, args=None):
+        self.executed += 1
+        if sql == summaries.INSTALLED_SQL:
+            self.rows = [(1,)]
+        elif sql == summaries.STATE_SQL:
+            self.rows = [(view, REBUILT, None, None) for view in summaries.SUMMARIES]
+        else:
+            self.rows = [(name,) for view in summaries.SUMMARIES for name, _ in summaries.triggers(view)]
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_status_is_fresh_with_every_trigger():
+    state = summaries.status(FakeCursor())
+    assert all(summaries.is_fresh(state[view]) for view in summaries.SUMMARIES)
+
+
+def test_status_is_read_once_per_target_until_it_expires():
+    cache = summaries.StatusCache(ttl=60)
+    cursor = FakeCursor()
+    first = cache.status(cursor, "a")
+    assert cursor.executed == 3
+    assert cache.status(cursor, "a") is first and cursor.executed == 3
+    cache.status(cursor, "b")
+    assert cursor.executed == 6
+    cache.clear()
+    cache.status(cursor, "a")
+    assert cursor.executed == 9
+
+
+def test_expired_status_is_read_again():
+    cache = summaries.StatusCache(ttl=-1)
+    cursor = FakeCursor()
+    cache.status(cursor, "a")
+    cache.status(cursor, "a")
+    assert cursor.executed == 6
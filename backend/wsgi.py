@@ -0,0 +1,26 @@
+"""Production entry point: the Flask app with its registries warmed for pre-forking.
+
+Imported once by the gunicorn master (preload_app in gunicorn.conf.py), so the
+query registry, compiled templates and DDL-derived table maps are built before
+the workers fork and shared with them copy-on-write.
+"""
+import gc
+
+from app import app
+from queries import original_queries, predefined_queries
+from query_templates import compile_template
+
+
+def warm():
+    """Build everything a worker would otherwise build on its first requests."""
+    for query in list(predefined_queries.values()) + list(original_queries.values()):
+        compile_template(query)
+    # Objects allocated so far live as long as the process; keeping them out of
+    # the collector stops it touching (and so copying) their pages in every worker
+    gc.collect()
+    gc.freeze()
+
+
+warm()
+
+application = app
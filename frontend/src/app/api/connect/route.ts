@@ -30,6 +30,7 @@ export async function POST(request: Request) {
       // Store the connection pool in a global variable
       console.log('Storing connection pool in global variable');
     global.dbPool = pool;
+    global.dbTarget = { host, port: parseInt(port), database };
 
     return NextResponse.json({ message: 'Connected successfully' });
     } catch (connError: any) {
@@ -1,5 +1,29 @@
 import { NextResponse } from 'next/server';
 import { ResultSetHeader, RowDataPacket } from 'mysql2/promise';
+import { CACHE_INVALIDATE_TOKEN, QUERY_SERVICE_URL } from '@/lib/queryService';
+
+// Drop the Flask app's cached query results that read the written table
+async function invalidateCachedQueries(operation: string, table: string) {
+  if (!global.dbTarget) {
+    return;
+  }
+  try {
+    const response = await fetch(`${QUERY_SERVICE_URL}/cache/invalidate`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-Cache-Invalidate-Token': CACHE_INVALIDATE_TOKEN
+      },
+      body: JSON.stringify({ ...global.dbTarget, operation, table })
+    });
+    if (!response.ok) {
+      console.warn('Query cache invalidation failed:', await response.text());
+    }
+  } catch (error: any) {
+    // With the Flask app unreachable, cached results only expire with their TTL
+    console.warn('Query cache invalidation failed:', error.message);
+  }
+}
 
 export async function POST(request: Request) {
   try {
@@ -42,6 +66,7 @@ export async function POST(request: Request) {
           params = Object.values(data);
           
           [result] = await connection.query<ResultSetHeader>(query, params);
+          await invalidateCachedQueries('create', table);
           
           // Fetch the newly created record
           if (result.insertId) {
@@ -101,6 +126,7 @@ export async function POST(request: Request) {
           params = [...Object.values(data), ...Object.values(where)];
           
           [result] = await connection.query<ResultSetHeader>(query, params);
+          await invalidateCachedQueries('update', table);
           
           // Fetch the updated records
           const [updatedRecords] = await connection.query<RowDataPacket[]>(
@@ -133,6 +159,7 @@ export async function POST(request: Request) {
           params = Object.values(where);
           
           [result] = await connection.query<ResultSetHeader>(query, params);
+          await invalidateCachedQueries('delete', table);
           
           return NextResponse.json({
             message: `${result.affectedRows} record(s) deleted successfully`,
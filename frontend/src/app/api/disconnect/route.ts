@@ -5,6 +5,7 @@ export async function POST() {
     if (global.dbPool) {
       await global.dbPool.end();
       global.dbPool = null;
+      global.dbTarget = null;
     }
     return NextResponse.json({ message: 'Disconnected successfully' });
   } catch (error: any) {
@@ -0,0 +1,17 @@
+import { NextResponse } from 'next/server';
+import { QUERY_SERVICE_URL } from '@/lib/queryService';
+
+// Predefined queries with their SQL templates and parameters, as defined in backend/queries.py
+export async function GET() {
+  try {
+    const response = await fetch(`${QUERY_SERVICE_URL}/api/queries`, { cache: 'no-store' });
+    const result = await response.json();
+    return NextResponse.json(result, { status: response.status });
+  } catch (error: any) {
+    console.error('API route error:', error);
+    return NextResponse.json(
+      { message: `API error: ${error.message || 'Failed to load predefined queries'}` },
+      { status: 502 }
+    );
+  }
+}
@@ -11,7 +11,7 @@ export async function POST(request: Request) {
     }
 
     const body = await request.json();
-    const { query } = body;
+    const { query, params } = body;
 
     if (!query) {
       console.error('No query provided');
@@ -21,12 +21,23 @@ export async function POST(request: Request) {
       );
     }
 
+    if (params !== undefined && (typeof params !== 'object' || params === null || Array.isArray(params) ||
+        Object.values(params).some((value) => typeof value !== 'string' && typeof value !== 'number'))) {
+      return NextResponse.json(
+        { message: 'params must map parameter names to strings or numbers' },
+        { status: 400 }
+      );
+    }
+
     console.log('Executing query:', query);
 
     const connection = await global.dbPool.getConnection();
     try {
-      // Execute the query to get results
-      const [rows] = await connection.query(query);
+      // Templated queries go through execute(): a server-side prepared statement
+      // that mysql2 caches per connection, with :name values bound separately
+      const [rows] = params
+        ? await connection.execute({ sql: query, namedPlaceholders: true }, params)
+        : await connection.query(query);
       
       console.log('Query result type:', typeof rows);
       console.log('Query result is array:', Array.isArray(rows));
@@ -8,38 +8,40 @@ export async function GET() {
         { status: 400 }
       );
     }
+    const pool = global.dbPool;
 
-    const connection = await global.dbPool.getConnection();
-    try {
-      // Get all tables
-      const [tables] = await connection.query('SHOW TABLES');
-      const results = [];
+    // Every table's columns in one information_schema query instead of a DESCRIBE per table
+    const [columnRows] = await pool.query(
+      `SELECT TABLE_NAME AS tableName, COLUMN_NAME AS columnName
+       FROM information_schema.COLUMNS
+       WHERE TABLE_SCHEMA = DATABASE()
+       ORDER BY TABLE_NAME, ORDINAL_POSITION`
+    );
+    const columnsByTable = new Map<string, string[]>();
+    for (const row of columnRows as any[]) {
+      const columns = columnsByTable.get(row.tableName) ?? [];
+      columns.push(row.columnName);
+      columnsByTable.set(row.tableName, columns);
+    }
 
-      // For each table, get its structure and sample data
-      for (const table of tables as any[]) {
-        const tableName = Object.values(table)[0];
-        
-        // Get table structure
-        const [columns] = await connection.query(`DESCRIBE ${tableName}`);
-        
-        // Get sample data (first 5 rows)
-        const [rows] = await connection.query(`SELECT * FROM ${tableName} LIMIT 5`);
-        
-        results.push({
+    // Sample data (first 5 rows) for all tables at once; the pool spreads the
+    // queries over its connections
+    const results = await Promise.all(
+      Array.from(columnsByTable, async ([tableName, columns]) => {
+        const [rows] = await pool.query(`SELECT * FROM \`${tableName}\` LIMIT 5`);
+        return {
           table_name: tableName,
-          columns: (columns as any[]).map(col => col.Field),
-          rows: rows
-        });
-      }
+          columns,
+          rows
+        };
+      })
+    );
 
-      return NextResponse.json(results);
-    } finally {
-      connection.release();
-    }
+    return NextResponse.json(results);
   } catch (error: any) {
     return NextResponse.json(
       { message: error.message || 'Failed to fetch tables' },
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}
@@ -1,6 +1,6 @@
 'use client';
 
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import Image from "next/image";
 
 interface QueryResult {
@@ -28,12 +28,29 @@ type PredefinedQueries = {
   [key: string]: string;
 };
 
+// A named :placeholder in a predefined query, bound as a prepared statement parameter
+interface QueryParam {
+  name: string;
+  label: string;
+  type: 'int' | 'decimal' | 'date' | 'string';
+  default: string;
+}
+
+// A predefined query as listed by /api/queries
+interface PredefinedQuery {
+  name: string;
+  sql: string;
+  params: QueryParam[];
+  tables: string[];
+}
+
 export default function Home() {
   const [connected, setConnected] = useState(false);
   const [data, setData] = useState<QueryResult[]>([]);
   const [errorMessage, setErrorMessage] = useState<string | null>(null);
   const [successMessage, setSuccessMessage] = useState<string | null>(null);
   const [selectedQuery, setSelectedQuery] = useState<string>('');
+  const [paramValues, setParamValues] = useState<Record<string, string>>({});
   const [connectionDetails, setConnectionDetails] = useState<DatabaseConnection>({
     host: 'localhost',
     port: '3306',
@@ -58,26 +75,36 @@ export default function Home() {
   const [selectedRowsForDelete, setSelectedRowsForDelete] = useState<Set<number>>(new Set());
   const [isEditing, setIsEditing] = useState<boolean>(false);
 
-  const predefinedQueries: PredefinedQueries = {
-    "Interviewers for Hellen Cole (Job 11111)": "SELECT DISTINCT i.InterviewerID, p.LastName, p.FirstName FROM InterviewerAssignment i JOIN Interview iv ON i.InterviewID = iv.InterviewID JOIN JobPosition jp ON iv.JobID = jp.JobID JOIN Person p ON i.InterviewerID = p.PersonID WHERE iv.CandidateID = (SELECT PersonID FROM Person WHERE FirstName = 'Hellen' AND LastName = 'Cole') AND jp.JobID = 11111;",
-    "Jobs posted by Marketing (January 2011)": "SELECT j.JobID FROM JobPosition j JOIN Department d ON j.DepartmentID = d.Department_ID WHERE d.DepartmentName = 'Marketing' AND j.PostedDate >= '2011-01-01' AND j.PostedDate < '2011-02-01';",
-    "Employees with no supervisees": "SELECT e.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name FROM Employee e JOIN Person p ON e.PersonID = p.PersonID WHERE e.PersonID NOT IN (SELECT SupervisorID FROM Employee WHERE SupervisorID IS NOT NULL);",
-    "Marketing sites with no sales (March 2011)": "SELECT s.SiteID, s.Location FROM Site s JOIN Department d ON d.DepartmentName = 'Marketing' WHERE s.SiteID NOT IN (SELECT SiteID FROM Sale WHERE SalesTime BETWEEN '2011-03-01' AND '2011-03-31');",
-    "Jobs with no hires after 1 month of posting": "SELECT jp.JobID, jp.JobDescription FROM JobPosition jp WHERE NOT EXISTS (SELECT 1 FROM Application a WHERE a.JobID = jp.JobID AND a.ApplicationDate <= DATE_ADD(jp.PostedDate, INTERVAL 1 MONTH) AND a.Status = 'Selected');",
-    "Salespeople who sold all products > $200": "SELECT sp.PersonID, CONCAT(p.FirstName, ' ', p.LastName) AS Name FROM Employee sp JOIN Person p ON sp.PersonID = p.PersonID WHERE NOT EXISTS (SELECT pt.ProductType FROM Product pt WHERE pt.ListPrice > 200 AND pt.ProductType NOT IN (SELECT DISTINCT pr.ProductType FROM Sale s JOIN Product pr ON s.ProductID = pr.ProductID WHERE s.SalesPersonID = sp.PersonID));",
-    "Departments with no job posts (Jan-Feb 2011)": "SELECT d.Department_ID, d.DepartmentName FROM Department d WHERE d.Department_ID NOT IN (SELECT jp.DepartmentID FROM JobPosition jp WHERE jp.PostedDate BETWEEN '2011-01-01' AND '2011-02-28');",
-    "Employees applying for job 12345": "SELECT e.PersonID AS EmployeeID, CONCAT(p.FirstName, ' ', p.LastName) AS Name, ed.DepartmentID FROM Employee e JOIN Person p ON e.PersonID = p.PersonID JOIN Application a ON e.PersonID = a.ApplicantID JOIN JobPosition jp ON a.JobID = jp.JobID LEFT JOIN EmployeeDepartmentAssignment ed ON e.PersonID = ed.EmployeeID WHERE jp.JobID = 12345;",
-    "Best seller's type": "SELECT pt.Type AS EmployeeType, COUNT(*) AS TotalSales FROM Sale s JOIN Employee e ON s.SalesPersonID = e.PersonID JOIN PersonType pt ON e.PersonID = pt.PersonID WHERE pt.Type = 'Employee' GROUP BY pt.Type ORDER BY TotalSales DESC LIMIT 1;",
-    "Product type with highest net profit": "SELECT pr.ProductType FROM Product pr JOIN ProductPart pp ON pr.ProductID = pp.ProductID JOIN VendorPart vp ON pp.PartID = vp.PartID GROUP BY pr.ProductType ORDER BY (SUM(pr.ListPrice) - SUM(vp.Price)) DESC LIMIT 1;",
-    "Employees working in all departments": "SELECT e.EmployeeID AS PersonID, p.LastName, p.FirstName FROM EmployeeDepartmentAssignment e JOIN Person p ON e.EmployeeID = p.PersonID GROUP BY e.EmployeeID, p.LastName, p.FirstName HAVING COUNT(DISTINCT e.DepartmentID) = (SELECT COUNT(*) FROM Department);",
-    "Interviewees selected (name and email)": "SELECT CONCAT(p.FirstName, ' ', p.LastName) AS IntervieweeName, p.Email AS EmailAddress FROM Interview i JOIN Person p ON i.CandidateID = p.PersonID WHERE EXISTS (SELECT 1 FROM InterviewGrade ig WHERE ig.InterviewID = i.InterviewID AND ig.Grade >= 70 GROUP BY ig.InterviewID HAVING COUNT(DISTINCT ig.RoundNumber) >= 5);",
-    "Interviewees (name, phone, email)": "SELECT p.FirstName, p.LastName, ph.PhoneNumber, p.Email FROM Person p JOIN PhoneNumber ph ON p.PersonID = ph.PersonID JOIN Interview i ON p.PersonID = i.CandidateID WHERE EXISTS (SELECT 1 FROM InterviewGrade ig WHERE ig.InterviewID = i.InterviewID AND ig.Grade >= 70 GROUP BY ig.InterviewID HAVING COUNT(DISTINCT ig.RoundNumber) >= 5);",
-    "Employee with highest average salary": "SELECT p.PersonID, p.FirstName, p.LastName FROM Person p JOIN Salary s ON p.PersonID = s.EmployeeID GROUP BY s.EmployeeID ORDER BY AVG(s.Amount) DESC LIMIT 1;",
-    "Vendor supplying 'Cup' (lowest price)": "SELECT v.VendorID, v.Name AS VendorName FROM Vendor v JOIN VendorPart vp ON v.VendorID = vp.VendorID JOIN Part p ON vp.PartID = p.PartID JOIN Product pr ON p.ProductID = pr.ProductID WHERE pr.ProductType = 'Cup' AND pr.Weight < 4 AND vp.Price = (SELECT MIN(vp2.Price) FROM VendorPart vp2 JOIN Part p2 ON vp2.PartID = p2.PartID JOIN Product pr2 ON p2.ProductID = pr2.ProductID WHERE pr2.ProductType = 'Cup' AND pr2.Weight < 4);",
-    "View: Employee Average Monthly Salaries": "SELECT * FROM EmployeeAverageSalary ORDER BY AverageMonthlySalary DESC;",
-    "View: Interview Rounds Passed": "SELECT * FROM InterviewRoundsPassed WHERE PassedRounds >= 5 ORDER BY PassedRounds DESC;",
-    "View: Product Type Sales": "SELECT * FROM ProductTypeSales ORDER BY TotalItemsSold DESC;",
-    "View: Product Part Costs": "SELECT * FROM ProductPartCost ORDER BY TotalPartCost DESC;"
+  // Predefined queries and their parameters, loaded from backend/queries.py through /api/queries
+  const [predefinedQueries, setPredefinedQueries] = useState<PredefinedQueries>({});
+  const [queryParams, setQueryParams] = useState<Record<string, QueryParam[]>>({});
+
+  useEffect(() => {
+    const loadQueries = async () => {
+      try {
+        const response = await fetch('/api/queries');
+        const result = await response.json();
+        if (!response.ok) {
+          setErrorMessage(result.message || 'Failed to load predefined queries.');
+          return;
+        }
+        const queries: PredefinedQuery[] = result.queries;
+        setPredefinedQueries(Object.fromEntries(queries.map((query) => [query.name, query.sql])));
+        setQueryParams(Object.fromEntries(
+          queries.filter((query) => query.params.length > 0).map((query) => [query.name, query.params])
+        ));
+      } catch (error) {
+        setErrorMessage('Failed to load predefined queries.');
+      }
+    };
+    loadQueries();
+  }, []);
+
+  const handleQuerySelect = (queryName: string) => {
+    setSelectedQuery(queryName);
+    setParamValues(Object.fromEntries(
+      (queryParams[queryName] || []).map((param) => [param.name, param.default])
+    ));
   };
 
   const handleConnect = async (e: React.FormEvent) => {
@@ -147,14 +174,22 @@ export default function Home() {
     
     try {
       setErrorMessage(null);
-      console.log("Executing query:", predefinedQueries[selectedQuery]);
-      
+      console.log("Executing query:", predefinedQueries[selectedQuery], paramValues);
+
+      // Templated queries run as prepared statements with their values bound separately
+      const params = queryParams[selectedQuery]
+        ? Object.fromEntries(queryParams[selectedQuery].map((param) => [
+            param.name,
+            param.type === 'int' ? Number(paramValues[param.name]) : paramValues[param.name]
+          ]))
+        : undefined;
+
       const response = await fetch('/api/query', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ query: predefinedQueries[selectedQuery] }),
+        body: JSON.stringify({ query: predefinedQueries[selectedQuery], params }),
       });
       
       const result = await response.json();
@@ -578,7 +613,7 @@ export default function Home() {
                 <select
                   id="query"
                   value={selectedQuery}
-                  onChange={(e) => setSelectedQuery(e.target.value)}
+                  onChange={(e) => handleQuerySelect(e.target.value)}
                       className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 transition-all bg-white"
                 >
                   <option value="">Select a query...</option>
@@ -599,6 +634,25 @@ export default function Home() {
                 </button>
               </div>
                 </div>
+                {(queryParams[selectedQuery] || []).length > 0 && (
+                  <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+                    {queryParams[selectedQuery].map((param) => (
+                      <div key={param.name}>
+                        <label htmlFor={`param-${param.name}`} className="block text-sm font-medium text-gray-700">
+                          {param.label}
+                        </label>
+                        <input
+                          id={`param-${param.name}`}
+                          type={param.type === 'date' ? 'date' : param.type === 'string' ? 'text' : 'number'}
+                          step={param.type === 'decimal' ? '0.01' : undefined}
+                          value={paramValues[param.name] ?? ''}
+                          onChange={(e) => setParamValues({ ...paramValues, [param.name]: e.target.value })}
+                          className="mt-1 block w-full rounded-md border-gray-300 shadow-sm focus:border-indigo-500 focus:ring-indigo-500 transition-all"
+                        />
+                      </div>
+                    ))}
+                  </div>
+                )}
               </div>
               
               {/* CRUD Interface */}
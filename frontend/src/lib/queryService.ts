@@ -0,0 +1,4 @@
+// Flask app that owns the predefined queries and caches their results
+export const QUERY_SERVICE_URL = process.env.QUERY_SERVICE_URL || 'http://localhost:5002';
+// Shared secret the Flask app expects on /cache/invalidate (its CACHE_INVALIDATE_TOKEN)
+export const CACHE_INVALIDATE_TOKEN = process.env.CACHE_INVALIDATE_TOKEN || '';
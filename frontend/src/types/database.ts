@@ -2,4 +2,6 @@ import { Pool } from 'mysql2/promise';
 
 declare global {
   var dbPool: Pool | null;
+  // Database the pool writes to, so writes can invalidate the Flask app's cached results
+  var dbTarget: { host: string; port: number; database: string } | null;
 } 
\ No newline at end of file